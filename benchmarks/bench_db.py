@@ -0,0 +1,503 @@
+# benchmarks/bench_db.py - Latency and throughput of DatabaseManager and the exports
+"""Benchmark DatabaseManager methods and export paths on generated fixtures.
+
+Fixtures are built once per size with the seeded data generator and kept
+in benchmarks/fixtures/; every run works on a fresh copy, so writes never
+change them. Results are written as JSON and can be compared against an
+earlier run, e.g.::
+
+    python benchmarks/bench_db.py --sizes 10k --output baseline.json
+    python benchmarks/bench_db.py --sizes 10k --baseline baseline.json
+
+Comparing exits with status 1 when a benchmark got slower than
+``--threshold`` (default 25%).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import data_generator  # noqa: E402
+import exporters  # noqa: E402
+from db_manager import DatabaseManager, month_range  # noqa: E402
+from query_stats import percentile  # noqa: E402
+
+FIXTURES_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+# Fixture sizes: payments plus the customers, menu and days they spread over
+FIXTURE_SIZES = {
+    "10k": dict(payments=10000, customers=500, menu_items=60, days=365),
+    "1m": dict(payments=1000000, customers=20000, menu_items=120, days=730),
+    "10m": dict(payments=10000000, customers=100000, menu_items=200, days=1095),
+}
+# Last day with orders in every fixture, so fixtures are reproducible
+FIXTURE_END = date(2024, 12, 31)
+FIXTURE_SEED = 20240101
+# Part of the fixture file name; bump it when the generated data changes so
+# fixtures built by older code are rebuilt
+FIXTURE_VERSION = 2
+# Share of the customers that must appear in a fixture's orders; the rest
+# is the long tail of the customer popularity curve
+FIXTURE_MIN_BUYER_SHARE = 0.9
+
+# Each benchmark runs for about this long, within these iteration bounds
+TIME_BUDGET = 1.0
+MIN_ITERATIONS = 5
+MAX_ITERATIONS = 2000
+
+BENCHMARKS = []
+
+
+def benchmark(name, group, max_payments=None, throughput=False, needs=None):
+    """Register ``setup(ctx) -> operation``.
+
+    The operation is timed per call. Throughput benchmarks return the
+    number of rows they handled, reported as rows per second. Benchmarks
+    are skipped on fixtures above ``max_payments`` or when the module in
+    ``needs`` is not installed.
+    """
+    def register(setup):
+        BENCHMARKS.append(dict(name=name, group=group, setup=setup, max_payments=max_payments,
+                               throughput=throughput, needs=needs))
+        return setup
+    return register
+
+
+class Context:
+    """A working copy of a fixture and deterministic sample inputs"""
+
+    def __init__(self, db, payments, workdir):
+        self.db = db
+        self.payments = payments
+        self.workdir = workdir
+        self.rng = random.Random(FIXTURE_SEED)
+        with db.pool.read_connection() as conn:
+            self.max_id = conn.execute("SELECT MAX(id) FROM payments").fetchone()[0] or 0
+            self.menu = conn.execute(
+                "SELECT id, price FROM menu_items WHERE available = 1 ORDER BY id LIMIT 20"
+            ).fetchall()
+        # A busy day, its month and a range that is not day-aligned
+        self.day = date(FIXTURE_END.year, FIXTURE_END.month, 14)
+        self.month = month_range(self.day)
+        self.unaligned = (f"{self.month[0]} 11:00:00", f"{self.month[1]} 14:00:00")
+
+    def random_id(self):
+        return self.rng.randint(1, self.max_id)
+
+    def random_ids(self, count):
+        return [self.random_id() for _ in range(count)]
+
+    def path(self, name):
+        return os.path.join(self.workdir, name)
+
+
+# --- Reads -----------------------------------------------------------------
+
+@benchmark("get_payments_page", "payments")
+def bench_first_page(ctx):
+    return lambda: ctx.db.get_payments_page()
+
+
+@benchmark("get_payments_page_deep", "payments")
+def bench_deep_page(ctx):
+    cursor = None
+    for _ in range(50):
+        _, cursor = ctx.db.get_payments_page(cursor)
+        if cursor is None:
+            break
+    return lambda: ctx.db.get_payments_page(cursor)
+
+
+@benchmark("get_payments_page_month", "payments")
+def bench_month_page(ctx):
+    return lambda: ctx.db.get_payments_page(None, start=ctx.month[0], end=ctx.month[1])
+
+
+@benchmark("get_payments_page_sorted_deep", "payments")
+def bench_sorted_deep_page(ctx):
+    # payment_method has a handful of values, the worst case for keyset paging
+    sort = ("payment_method", False)
+    cursor = None
+    for _ in range(50):
+        _, cursor = ctx.db.get_payments_page(cursor, sort=sort)
+        if cursor is None:
+            break
+    return lambda: ctx.db.get_payments_page(cursor, sort=sort)
+
+
+@benchmark("get_payments_page_sorted_month", "payments")
+def bench_sorted_month_page(ctx):
+    return lambda: ctx.db.get_payments_page(None, start=ctx.month[0], end=ctx.month[1],
+                                            sort=("total_amount", True))
+
+
+@benchmark("get_payments_by_ids", "payments")
+def bench_by_ids(ctx):
+    return lambda: ctx.db.get_payments_by_ids(ctx.random_ids(200))
+
+
+@benchmark("get_payments", "payments", max_payments=1000000, throughput=True)
+def bench_get_payments(ctx):
+    return lambda: len(ctx.db.get_payments())
+
+
+@benchmark("get_order_items", "payments")
+def bench_order_items(ctx):
+    return lambda: ctx.db.get_order_items(ctx.random_id())
+
+
+@benchmark("search_payments_page", "search")
+def bench_search_page(ctx):
+    return lambda: ctx.db.search_payments_page("santoso")
+
+
+@benchmark("search_payments_rare", "search")
+def bench_search_rare(ctx):
+    return lambda: ctx.db.search_payments_page("kambing seafood")
+
+
+@benchmark("search_payments_by_id", "search")
+def bench_search_id(ctx):
+    return lambda: ctx.db.search_payments(str(ctx.random_id()))
+
+
+@benchmark("search_customers", "search")
+def bench_search_customers(ctx):
+    return lambda: ctx.db.search_customers("hidayat")
+
+
+@benchmark("get_menu_items", "menu")
+def bench_menu_items(ctx):
+    return ctx.db.get_menu_items
+
+
+@benchmark("menu_cache_rebuild", "menu")
+def bench_menu_cache(ctx):
+    def operation():
+        ctx.db.invalidate_menu_cache()
+        return ctx.db.menu_cache()
+    return operation
+
+
+@benchmark("search_menu_items_page", "menu")
+def bench_menu_search(ctx):
+    return lambda: ctx.db.search_menu_items_page("goreng")
+
+
+@benchmark("get_daily_report", "reports")
+def bench_daily_report(ctx):
+    return lambda: ctx.db.get_daily_report(ctx.day)
+
+
+@benchmark("get_sales_report_month", "reports")
+def bench_month_report(ctx):
+    return lambda: ctx.db.get_sales_report(*ctx.month)
+
+
+@benchmark("get_sales_report_unaligned", "reports")
+def bench_unaligned_report(ctx):
+    return lambda: ctx.db.get_sales_report(*ctx.unaligned)
+
+
+@benchmark("get_payment_totals", "reports")
+def bench_totals(ctx):
+    return ctx.db.get_payment_totals
+
+
+@benchmark("get_daily_summary_month", "reports")
+def bench_daily_summary(ctx):
+    return lambda: ctx.db.get_daily_summary(*ctx.month)
+
+
+@benchmark("get_monthly_totals", "reports")
+def bench_monthly_totals(ctx):
+    return ctx.db.get_monthly_totals
+
+
+@benchmark("poll_external_changes_idle", "events")
+def bench_poll(ctx):
+    ctx.db.poll_external_changes()
+    return ctx.db.poll_external_changes
+
+
+# --- Writes ----------------------------------------------------------------
+
+@benchmark("add_payment", "writes")
+def bench_add_payment(ctx):
+    return lambda: ctx.db.add_payment("Bench", 25000, "Tunai", "bench")
+
+
+@benchmark("checkout", "writes")
+def bench_checkout(ctx):
+    items = [(ctx.menu[0][0], 2), (ctx.menu[-1][0], 1)]
+    return lambda: ctx.db.checkout("Bench", "QRIS", items)
+
+
+@benchmark("update_payment", "writes")
+def bench_update_payment(ctx):
+    return lambda: ctx.db.update_payment(ctx.random_id(), "Bench Update", 30000, "Tunai", "updated")
+
+
+@benchmark("delete_payment", "writes")
+def bench_delete_payment(ctx):
+    ids = list(range(1, ctx.max_id + 1, max(ctx.max_id // MAX_ITERATIONS, 1)))
+    ctx.rng.shuffle(ids)
+    return lambda: ctx.db.delete_payment(ids.pop()) if ids else None
+
+
+@benchmark("add_payments_bulk", "writes", throughput=True)
+def bench_bulk(ctx):
+    rows = [(f"Bulk {i}", 10000 + i, "Tunai", "Completed", f"{FIXTURE_END} 12:00:00")
+            for i in range(5000)]
+    return lambda: len(ctx.db.add_payments_bulk(rows))
+
+
+# --- Exports ---------------------------------------------------------------
+
+@benchmark("csv_export_month", "exports", throughput=True)
+def bench_csv_month(ctx):
+    return lambda: exporters.write_csv(ctx.path("month.csv"), exporters.PAYMENT_HEADERS,
+                                       ctx.db.iter_payments(*ctx.month))
+
+
+@benchmark("csv_export_all", "exports", max_payments=1000000, throughput=True)
+def bench_csv_all(ctx):
+    return lambda: exporters.write_csv(ctx.path("all.csv.gz"), exporters.PAYMENT_HEADERS,
+                                       ctx.db.iter_payments())
+
+
+@benchmark("xlsx_report_month", "exports", throughput=True)
+def bench_xlsx_month(ctx):
+    return lambda: exporters.export_report_xlsx(ctx.db, ctx.path("month.xlsx"), *ctx.month)
+
+
+@benchmark("parquet_export_full", "exports", max_payments=1000000, throughput=True, needs="pyarrow")
+def bench_parquet(ctx):
+    return lambda: exporters.export_parquet(ctx.db, ctx.path("parquet"), full=True)
+
+
+# --- Runner ----------------------------------------------------------------
+
+def fixture_path(size, fixtures_dir):
+    return os.path.join(fixtures_dir, f"payments-{size}-seed{FIXTURE_SEED}-v{FIXTURE_VERSION}.db")
+
+
+def check_fixture(db, size):
+    """Raise RuntimeError unless the orders use the requested menu and customers"""
+    sizes = FIXTURE_SIZES[size]
+    with db.pool.read_connection() as conn:
+        menu_items, available = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(available = 1), 0) FROM menu_items").fetchone()
+        customers = conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+        sold = conn.execute("SELECT COUNT(DISTINCT menu_item_id) FROM order_items").fetchone()[0]
+        buyers = conn.execute("SELECT COUNT(DISTINCT customer_id) FROM payments").fetchone()[0]
+    problems = []
+    if menu_items != sizes["menu_items"]:
+        problems.append(f"{menu_items} menu items instead of {sizes['menu_items']}")
+    if customers != sizes["customers"]:
+        problems.append(f"{customers} customers instead of {sizes['customers']}")
+    if sold != available:
+        problems.append(f"orders use {sold} of {available} available menu items")
+    if buyers < customers * FIXTURE_MIN_BUYER_SHARE:
+        problems.append(f"orders use {buyers} of {customers} customers")
+    if problems:
+        raise RuntimeError(f"{size} fixture is unrealistic: {'; '.join(problems)}")
+
+
+def build_fixture(size, fixtures_dir):
+    """Create the fixture for ``size`` unless it already exists"""
+    path = fixture_path(size, fixtures_dir)
+    if os.path.exists(path):
+        return path
+    os.makedirs(fixtures_dir, exist_ok=True)
+    partial = path + ".partial"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(partial + suffix):
+            os.remove(partial + suffix)
+
+    started = time.perf_counter()
+    print(f"building {size} fixture...", file=sys.stderr)
+    db = DatabaseManager(partial, profile="throughput", slow_query_ms=None)
+    try:
+        with db.bulk_load():
+            data_generator.generate(db, end=FIXTURE_END, seed=FIXTURE_SEED, **FIXTURE_SIZES[size])
+        check_fixture(db, size)
+        with db.pool.connection() as conn:
+            conn.execute("DELETE FROM row_changes")
+        db.pool.writer().execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        db.pool.writer().execute("ANALYZE").fetchall()
+    finally:
+        db.close_connection()
+    os.replace(partial, path)
+    print(f"built {path} in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    return path
+
+
+def measure(operation, throughput, time_budget):
+    """Time calls of ``operation`` and summarize them"""
+    operation()  # warm-up: caches, prepared statements
+    timings = []
+    rows = 0
+    started = time.perf_counter()
+    while len(timings) < MAX_ITERATIONS:
+        begin = time.perf_counter()
+        result = operation()
+        timings.append(time.perf_counter() - begin)
+        if throughput:
+            rows += result or 0
+        elapsed = time.perf_counter() - started
+        # Slow operations stop early rather than run MIN_ITERATIONS times
+        if elapsed >= time_budget and (len(timings) >= MIN_ITERATIONS or elapsed >= time_budget * 5):
+            break
+
+    timings.sort()
+    total = sum(timings)
+    result = {
+        "iterations": len(timings),
+        "mean_ms": round(total / len(timings) * 1000, 4),
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 4),
+        "min_ms": round(timings[0] * 1000, 4),
+        "ops_per_s": round(len(timings) / total, 2) if total else None,
+    }
+    if throughput:
+        result["rows_per_s"] = round(rows / total, 1) if total else None
+    return result
+
+
+def module_available(name):
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+
+def run_size(size, fixtures_dir, profile, name_filter, time_budget):
+    source = build_fixture(size, fixtures_dir)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "bench.db")
+        shutil.copyfile(source, db_path)
+        db = DatabaseManager(db_path, profile=profile, slow_query_ms=None)
+        try:
+            ctx = Context(db, FIXTURE_SIZES[size]["payments"], workdir)
+            for bench in BENCHMARKS:
+                name = bench["name"]
+                if name_filter and not any(part in name for part in name_filter):
+                    continue
+                if bench["max_payments"] is not None and ctx.payments > bench["max_payments"]:
+                    continue
+                if bench["needs"] and not module_available(bench["needs"]):
+                    print(f"  {name}: skipped ({bench['needs']} not installed)", file=sys.stderr)
+                    continue
+                result = measure(bench["setup"](ctx), bench["throughput"], time_budget)
+                result["group"] = bench["group"]
+                results[name] = result
+                print(f"  {size:>4} {name:<28} p50 {result['p50_ms']:10.3f} ms"
+                      f"  p95 {result['p95_ms']:10.3f} ms"
+                      + (f"  {result['rows_per_s']:,.0f} rows/s" if "rows_per_s" in result else ""),
+                      file=sys.stderr)
+        finally:
+            db.close_connection()
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Print the change against a baseline run; return the regressions.
+
+    Latency changes smaller than ``min_delta_ms`` never count, so timer
+    noise on sub-millisecond calls is not reported as a regression.
+    """
+    regressions = []
+    for size, benches in results["results"].items():
+        for name, result in benches.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if not old:
+                continue
+            if "rows_per_s" in result and old.get("rows_per_s"):
+                change = old["rows_per_s"] / result["rows_per_s"] - 1 if result["rows_per_s"] else float("inf")
+                metric = "rows/s"
+            elif old.get("p50_ms"):
+                change = result["p50_ms"] / old["p50_ms"] - 1
+                metric = "p50"
+            else:
+                continue
+            slower = change > threshold and (
+                metric != "p50" or result["p50_ms"] - old["p50_ms"] >= min_delta_ms
+            )
+            print(f"{'SLOWER' if slower else 'ok':>6}  {size:>4} {name:<28} {metric:<6} {change:+7.1%}",
+                  file=sys.stderr)
+            if slower:
+                regressions.append((size, name, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k",
+                        help=f"comma-separated fixture sizes: {', '.join(FIXTURE_SIZES)} (default: %(default)s)")
+    parser.add_argument("--filter", help="only benchmarks whose name contains one of these comma-separated words")
+    parser.add_argument("--profile", default="balanced", help="storage profile (default: %(default)s)")
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET,
+                        help="seconds per benchmark (default: %(default)s)")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--output", "-o", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown that counts as a regression (default: %(default)s)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.2,
+                        help="smallest p50 increase that counts as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in FIXTURE_SIZES]
+    if unknown:
+        parser.error(f"unknown size: {', '.join(unknown)}")
+    name_filter = [part.strip() for part in args.filter.split(",")] if args.filter else None
+
+    results = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "profile": args.profile,
+            "seed": FIXTURE_SEED,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        results["results"][size] = run_size(size, args.fixtures_dir, args.profile,
+                                             name_filter, args.time_budget)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold,
+                                  args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than the baseline by more than "
+                  f"{args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
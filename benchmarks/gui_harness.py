@@ -0,0 +1,272 @@
+# benchmarks/gui_harness.py - Offscreen timings of the main window on generated databases
+"""Measure the GUI against bench_db fixtures under the Qt offscreen platform.
+
+Every run starts the app in a fresh interpreter on a copy of a fixture
+and records, in milliseconds from the action to the next paint:
+
+* first paint and first tab ready after startup,
+* building each other tab on first activation,
+* payment and menu search, from keystroke to painted results (this
+  includes the search debounce),
+* F5 (refresh_all_data) with every tab built,
+
+plus the peak RSS of the process. Results use the bench_db JSON layout,
+so they can be compared against a baseline the same way; peak RSS has
+its own ``--rss-threshold``::
+
+    python benchmarks/gui_harness.py --sizes 10k,1m -o gui_baseline.json
+    python benchmarks/gui_harness.py --sizes 10k,1m --baseline gui_baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_db import FIXTURE_SIZES, FIXTURES_DIR, build_fixture, compare  # noqa: E402
+from query_stats import percentile  # noqa: E402
+
+# Search terms typed into the dock, one keystroke-to-render sample each
+PAYMENT_SEARCH_TERMS = ["santoso", "pratama", "rendang", "bungkus", "12345", "wibowo"]
+MENU_SEARCH_TERMS = ["goreng", "es", "ayam", "jus", "sambal", "kopi"]
+REFRESH_REPEATS = 5
+# Longest wait for an action to finish before the run fails
+ACTION_TIMEOUT = 120.0
+# Longest wait for the paint that follows a finished action
+PAINT_TIMEOUT = 1.0
+
+
+def run_child():
+    """Drive the app in this process and print one JSON line of timings"""
+    started = time.perf_counter()
+    from PyQt5.QtCore import QObject, QEvent
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    paints = []
+
+    class PaintRecorder(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                paints.append(time.perf_counter())
+            return False
+
+    recorder = PaintRecorder()
+    app.installEventFilter(recorder)
+
+    from restaurant_app import RestaurantPaymentApp
+    from widgets.search_executor import SEARCH_DEBOUNCE_MS
+
+    def wait_for(condition, what):
+        deadline = time.perf_counter() + ACTION_TIMEOUT
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"timed out waiting for {what}")
+            app.processEvents()
+            time.sleep(0.0005)
+        return time.perf_counter()
+
+    def painted_after(moment, what):
+        """Time of the first paint after ``moment``, processing events until it happens"""
+        deadline = time.perf_counter() + PAINT_TIMEOUT
+        while not any(paint > moment for paint in paints):
+            if time.perf_counter() > deadline:
+                # A timing without its paint would look like an instant render
+                raise TimeoutError(f"nothing was painted after {what}")
+            app.processEvents()
+        return min(paint for paint in paints if paint > moment)
+
+    def ms(begin, end):
+        return round((end - begin) * 1000, 3)
+
+    timings = {}
+    window = RestaurantPaymentApp()
+    window.resize(1600, 1000)
+    window.show()
+    first_paint = wait_for(lambda: paints, "first paint")
+    timings["first_paint"] = [ms(started, first_paint)]
+    ready = wait_for(lambda: window.pages["payment"].is_built(), "payment tab")
+    timings["first_tab_ready"] = [ms(started, painted_after(ready, "payment tab"))]
+
+    for name in ("menu", "report", "about"):
+        begin = time.perf_counter()
+        window.tabs.setCurrentWidget(window.pages[name])
+        built = wait_for(lambda: window.pages[name].is_built(), f"{name} tab")
+        timings[f"tab_{name}"] = [ms(begin, painted_after(built, f"{name} tab"))]
+    switched = time.perf_counter()
+    window.tabs.setCurrentWidget(window.pages["payment"])
+    painted_after(switched, "payment tab")
+
+    def time_searches(line_edit, tab, terms, key):
+        shown = []
+        original = tab.show_search_results
+
+        def recording(search_term, *results):
+            original(search_term, *results)
+            shown.append((search_term, time.perf_counter()))
+        tab.show_search_results = recording
+        samples = []
+        for term in terms:
+            begin = time.perf_counter()
+            line_edit.setText(term)
+            done = wait_for(lambda: shown and shown[-1][0] == term, f"search {term!r}")
+            samples.append(ms(begin, painted_after(done, f"search {term!r}")))
+        tab.show_search_results = original
+        line_edit.setText("")
+        timings[key] = samples
+
+    time_searches(window.global_search_input, window.payment_tab, PAYMENT_SEARCH_TERMS, "search_payments")
+    window.tabs.setCurrentWidget(window.pages["menu"])
+    time_searches(window.menu_search_input, window.menu_tab, MENU_SEARCH_TERMS, "search_menu")
+    window.tabs.setCurrentWidget(window.pages["payment"])
+
+    samples = []
+    for _ in range(REFRESH_REPEATS):
+        begin = time.perf_counter()
+        window.refresh_all_data()
+        samples.append(ms(begin, painted_after(time.perf_counter(), "refresh")))
+    timings["refresh_all_data"] = samples
+
+    import resource
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024
+
+    window.payment_search.shutdown()
+    window.menu_search.shutdown()
+    window.db_events.detach()
+    window.db_manager.close_connection()
+    print("GUI " + json.dumps({"timings": timings, "peak_rss_mb": round(peak_kb / 1024, 1),
+                               "search_debounce_ms": SEARCH_DEBOUNCE_MS}))
+
+
+def run_once(fixture, platform_name):
+    """Run the app once on a copy of ``fixture`` and return its timings"""
+    with tempfile.TemporaryDirectory() as workdir:
+        # The app opens restaurant_payment.db in its working directory
+        shutil.copyfile(fixture, os.path.join(workdir, "restaurant_payment.db"))
+        env = dict(os.environ, QT_QPA_PLATFORM=platform_name, RESTAURANT_SLOW_QUERY_MS="1000000")
+        process = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+    line = next((l for l in process.stdout.splitlines() if l.startswith("GUI ")), None)
+    if process.returncode != 0 or line is None:
+        sys.exit(f"GUI run failed:\n{process.stdout}\n{process.stderr}")
+    return json.loads(line[len("GUI "):])
+
+
+def summarize(runs):
+    """Merge the samples of several runs into bench_db style results"""
+    results = {}
+    for name in runs[0]["timings"]:
+        samples = sorted(sample for run in runs for sample in run["timings"][name])
+        results[name] = {
+            "iterations": len(samples),
+            "p50_ms": percentile(samples, 0.50),
+            "p95_ms": percentile(samples, 0.95),
+            "min_ms": samples[0],
+            "mean_ms": round(sum(samples) / len(samples), 3),
+        }
+    results["peak_rss"] = {"peak_rss_mb": max(run["peak_rss_mb"] for run in runs)}
+    return results
+
+
+def compare_rss(results, baseline, threshold):
+    """Print the peak RSS change against a baseline run; return the regressions"""
+    regressions = []
+    for size, benches in results["results"].items():
+        old = baseline.get("results", {}).get(size, {}).get("peak_rss", {}).get("peak_rss_mb")
+        if not old:
+            continue
+        change = benches["peak_rss"]["peak_rss_mb"] / old - 1
+        larger = change > threshold
+        print(f"{'LARGER' if larger else 'ok':>6}  {size:>4} {'peak_rss':<28} {'MB':<6} {change:+7.1%}",
+              file=sys.stderr)
+        if larger:
+            regressions.append((size, "peak_rss", change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--sizes", default="10k",
+                        help=f"comma-separated fixture sizes: {', '.join(FIXTURE_SIZES)} (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=3, help="app starts per size (default: %(default)s)")
+    parser.add_argument("--platform", default="offscreen", help="QT_QPA_PLATFORM (default: %(default)s)")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--output", "-o", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown that counts as a regression (default: %(default)s)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="smallest p50 increase that counts as a regression (default: %(default)s)")
+    parser.add_argument("--rss-threshold", type=float, default=0.15,
+                        help="peak RSS growth that counts as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child()
+        return 0
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in FIXTURE_SIZES]
+    if unknown:
+        parser.error(f"unknown size: {', '.join(unknown)}")
+
+    results = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qt_platform": args.platform,
+            "runs": args.runs,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        fixture = build_fixture(size, args.fixtures_dir)
+        runs = [run_once(fixture, args.platform) for _ in range(max(args.runs, 1))]
+        results["meta"]["search_debounce_ms"] = runs[0]["search_debounce_ms"]
+        results["results"][size] = summarize(runs)
+        for name, result in results["results"][size].items():
+            if "p50_ms" in result:
+                print(f"  {size:>4} {name:<20} p50 {result['p50_ms']:10.1f} ms"
+                      f"  p95 {result['p95_ms']:10.1f} ms", file=sys.stderr)
+        print(f"  {size:>4} {'peak RSS':<20} {results['results'][size]['peak_rss']['peak_rss_mb']:10.1f} MB",
+              file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        rss_regressions = compare_rss(results, baseline, args.rss_threshold)
+        if regressions:
+            print(f"{len(regressions)} measurement(s) slower than the baseline by more than "
+                  f"{args.threshold:.0%}", file=sys.stderr)
+        if rss_regressions:
+            print(f"peak RSS larger than the baseline by more than {args.rss_threshold:.0%}",
+                  file=sys.stderr)
+        if regressions or rss_regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
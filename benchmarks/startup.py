@@ -0,0 +1,144 @@
+# benchmarks/startup.py - Import time and wall-clock time to first paint
+"""Measure how long the cashier window takes to appear.
+
+Runs the app in a fresh interpreter with ``-X importtime`` (offscreen by
+default), records the time from interpreter start to the main window's
+first paint and to the first tab being ready, and prints the slowest
+imports. Exits with status 1 when a budget is exceeded, e.g.::
+
+    python benchmarks/startup.py --budget-ms 800 --import-budget-ms 400
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line of timings
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, ROOT)
+from PyQt5.QtCore import QObject, QEvent, QTimer
+from PyQt5.QtWidgets import QApplication
+app = QApplication([])
+t_qt = time.perf_counter()
+from restaurant_app import RestaurantPaymentApp
+t_import = time.perf_counter()
+times = {}
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and "first_paint" not in times:
+            times["first_paint"] = time.perf_counter()
+        return False
+
+window = RestaurantPaymentApp()
+paint_filter = FirstPaint()
+window.installEventFilter(paint_filter)
+window.show()
+
+def check():
+    if window.db_manager is not None and "first_paint" in times:
+        times["tab_ready"] = time.perf_counter()
+        app.quit()
+    else:
+        QTimer.singleShot(1, check)
+
+QTimer.singleShot(0, check)
+QTimer.singleShot(30000, app.quit)
+app.exec_()
+window.db_manager and window.db_manager.close_connection()
+
+ms = lambda t: round((t - t0) * 1000, 1)
+print("STARTUP " + json.dumps({
+    "qt_ms": ms(t_qt),
+    "app_import_ms": round((t_import - t_qt) * 1000, 1),
+    "first_paint_ms": ms(times.get("first_paint", t0)),
+    "tab_ready_ms": ms(times.get("tab_ready", t0)),
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """(self_us, cumulative_us, module) rows of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return rows
+
+
+def run_once(db_path, platform):
+    env = dict(os.environ, QT_QPA_PLATFORM=platform)
+    child = f"ROOT = {ROOT!r}\n" + CHILD
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", child],
+        cwd=os.path.dirname(db_path), env=env, capture_output=True, text=True
+    )
+    line = next((l for l in process.stdout.splitlines() if l.startswith("STARTUP ")), None)
+    if process.returncode != 0 or line is None:
+        sys.exit(f"startup run failed:\n{process.stdout}\n{process.stderr}")
+    return json.loads(line[len("STARTUP "):]), parse_importtime(process.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="database to open (default: fresh database in a temp dir)")
+    parser.add_argument("--runs", type=int, default=3, help="runs; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--platform", default="offscreen", help="QT_QPA_PLATFORM for the child")
+    parser.add_argument("--budget-ms", type=float, help="maximum time to first paint")
+    parser.add_argument("--import-budget-ms", type=float,
+                        help="maximum import time of restaurant_app and everything it pulls in")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, "restaurant_payment.db")
+        if args.db:
+            # The app opens restaurant_payment.db in its working directory
+            os.symlink(db_path, os.path.join(workdir, "restaurant_payment.db"))
+        # One untimed run creates the database and warms the file cache
+        run_once(os.path.join(workdir, "restaurant_payment.db"), args.platform)
+        runs = [run_once(os.path.join(workdir, "restaurant_payment.db"), args.platform)
+                for _ in range(max(args.runs, 1))]
+
+    timings, imports = min(runs, key=lambda run: run[0]["first_paint_ms"])
+    own = {name.strip() for _, _, name in imports}
+    app_import = next((cumulative for _, cumulative, name in imports
+                       if name.strip() == "restaurant_app"), 0)
+    result = dict(timings, restaurant_app_import_ms=round(app_import / 1000, 1),
+                  slowest_imports=[
+                      {"module": name.strip(), "cumulative_ms": round(cumulative / 1000, 1)}
+                      for _, cumulative, name in sorted(imports, key=lambda row: -row[1])[:args.top]
+                  ])
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Qt + QApplication     : {timings['qt_ms']:8.1f} ms")
+        print(f"import restaurant_app : {result['restaurant_app_import_ms']:8.1f} ms")
+        print(f"first paint           : {timings['first_paint_ms']:8.1f} ms")
+        print(f"first tab ready       : {timings['tab_ready_ms']:8.1f} ms")
+        print(f"\nSlowest imports (cumulative, {len(own)} modules):")
+        for entry in result["slowest_imports"]:
+            print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    failed = []
+    if args.budget_ms is not None and timings["first_paint_ms"] > args.budget_ms:
+        failed.append(f"first paint {timings['first_paint_ms']} ms > {args.budget_ms} ms")
+    if args.import_budget_ms is not None and result["restaurant_app_import_ms"] > args.import_budget_ms:
+        failed.append(f"import {result['restaurant_app_import_ms']} ms > {args.import_budget_ms} ms")
+    for message in failed:
+        print(f"OVER BUDGET: {message}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
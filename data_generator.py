@@ -0,0 +1,287 @@
+# data_generator.py - Deterministic synthetic restaurant data at any scale
+import random
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from itertools import accumulate, islice
+
+# Relative share of orders per hour of the day: lunch and dinner peaks
+HOUR_WEIGHTS = (
+    0, 0, 0, 0, 0, 0, 0.2, 1,       # 00-07
+    2, 2, 3, 8, 12, 9, 4, 3,        # 08-15
+    3, 5, 9, 11, 7, 3, 1, 0.2,      # 16-23
+)
+
+# Relative share of orders per weekday, Monday first: busier weekends
+WEEKDAY_WEIGHTS = (1.0, 0.9, 0.95, 1.0, 1.2, 1.6, 1.5)
+
+# Payment methods offered at checkout and how often each is used
+PAYMENT_METHOD_WEIGHTS = (
+    ("Tunai", 40), ("QRIS", 25), ("E-Wallet", 12),
+    ("Kartu Debit", 12), ("Kartu Kredit", 6), ("Transfer Bank", 5),
+)
+
+# Share of orders by walk-in guests without a customer record
+WALK_IN_SHARE = 0.35
+WALK_IN_NAME = "Pelanggan Umum"
+
+# Payments generated (and written) per round trip
+GENERATE_CHUNK_SIZE = 5000
+
+# The original sample menu comes first, so small catalogs stay familiar
+BASE_MENU = [
+    ("Nasi Gudeg", "Makanan Utama", 15000, "Nasi dengan gudeg khas Yogyakarta", 1),
+    ("Ayam Geprek", "Makanan Utama", 18000, "Ayam goreng geprek dengan sambal", 1),
+    ("Soto Ayam", "Makanan Utama", 12000, "Soto ayam dengan kuah bening", 1),
+    ("Gado-gado", "Makanan Utama", 10000, "Salad Indonesia dengan bumbu kacang", 1),
+    ("Es Teh Manis", "Minuman", 3000, "Teh manis dingin", 1),
+    ("Es Jeruk", "Minuman", 5000, "Jus jeruk segar", 1),
+    ("Kopi Hitam", "Minuman", 4000, "Kopi hitam panas", 1),
+    ("Kerupuk", "Tambahan", 2000, "Kerupuk renyah", 1),
+    ("Sambal Extra", "Tambahan", 1000, "Sambal pedas tambahan", 1),
+]
+
+# Building blocks for further menu items: (category, dishes, variants, price range)
+MENU_PARTS = [
+    ("Makanan Utama",
+     ["Nasi Goreng", "Mie Goreng", "Mie Ayam", "Ayam Bakar", "Ayam Penyet", "Bakso",
+      "Rawon", "Rendang", "Sate Ayam", "Sate Kambing", "Pecel Lele", "Nasi Uduk",
+      "Nasi Campur", "Ikan Bakar", "Capcay", "Kwetiau Goreng", "Sop Buntut", "Gulai Kambing"],
+     ["", "Spesial", "Pedas", "Jumbo", "Komplit", "Seafood", "Kampung"], (10000, 45000)),
+    ("Minuman",
+     ["Es Teh", "Teh Tarik", "Es Kopi Susu", "Kopi Susu", "Jus Alpukat", "Jus Mangga",
+      "Es Campur", "Es Cendol", "Wedang Jahe", "Air Mineral", "Es Kelapa Muda", "Susu Jahe"],
+     ["", "Besar", "Dingin", "Panas", "Tanpa Gula"], (3000, 20000)),
+    ("Tambahan",
+     ["Nasi Putih", "Telur Dadar", "Tempe Goreng", "Tahu Goreng", "Perkedel", "Emping",
+      "Lalapan", "Sambal Matah", "Sambal Bawang", "Kerupuk Udang"],
+     ["", "Extra", "Porsi Besar"], (1000, 8000)),
+    ("Camilan",
+     ["Pisang Goreng", "Tahu Isi", "Bakwan", "Cireng", "Roti Bakar", "Kentang Goreng",
+      "Martabak Mini", "Risoles"],
+     ["", "Keju", "Coklat", "Pedas"], (5000, 20000)),
+]
+
+FIRST_NAMES = [
+    "Andi", "Budi", "Citra", "Dewi", "Eko", "Fajar", "Gita", "Hadi", "Indah", "Joko",
+    "Kartika", "Lestari", "Made", "Nur", "Oki", "Putri", "Rina", "Sari", "Taufik", "Utami",
+    "Wahyu", "Yusuf", "Zahra", "Agus", "Bayu", "Dian", "Fitri", "Hendra", "Intan", "Rizky",
+]
+LAST_NAMES = [
+    "Pratama", "Saputra", "Wijaya", "Santoso", "Hidayat", "Nugroho", "Kurniawan", "Siregar",
+    "Lubis", "Nasution", "Setiawan", "Rahman", "Susanto", "Gunawan", "Hakim", "Purnama",
+    "Wibowo", "Harahap", "Simanjuntak", "Permana",
+]
+STREETS = ["Merdeka", "Sudirman", "Thamrin", "Gatot Subroto", "Diponegoro", "Ahmad Yani",
+           "Pemuda", "Pahlawan", "Veteran", "Gajah Mada"]
+ORDER_NOTES = ["", "", "", "", "", "", "Bungkus", "Tidak pedas", "Pedas", "Tanpa es",
+               "Makan di tempat", "Sambal dipisah"]
+
+
+def _zipf_cum_weights(count, exponent=1.0):
+    """Cumulative weights where item k is picked about 1/(k+1)**exponent as often"""
+    return list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(count)))
+
+
+class SyntheticDataGenerator:
+    """Deterministic generator of customers, menu items and payments.
+
+    The same seed, sizes, end date and weights always produce the same
+    rows, so benchmark fixtures can be rebuilt exactly. Payments are spread
+    over the ``days`` days up to and including ``end``: each day gets a
+    share proportional to its weekday weight, each order an hour drawn
+    from ``hour_weights``, and rows come out in order_date order.
+    """
+
+    def __init__(self, seed=42, hour_weights=HOUR_WEIGHTS, weekday_weights=WEEKDAY_WEIGHTS):
+        if len(hour_weights) != 24 or len(weekday_weights) != 7:
+            raise ValueError("hour_weights needs 24 values and weekday_weights 7")
+        if not any(hour_weights) or not any(weekday_weights):
+            raise ValueError("hour_weights and weekday_weights need a positive value")
+        self.seed = seed
+        self.hour_weights = tuple(hour_weights)
+        self.weekday_weights = tuple(weekday_weights)
+
+    def _random(self, stream):
+        """A separate random stream per kind of row, so changing one size
+        (say more payments) leaves the other tables unchanged"""
+        return random.Random(f"{self.seed}:{stream}")
+
+    def menu_items(self, count):
+        """``count`` menu rows as in MENU_BULK_COLUMNS, starting with BASE_MENU"""
+        rng = self._random("menu")
+        rows = list(BASE_MENU[:count])
+        names = {row[0] for row in rows}
+        combos = [(category, f"{dish} {variant}".strip(), price_range)
+                  for category, dishes, variants, price_range in MENU_PARTS
+                  for variant in variants for dish in dishes]
+        rng.shuffle(combos)
+
+        while len(rows) < count:
+            index = len(rows) - len(BASE_MENU)
+            category, name, (low, high) = combos[index % len(combos)]
+            if index >= len(combos) or name in names:
+                # Catalog exhausted: number further rounds
+                name = f"{name} #{index // len(combos) + 1}"
+            names.add(name)
+            price = rng.randrange(low, high + 1, 500)
+            available = 1 if rng.random() > 0.05 else 0
+            rows.append((name, category, price, f"{name} ala rumah makan", available))
+        return rows
+
+    def customers(self, count):
+        """``count`` customer rows as in CUSTOMER_BULK_COLUMNS"""
+        rng = self._random("customers")
+        for number in range(1, count + 1):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            yield (
+                f"{first} {last}",
+                f"08{rng.randrange(10 ** 9, 10 ** 10)}",
+                f"{first.lower()}.{last.lower()}{number}@email.com",
+                f"Jl. {rng.choice(STREETS)} No. {rng.randint(1, 200)}",
+            )
+
+    def daily_counts(self, total, days, end):
+        """Split ``total`` orders over the days ending at ``end`` by weekday weight"""
+        first = end - timedelta(days=days - 1)
+        day_list = [first + timedelta(days=offset) for offset in range(days)]
+        weights = [self.weekday_weights[day.weekday()] for day in day_list]
+        scale = total / sum(weights)
+        counts = [int(weight * scale) for weight in weights]
+
+        # Hand out the rounding remainder to the largest fractions
+        remainders = sorted(range(days), key=lambda i: (counts[i] - weights[i] * scale, i))
+        for i in remainders[:total - sum(counts)]:
+            counts[i] += 1
+        return list(zip(day_list, counts))
+
+    def order_times(self, rng, day, count):
+        """``count`` sorted 'YYYY-MM-DD HH:MM:SS' times on ``day``"""
+        hours = rng.choices(range(24), self.hour_weights, k=count)
+        seconds = sorted(hour * 3600 + rng.randrange(3600) for hour in hours)
+        midnight = datetime(day.year, day.month, day.day)
+        return [(midnight + timedelta(seconds=second)).strftime("%Y-%m-%d %H:%M:%S")
+                for second in seconds]
+
+    def orders(self, count, days, end, customers, menu):
+        """Yield ``(payment_row, lines)`` for ``count`` orders.
+
+        ``customers`` is a list of ``(id, name)`` and ``menu`` a list of
+        ``(id, name, category, price)`` of available items; each line is
+        ``(menu_item_id, name, quantity, unit_price, subtotal)``.
+        """
+        rng = self._random("payments")
+        by_category = {}
+        for item in menu:
+            by_category.setdefault(item[2], []).append(item)
+        # Per category, a few favourites sell far more than the rest
+        pickers = {category: (items, _zipf_cum_weights(len(items)))
+                   for category, items in by_category.items()}
+        customer_weights = _zipf_cum_weights(len(customers), 0.6) if customers else None
+        methods = [method for method, _ in PAYMENT_METHOD_WEIGHTS]
+        method_weights = list(accumulate(weight for _, weight in PAYMENT_METHOD_WEIGHTS))
+
+        def pick(category, k):
+            items, cum_weights = pickers[category]
+            return rng.choices(items, cum_weights=cum_weights, k=k)
+
+        # How many lines of each category a table of `guests` orders
+        plan = [
+            ("Makanan Utama", lambda guests: guests),
+            ("Minuman", lambda guests: guests if rng.random() < 0.85 else guests - 1),
+            ("Tambahan", lambda guests: min(rng.randint(0, guests), 2)),
+            ("Camilan", lambda guests: 1 if rng.random() < 0.2 else 0),
+        ]
+
+        for day, day_count in self.daily_counts(count, days, end):
+            for order_date in self.order_times(rng, day, day_count):
+                guests = rng.choices((1, 2, 3, 4, 5), (50, 30, 10, 7, 3))[0]
+                quantities = {}
+                for category, lines_for in plan:
+                    if category in pickers:
+                        for item in pick(category, max(lines_for(guests), 0)):
+                            quantities[item] = quantities.get(item, 0) + 1
+                if not quantities:
+                    # Menus without a main course: take anything
+                    quantities[rng.choice(menu)] = 1
+
+                lines = [(item[0], item[1], quantity, item[3], item[3] * quantity)
+                         for item, quantity in quantities.items()]
+                total = sum(line[4] for line in lines)
+
+                if customers and rng.random() >= WALK_IN_SHARE:
+                    customer_id, customer_name = customers[
+                        bisect_right(customer_weights, rng.random() * customer_weights[-1])
+                    ]
+                else:
+                    customer_id, customer_name = None, WALK_IN_NAME
+                method = rng.choices(methods, cum_weights=method_weights)[0]
+                payment = (customer_name, total, method, "Completed", order_date,
+                           rng.choice(ORDER_NOTES), customer_id)
+                yield payment, lines
+
+
+def generate(db_manager, payments=0, customers=0, menu_items=0, days=365, end=None,
+             seed=42, hour_weights=HOUR_WEIGHTS, weekday_weights=WEEKDAY_WEIGHTS,
+             progress=None, chunk_size=GENERATE_CHUNK_SIZE):
+    """Fill a database with synthetic customers, menu items and payments.
+
+    ``customers`` and ``menu_items`` are table sizes: rows are added until
+    the table holds that many, continuing the same seeded sequence, so
+    re-running is harmless. ``payments`` new payments (with order lines)
+    are then added, selling the available menu items to the customers in
+    the database, on the ``days`` days up to ``end`` (a date, default
+    today). Everything is written through the bulk insert methods in
+    chunks of ``chunk_size`` payments; ``progress(payments_written)`` is
+    called after every chunk. Returns the rows added per table; raises
+    RuntimeError if a bulk insert fails.
+    """
+    if days < 1:
+        raise ValueError("days must be at least 1")
+    generator = SyntheticDataGenerator(seed, hour_weights, weekday_weights)
+    end = end or date.today()
+    written = {"customers": 0, "menu_items": 0, "payments": 0, "order_items": 0}
+
+    def check(ids, table):
+        if ids is None:
+            raise RuntimeError(f"Gagal menulis data sintetis ke tabel {table}")
+        written[table] += len(ids)
+        return ids
+
+    # Read through the writer: inside bulk_load the rows written so far are
+    # not committed yet, so the reader connection would not see them
+    with db_manager.pool.connection() as conn:
+        menu_count = conn.execute("SELECT COUNT(*) FROM menu_items").fetchone()[0]
+        customer_count = conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+    if menu_items > menu_count:
+        check(db_manager.add_menu_items_bulk(generator.menu_items(menu_items)[menu_count:]),
+              "menu_items")
+    if customers > customer_count:
+        check(db_manager.add_customers_bulk(islice(generator.customers(customers), customer_count, None)),
+              "customers")
+    if not payments:
+        return written
+
+    with db_manager.pool.connection() as conn:
+        menu = conn.execute(
+            "SELECT id, name, category, price FROM menu_items WHERE available = 1 ORDER BY id"
+        ).fetchall()
+        customer_rows = conn.execute("SELECT id, name FROM customers ORDER BY id").fetchall()
+    if not menu:
+        raise RuntimeError("Tidak ada menu tersedia untuk transaksi sintetis")
+
+    orders = generator.orders(payments, days, end, customer_rows, menu)
+    while True:
+        chunk = list(islice(orders, chunk_size))
+        if not chunk:
+            break
+        payment_ids = check(db_manager.add_payments_bulk(
+            [payment for payment, _ in chunk], chunk_size=chunk_size
+        ), "payments")
+        check(db_manager.add_order_items_bulk(
+            [(payment_id, *line) for payment_id, (_, lines) in zip(payment_ids, chunk)
+             for line in lines],
+            chunk_size=chunk_size * 8
+        ), "order_items")
+        if progress is not None:
+            progress(written["payments"])
+    return written
@@ -1,281 +1,1600 @@
 # database/db_manager.py - Database Management
+import logging
 import sqlite3
-from datetime import datetime
+import re
+from datetime import datetime, date as date_type, timedelta
 import os
+import threading
+from contextlib import contextmanager
+from itertools import groupby, islice
+from db_pool import ConnectionPool
+from menu_cache import MenuCache
+from query_stats import (
+    DEFAULT_SLOW_QUERY_MS, QueryStats, TimedConnection, close_slow_query_log, open_slow_query_log,
+)
+
+logger = logging.getLogger(__name__)
+
+# Number of rows fetched per page by the table views
+DEFAULT_PAGE_SIZE = 200
+
+# Rows inserted per transaction by the bulk ingestion methods
+BULK_CHUNK_SIZE = 5000
+
+# Rows fetched per round trip when streaming a table out for export
+EXPORT_CHUNK_SIZE = 2000
+
+# Customers added by insert_sample_data to an empty database
+SAMPLE_CUSTOMERS = 4
+
+# Columns accepted by the bulk ingestion methods, in tuple order, with the
+# default used when a record leaves one out
+PAYMENT_BULK_COLUMNS = (
+    ("customer_name", None),
+    ("total_amount", None),
+    ("payment_method", None),
+    ("payment_status", "Completed"),
+    ("order_date", None),          # None means "now", like CURRENT_TIMESTAMP
+    ("notes", ""),
+    ("customer_id", None),
+)
+MENU_BULK_COLUMNS = (
+    ("name", None),
+    ("category", None),
+    ("price", None),
+    ("description", ""),
+    ("available", True),
+)
+CUSTOMER_BULK_COLUMNS = (
+    ("name", None),
+    ("phone", None),
+    ("email", None),
+    ("address", None),
+)
+ORDER_ITEM_BULK_COLUMNS = (
+    ("payment_id", None),
+    ("menu_item_id", None),
+    ("menu_item_name", None),
+    ("quantity", None),
+    ("unit_price", None),
+    ("subtotal", None),
+)
+
+# Columns of the payment rows shown in the grids, in tuple order
+PAYMENT_COLUMNS = (
+    "id", "customer_name", "total_amount", "payment_method",
+    "payment_status", "order_date", "notes",
+)
+
+# SQL ordering expression of every sortable payment column. The nullable
+# text columns sort NULL as '', since keyset cursors cannot compare NULL
+# (each backed by an index on the same expression).
+PAYMENT_NULLABLE_SORT_COLUMNS = ("payment_status", "notes")
+PAYMENT_SORT_EXPRESSIONS = {
+    column: f"COALESCE({column}, '')" if column in PAYMENT_NULLABLE_SORT_COLUMNS else column
+    for column in PAYMENT_COLUMNS
+}
+
+# Order of the payment pages when no column is sorted: newest first
+DEFAULT_PAYMENT_SORT = ("order_date", True)
+
+# Statements that add one payment row to, or remove it from, the daily_sales
+# rollup. "{row}" is "new" or "old" inside the rollup triggers.
+ROLLUP_ADD_ROW = """
+        INSERT INTO daily_sales (sale_date, payment_method, payment_status,
+                                 transactions, revenue, min_amount, max_amount)
+        VALUES (DATE({row}.order_date), {row}.payment_method, COALESCE({row}.payment_status, ''),
+                1, {row}.total_amount, {row}.total_amount, {row}.total_amount)
+        ON CONFLICT (sale_date, payment_method, payment_status) DO UPDATE SET
+            transactions = transactions + 1,
+            revenue = revenue + excluded.revenue,
+            min_amount = MIN(min_amount, excluded.min_amount),
+            max_amount = MAX(max_amount, excluded.max_amount);
+"""
+ROLLUP_REMOVE_ROW = """
+        UPDATE daily_sales SET
+            transactions = transactions - 1,
+            revenue = revenue - {row}.total_amount,
+            -- Only rescan the day's payments when the extreme itself went away
+            min_amount = CASE WHEN {row}.total_amount > min_amount THEN min_amount ELSE (
+                SELECT MIN(total_amount) FROM payments
+                WHERE payment_method = {row}.payment_method
+                  AND order_date >= DATE({row}.order_date)
+                  AND order_date < DATE({row}.order_date, '+1 day')
+                  AND COALESCE(payment_status, '') = COALESCE({row}.payment_status, '')) END,
+            max_amount = CASE WHEN {row}.total_amount < max_amount THEN max_amount ELSE (
+                SELECT MAX(total_amount) FROM payments
+                WHERE payment_method = {row}.payment_method
+                  AND order_date >= DATE({row}.order_date)
+                  AND order_date < DATE({row}.order_date, '+1 day')
+                  AND COALESCE(payment_status, '') = COALESCE({row}.payment_status, '')) END
+        WHERE sale_date = DATE({row}.order_date)
+          AND payment_method = {row}.payment_method
+          AND payment_status = COALESCE({row}.payment_status, '');
+        DELETE FROM daily_sales
+        WHERE sale_date = DATE({row}.order_date)
+          AND payment_method = {row}.payment_method
+          AND payment_status = COALESCE({row}.payment_status, '')
+          AND transactions <= 0;
+"""
+
+# Recompute the whole daily_sales rollup from payments
+ROLLUP_REBUILD = """
+    DELETE FROM daily_sales;
+    INSERT INTO daily_sales (sale_date, payment_method, payment_status,
+                             transactions, revenue, min_amount, max_amount)
+    SELECT DATE(order_date), payment_method, COALESCE(payment_status, ''),
+           COUNT(*), SUM(total_amount), MIN(total_amount), MAX(total_amount)
+    FROM payments
+    GROUP BY DATE(order_date), payment_method, COALESCE(payment_status, '');
+"""
+
+# Statements that refill the FTS5 search indexes from their source tables
+FTS_REBUILD = """
+    DELETE FROM payments_fts;
+    INSERT INTO payments_fts (rowid, customer_name, notes, items, contact)
+    SELECT p.id, p.customer_name, COALESCE(p.notes, ''),
+           COALESCE((SELECT group_concat(menu_item_name, ' ')
+                     FROM order_items WHERE payment_id = p.id), ''),
+           COALESCE((SELECT COALESCE(phone, '') || ' ' || COALESCE(email, '')
+                     FROM customers WHERE id = p.customer_id), '')
+    FROM payments p;
+
+    DELETE FROM customers_fts;
+    INSERT INTO customers_fts (rowid, name, phone, email)
+    SELECT id, name, COALESCE(phone, ''), COALESCE(email, '') FROM customers;
+"""
+
+# Appends one row_changes entry per written row; {op} is insert/update/delete
+ROW_CHANGE_TRIGGER = """
+    CREATE TRIGGER {table}_changes_{op} AFTER {event} ON {table} BEGIN
+        INSERT INTO row_changes (table_name, op, row_id) VALUES ('{table}', '{op}', {row}.id);
+    END;
+"""
+ROW_CHANGE_TABLES = ("payments", "menu_items")
+# Newest row_changes entries kept when the log is pruned
+ROW_CHANGES_KEPT = 100000
+# More pending changes than this are delivered as a reload, not row by row
+ROW_CHANGES_BATCH = 5000
+
+# Bumps the change counter of the 'YYYY-MM' month of {date}, an order_date
+# expression, for incremental exports
+MONTH_CHANGE_TOUCH = """
+        INSERT INTO month_changes (month, version) VALUES (substr({date}, 1, 7), 1)
+        ON CONFLICT (month) DO UPDATE SET version = version + 1;
+"""
+# Same for the month of the payment an order_items row belongs to
+MONTH_CHANGE_TOUCH_ITEM = """
+        INSERT INTO month_changes (month, version)
+        SELECT substr(order_date, 1, 7), 1 FROM payments WHERE id = {row}.payment_id
+        ON CONFLICT (month) DO UPDATE SET version = version + 1;
+"""
+# Marks every month with payments as changed
+MONTH_CHANGES_TOUCH_ALL = """
+    INSERT INTO month_changes (month, version)
+    SELECT DISTINCT substr(order_date, 1, 7), 1 FROM payments WHERE order_date IS NOT NULL
+    ON CONFLICT (month) DO UPDATE SET version = version + 1;
+"""
+
+# Schema migrations, applied in order. PRAGMA user_version records how many
+# have been applied, so existing databases are brought forward on startup.
+SCHEMA_MIGRATIONS = [
+    # 1: Base tables (IF NOT EXISTS so pre-migration databases adopt them)
+    """
+    CREATE TABLE IF NOT EXISTS menu_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        category TEXT NOT NULL,
+        price REAL NOT NULL,
+        description TEXT,
+        available BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS customers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        phone TEXT,
+        email TEXT,
+        address TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_id INTEGER,
+        customer_name TEXT NOT NULL,
+        total_amount REAL NOT NULL,
+        payment_method TEXT NOT NULL,
+        payment_status TEXT DEFAULT 'Completed',
+        order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        notes TEXT,
+        FOREIGN KEY (customer_id) REFERENCES customers (id)
+    );
+
+    CREATE TABLE IF NOT EXISTS order_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        payment_id INTEGER NOT NULL,
+        menu_item_id INTEGER NOT NULL,
+        menu_item_name TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price REAL NOT NULL,
+        subtotal REAL NOT NULL,
+        FOREIGN KEY (payment_id) REFERENCES payments (id),
+        FOREIGN KEY (menu_item_id) REFERENCES menu_items (id)
+    );
+    """,
+
+    # 2: Secondary indexes for date ordering, report filters and joins
+    """
+    CREATE INDEX IF NOT EXISTS idx_payments_order_date
+        ON payments (order_date);
+    CREATE INDEX IF NOT EXISTS idx_payments_method_date
+        ON payments (payment_method, order_date);
+    CREATE INDEX IF NOT EXISTS idx_order_items_payment
+        ON order_items (payment_id);
+    CREATE INDEX IF NOT EXISTS idx_order_items_menu_item
+        ON order_items (menu_item_id);
+    CREATE INDEX IF NOT EXISTS idx_menu_items_category_name
+        ON menu_items (category, name);
+    """,
+
+    # 3: FTS5 search index over payments (with item names and the linked
+    #    customer's contact details) and customers, kept in sync by triggers
+    """
+    CREATE INDEX IF NOT EXISTS idx_payments_customer
+        ON payments (customer_id);
+
+    CREATE VIRTUAL TABLE payments_fts USING fts5(
+        customer_name, notes, items, contact,
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+
+    CREATE VIRTUAL TABLE customers_fts USING fts5(
+        name, phone, email,
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+
+    """ + FTS_REBUILD + """
+
+    CREATE TRIGGER payments_fts_insert AFTER INSERT ON payments BEGIN
+        INSERT INTO payments_fts (rowid, customer_name, notes, items, contact)
+        VALUES (new.id, new.customer_name, COALESCE(new.notes, ''), '',
+                COALESCE((SELECT COALESCE(phone, '') || ' ' || COALESCE(email, '')
+                          FROM customers WHERE id = new.customer_id), ''));
+    END;
+
+    CREATE TRIGGER payments_fts_update
+    AFTER UPDATE OF customer_name, notes, customer_id ON payments BEGIN
+        UPDATE payments_fts
+        SET customer_name = new.customer_name,
+            notes = COALESCE(new.notes, ''),
+            contact = COALESCE((SELECT COALESCE(phone, '') || ' ' || COALESCE(email, '')
+                                FROM customers WHERE id = new.customer_id), '')
+        WHERE rowid = new.id;
+    END;
+
+    CREATE TRIGGER payments_fts_delete AFTER DELETE ON payments BEGIN
+        DELETE FROM payments_fts WHERE rowid = old.id;
+    END;
+
+    CREATE TRIGGER order_items_fts_insert AFTER INSERT ON order_items BEGIN
+        UPDATE payments_fts
+        SET items = (SELECT group_concat(menu_item_name, ' ')
+                     FROM order_items WHERE payment_id = new.payment_id)
+        WHERE rowid = new.payment_id;
+    END;
+
+    CREATE TRIGGER order_items_fts_update
+    AFTER UPDATE OF payment_id, menu_item_name ON order_items BEGIN
+        UPDATE payments_fts
+        SET items = COALESCE((SELECT group_concat(menu_item_name, ' ')
+                              FROM order_items WHERE payment_id = rowid), '')
+        WHERE rowid IN (old.payment_id, new.payment_id);
+    END;
+
+    CREATE TRIGGER order_items_fts_delete AFTER DELETE ON order_items BEGIN
+        UPDATE payments_fts
+        SET items = COALESCE((SELECT group_concat(menu_item_name, ' ')
+                              FROM order_items WHERE payment_id = old.payment_id), '')
+        WHERE rowid = old.payment_id;
+    END;
+
+    CREATE TRIGGER customers_fts_insert AFTER INSERT ON customers BEGIN
+        INSERT INTO customers_fts (rowid, name, phone, email)
+        VALUES (new.id, new.name, COALESCE(new.phone, ''), COALESCE(new.email, ''));
+    END;
+
+    CREATE TRIGGER customers_fts_update
+    AFTER UPDATE OF name, phone, email ON customers BEGIN
+        UPDATE customers_fts
+        SET name = new.name, phone = COALESCE(new.phone, ''), email = COALESCE(new.email, '')
+        WHERE rowid = new.id;
+        UPDATE payments_fts
+        SET contact = COALESCE(new.phone, '') || ' ' || COALESCE(new.email, '')
+        WHERE rowid IN (SELECT id FROM payments WHERE customer_id = new.id);
+    END;
+
+    CREATE TRIGGER customers_fts_delete AFTER DELETE ON customers BEGIN
+        DELETE FROM customers_fts WHERE rowid = old.id;
+    END;
+    """,
+
+    # 4: daily_sales rollup (day x method x status), maintained by triggers
+    """
+    CREATE TABLE daily_sales (
+        sale_date TEXT NOT NULL,
+        payment_method TEXT NOT NULL,
+        payment_status TEXT NOT NULL,
+        transactions INTEGER NOT NULL,
+        revenue REAL NOT NULL,
+        min_amount REAL,
+        max_amount REAL,
+        PRIMARY KEY (sale_date, payment_method, payment_status)
+    ) WITHOUT ROWID;
+    """ + ROLLUP_REBUILD + f"""
+    CREATE TRIGGER daily_sales_insert AFTER INSERT ON payments BEGIN
+        {ROLLUP_ADD_ROW.format(row="new")}
+    END;
+
+    CREATE TRIGGER daily_sales_update
+    AFTER UPDATE OF order_date, payment_method, payment_status, total_amount ON payments BEGIN
+        {ROLLUP_REMOVE_ROW.format(row="old")}
+        {ROLLUP_ADD_ROW.format(row="new")}
+    END;
+
+    CREATE TRIGGER daily_sales_delete AFTER DELETE ON payments BEGIN
+        {ROLLUP_REMOVE_ROW.format(row="old")}
+    END;
+    """,
+
+    # 5: row_changes log read by other processes sharing the database file
+    """
+    CREATE TABLE row_changes (
+        seq INTEGER PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        op TEXT NOT NULL,
+        row_id INTEGER NOT NULL
+    );
+    """ + "".join(
+        ROW_CHANGE_TRIGGER.format(table=table, op=op, event=event, row=row)
+        for table in ROW_CHANGE_TABLES
+        for op, event, row in (("insert", "INSERT", "new"),
+                               ("update", "UPDATE", "new"),
+                               ("delete", "DELETE", "old"))
+    ),
+
+    # 6: Indexes for sorting the payments grid by any column; an index on
+    #    (column) also holds the rowid, so it serves ORDER BY column, id
+    """
+    CREATE INDEX IF NOT EXISTS idx_payments_customer_name
+        ON payments (customer_name);
+    CREATE INDEX IF NOT EXISTS idx_payments_total_amount
+        ON payments (total_amount);
+    CREATE INDEX IF NOT EXISTS idx_payments_method
+        ON payments (payment_method);
+    CREATE INDEX IF NOT EXISTS idx_payments_status
+        ON payments (COALESCE(payment_status, ''));
+    CREATE INDEX IF NOT EXISTS idx_payments_notes
+        ON payments (COALESCE(notes, ''));
+    """,
+
+    # 7: Per-month change counters, so incremental exports find every month
+    #    whose payments or order lines were written since the last export
+    """
+    CREATE TABLE month_changes (
+        month TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    """ + MONTH_CHANGES_TOUCH_ALL + f"""
+    CREATE TRIGGER month_changes_payment_insert AFTER INSERT ON payments BEGIN
+        {MONTH_CHANGE_TOUCH.format(date="new.order_date")}
+    END;
+
+    CREATE TRIGGER month_changes_payment_update AFTER UPDATE ON payments BEGIN
+        {MONTH_CHANGE_TOUCH.format(date="old.order_date")}
+        {MONTH_CHANGE_TOUCH.format(date="new.order_date")}
+    END;
+
+    CREATE TRIGGER month_changes_payment_delete AFTER DELETE ON payments BEGIN
+        {MONTH_CHANGE_TOUCH.format(date="old.order_date")}
+    END;
+
+    CREATE TRIGGER month_changes_item_insert AFTER INSERT ON order_items BEGIN
+        {MONTH_CHANGE_TOUCH_ITEM.format(row="new")}
+    END;
+
+    CREATE TRIGGER month_changes_item_update AFTER UPDATE ON order_items BEGIN
+        {MONTH_CHANGE_TOUCH_ITEM.format(row="old")}
+        {MONTH_CHANGE_TOUCH_ITEM.format(row="new")}
+    END;
+
+    CREATE TRIGGER month_changes_item_delete AFTER DELETE ON order_items BEGIN
+        {MONTH_CHANGE_TOUCH_ITEM.format(row="old")}
+    END;
+    """,
+
+    # 8: Fix order_items_fts_update, whose subquery matched order_items.rowid
+    #    instead of the payment being updated, and repair the stored items
+    """
+    DROP TRIGGER order_items_fts_update;
+
+    CREATE TRIGGER order_items_fts_update
+    AFTER UPDATE OF payment_id, menu_item_name ON order_items BEGIN
+        UPDATE payments_fts
+        SET items = COALESCE((SELECT group_concat(menu_item_name, ' ')
+                              FROM order_items WHERE payment_id = old.payment_id), '')
+        WHERE rowid = old.payment_id;
+        UPDATE payments_fts
+        SET items = COALESCE((SELECT group_concat(menu_item_name, ' ')
+                              FROM order_items WHERE payment_id = new.payment_id), '')
+        WHERE rowid = new.payment_id;
+    END;
+    """ + FTS_REBUILD,
+]
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+
+# Storage profiles: connection PRAGMAs that are always applied together.
+# All use WAL so readers never block the checkout writer; they differ in how
+# many fsyncs a commit costs and how much memory SQLite may use.
+#   durable    - fsync on every commit, survives power loss
+#   balanced   - fsync at checkpoints only; a power cut may lose the last
+#                commits but never corrupts the database
+#   throughput - no fsync at all, for bulk loads and benchmark fixtures
+STORAGE_PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8192,          # KiB
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,         # ms
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32768,
+        "mmap_size": 128 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -131072,
+        "mmap_size": 512 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+}
+DEFAULT_STORAGE_PROFILE = os.environ.get("RESTAURANT_DB_PROFILE", "balanced")
+
+
+def fts_query(search_term):
+    """Turn free text into an FTS5 query where every word matches as a prefix"""
+    words = re.findall(r"\w+", search_term)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _as_date(value):
+    """Accept a date, datetime or 'YYYY-MM-DD' string and return a date"""
+    if value is None:
+        return datetime.now().date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def day_range(day=None):
+    """Half-open ``[start, end)`` bounds covering one day"""
+    start = _as_date(day)
+    return start.isoformat(), (start + timedelta(days=1)).isoformat()
+
+
+def week_range(day=None):
+    """Half-open ``[start, end)`` bounds of the Monday-based week containing a day"""
+    start = _as_date(day)
+    start -= timedelta(days=start.weekday())
+    return start.isoformat(), (start + timedelta(days=7)).isoformat()
+
+
+def month_range(day=None):
+    """Half-open ``[start, end)`` bounds of the calendar month containing a day"""
+    start = _as_date(day).replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start.isoformat(), end.isoformat()
+
+
+def payment_sort_key(row, sort):
+    """Keyset cursor ``(value, id)`` of a payment row under ``(field, descending)``,
+    with NULL as '' for the columns PAYMENT_SORT_EXPRESSIONS coalesces"""
+    value = row[PAYMENT_COLUMNS.index(sort[0])]
+    if value is None and sort[0] in PAYMENT_NULLABLE_SORT_COLUMNS:
+        value = ""
+    return value, row[0]
+
+
+def is_interrupted(error):
+    """Whether a statement was aborted by its connection's progress handler.
+
+    Only searches superseded by a newer one are interrupted this way (see
+    SearchExecutor); the paging methods re-raise these instead of logging.
+    """
+    return isinstance(error, sqlite3.OperationalError) and str(error) == "interrupted"
+
+
+def slow_query_log_path(db_name):
+    """Rotating slow-query log kept next to the database file"""
+    return os.path.splitext(db_name)[0] + ".slow.log"
 
 
 class DatabaseManager:
-    def __init__(self, db_name="restaurant_payment.db"):
+    def __init__(self, db_name="restaurant_payment.db", initialize=True, profile=None,
+                 slow_query_ms=DEFAULT_SLOW_QUERY_MS):
         self.db_name = db_name
-        self.connection = None
-        self.cursor = None
+        self.profile = profile or DEFAULT_STORAGE_PROFILE
+        if self.profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile: {self.profile}")
+        self.pool = None
+        # Latency of every statement; slow ones go to <db>.slow.log
+        self.query_stats = QueryStats(slow_query_ms)
+        self._slow_log = None
+        if slow_query_ms is not None and db_name != ":memory:":
+            if open_slow_query_log(slow_query_log_path(db_name)) is not None:
+                self._slow_log = slow_query_log_path(db_name)
+        # Callbacks told about committed writes: listener(table, op, ids)
+        self._change_listeners = []
+        # Set inside bulk_load, which reports one "reload" instead of every row
+        self._bulk_loading = False
+        # High-water marks of poll_external_changes, set on the first poll
+        self._data_version = None
+        self._change_seq = None
+        # Menu snapshot, rebuilt on first use after every menu_items write
+        self._menu_cache = None
+        self._menu_generation = 0
+        self._menu_lock = threading.Lock()
         self.connect()
-        self.create_tables()
-        self.insert_sample_data()
+        # Secondary managers (e.g. on worker threads) skip schema setup
+        if initialize:
+            self.migrate_schema()
+            self.insert_sample_data()
+            self.prune_row_changes()
 
     def connect(self):
-        """Connect to SQLite database"""
-        try:
-            self.connection = sqlite3.connect(self.db_name)
-            self.cursor = self.connection.cursor()
-            # Enable foreign key support
-            self.cursor.execute("PRAGMA foreign_keys = ON")
-            self.connection.commit()
-        except sqlite3.Error as e:
-            print(f"Database connection error: {e}")
-
-    def create_tables(self):
-        """Create all necessary tables"""
-        try:
-            # Menu items table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS menu_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    description TEXT,
-                    available BOOLEAN DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Customers table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS customers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    phone TEXT,
-                    email TEXT,
-                    address TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Payments table
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS payments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    customer_id INTEGER,
-                    customer_name TEXT NOT NULL,
-                    total_amount REAL NOT NULL,
-                    payment_method TEXT NOT NULL,
-                    payment_status TEXT DEFAULT 'Completed',
-                    order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    notes TEXT,
-                    FOREIGN KEY (customer_id) REFERENCES customers (id)
-                )
-            """)
-
-            # Order items table (for detailed order tracking)
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS order_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    payment_id INTEGER NOT NULL,
-                    menu_item_id INTEGER NOT NULL,
-                    menu_item_name TEXT NOT NULL,
-                    quantity INTEGER NOT NULL,
-                    unit_price REAL NOT NULL,
-                    subtotal REAL NOT NULL,
-                    FOREIGN KEY (payment_id) REFERENCES payments (id),
-                    FOREIGN KEY (menu_item_id) REFERENCES menu_items (id)
-                )
-            """)
+        """Create the connection pool for the SQLite database"""
+        self.pool = ConnectionPool(self.db_name, configure=self._configure_connection,
+                                   factory=TimedConnection)
+        try:
+            # Open the calling thread's connection now to surface errors early
+            self.pool.writer()
+        except sqlite3.Error as e:
+            logger.error("Database connection error: %s", e)
 
-            self.connection.commit()
+    @property
+    def connection(self):
+        """The calling thread's read-write connection"""
+        return self.pool.writer()
+
+    def _configure_connection(self, connection):
+        """Prepare every pooled connection: timing, foreign keys and storage profile"""
+        connection.query_stats = self.query_stats
+        # Enable foreign key support
+        connection.execute("PRAGMA foreign_keys = ON")
+        for pragma, value in STORAGE_PROFILES[self.profile].items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+
+    def apply_storage_profile(self, profile):
+        """Switch storage profile; open connections are reconfigured lazily.
+
+        Connections already handed out are closed, so every thread picks up
+        the new PRAGMAs on its next query.
+        """
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile: {profile}")
+        self.profile = profile
+        self.pool.close_all()
+
+    def get_storage_info(self):
+        """Report the active storage profile and the PRAGMA values in effect"""
+        info = {"profile": self.profile}
+        try:
+            with self.pool.read_connection() as conn:
+                for pragma in STORAGE_PROFILES[self.profile]:
+                    row = conn.execute(f"PRAGMA {pragma}").fetchone()
+                    info[pragma] = row[0] if row else None
         except sqlite3.Error as e:
-            print(f"Error creating tables: {e}")
+            logger.error("Error reading storage settings: %s", e)
+        return info
+
+    def get_schema_version(self):
+        """Get the number of schema migrations applied to this database"""
+        with self.pool.read_connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate_schema(self):
+        """Apply pending schema migrations.
+
+        Each migration runs in its own transaction together with the
+        ``PRAGMA user_version`` bump, so a failed migration leaves the
+        database at the previous version. Once the schema is current this
+        is a single pragma read and no DDL runs at all.
+        """
+        conn = self.pool.writer()
+        try:
+            version = self.get_schema_version()
+            for number in range(version + 1, SCHEMA_VERSION + 1):
+                conn.executescript(
+                    f"BEGIN;\n{SCHEMA_MIGRATIONS[number - 1]}\n"
+                    f"PRAGMA user_version = {number};\nCOMMIT;"
+                )
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error("Error migrating schema: %s", e)
 
     def insert_sample_data(self):
-        """Insert sample data if tables are empty"""
-        try:
-            # Check if menu items already exist
-            self.cursor.execute("SELECT COUNT(*) FROM menu_items")
-            if self.cursor.fetchone()[0] == 0:
-                sample_menu = [
-                    ("Nasi Gudeg", "Makanan Utama", 15000, "Nasi dengan gudeg khas Yogyakarta", 1),
-                    ("Ayam Geprek", "Makanan Utama", 18000, "Ayam goreng geprek dengan sambal", 1),
-                    ("Soto Ayam", "Makanan Utama", 12000, "Soto ayam dengan kuah bening", 1),
-                    ("Gado-gado", "Makanan Utama", 10000, "Salad Indonesia dengan bumbu kacang", 1),
-                    ("Es Teh Manis", "Minuman", 3000, "Teh manis dingin", 1),
-                    ("Es Jeruk", "Minuman", 5000, "Jus jeruk segar", 1),
-                    ("Kopi Hitam", "Minuman", 4000, "Kopi hitam panas", 1),
-                    ("Kerupuk", "Tambahan", 2000, "Kerupuk renyah", 1),
-                    ("Sambal Extra", "Tambahan", 1000, "Sambal pedas tambahan", 1)
-                ]
-
-                self.cursor.executemany("""
-                    INSERT INTO menu_items (name, category, price, description, available)
-                    VALUES (?, ?, ?, ?, ?)
-                """, sample_menu)
-
-            # Check if customers already exist
-            self.cursor.execute("SELECT COUNT(*) FROM customers")
-            if self.cursor.fetchone()[0] == 0:
-                sample_customers = [
-                    ("John Doe", "081234567890", "john@email.com", "Jl. Merdeka No. 1"),
-                    ("Jane Smith", "081234567891", "jane@email.com", "Jl. Sudirman No. 2"),
-                    ("Ahmad Rahman", "081234567892", "ahmad@email.com", "Jl. Thamrin No. 3"),
-                    ("Siti Nurhaliza", "081234567893", "siti@email.com", "Jl. Gatot Subroto No. 4")
-                ]
-
-                self.cursor.executemany("""
-                    INSERT INTO customers (name, phone, email, address)
-                    VALUES (?, ?, ?, ?)
-                """, sample_customers)
+        """Seed empty menu and customer tables with sample rows"""
+        try:
+            with self.pool.read_connection() as conn:
+                menu_empty = conn.execute("SELECT COUNT(*) FROM menu_items").fetchone()[0] == 0
+                customers_empty = conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0] == 0
+            if not (menu_empty or customers_empty):
+                return
+
+            from data_generator import BASE_MENU, generate
+            generate(self, menu_items=len(BASE_MENU) if menu_empty else 0,
+                     customers=SAMPLE_CUSTOMERS if customers_empty else 0)
+        except (sqlite3.Error, RuntimeError) as e:
+            logger.error("Error inserting sample data: %s", e)
 
-            self.connection.commit()
+    def add_change_listener(self, listener):
+        """Call ``listener(table, op, ids)`` after every committed write.
+
+        ``op`` is "insert", "update" or "delete" and ``ids`` lists the
+        affected row ids. Listeners run on the thread that made the write,
+        after its transaction has committed. poll_external_changes also
+        sends "reload" (with no ids) when too much changed to patch rows.
+        """
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        """Stop sending change notifications to a listener"""
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def _notify(self, table, op, ids):
+        """Tell the change listeners about a write once it has committed"""
+        if self._bulk_loading:
+            return
+        ids = list(ids)
+        if ids:
+            self.pool.after_commit(lambda: self._dispatch(table, op, ids))
+
+    def _dispatch(self, table, op, ids):
+        if table == "menu_items":
+            self.invalidate_menu_cache()
+        for listener in list(self._change_listeners):
+            try:
+                listener(table, op, ids)
+            except Exception as e:
+                logger.exception("Error in change listener: %s", e)
+
+    def poll_external_changes(self):
+        """Deliver writes committed through other connections since the last poll.
+
+        While nothing changed this is a single ``PRAGMA data_version`` read.
+        Otherwise the row_changes entries past the last seen ``seq`` are
+        passed to the change listeners in log order, or as one "reload" per
+        table when the backlog is too large to patch row by row. Writes made
+        by this manager show up here as well, so listeners must apply
+        changes idempotently. Poll from a single thread; returns True when
+        anything was delivered.
+        """
+        try:
+            with self.pool.read_connection() as conn:
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if version == self._data_version:
+                    return False
+
+                newest = conn.execute("SELECT MAX(seq) FROM row_changes").fetchone()[0] or 0
+                last = self._change_seq
+                if last is None or newest <= last:
+                    changes = []
+                elif newest - last > ROW_CHANGES_BATCH:
+                    changes = None
+                else:
+                    changes = conn.execute("""
+                        SELECT table_name, op, row_id FROM row_changes
+                        WHERE seq > ? AND seq <= ?
+                        ORDER BY seq
+                    """, (last, newest)).fetchall()
+        except sqlite3.Error as e:
+            # Keep the old marks so the next poll fetches these changes again
+            logger.error("Error polling for changes: %s", e)
+            return False
+        self._data_version = version
+        self._change_seq = newest
+        if last is None or newest <= last:
+            return False
+
+        if changes is None:
+            for table in ROW_CHANGE_TABLES:
+                self._dispatch(table, "reload", [])
+        else:
+            for (table, op), group in groupby(changes, key=lambda change: change[:2]):
+                self._dispatch(table, op, [change[2] for change in group])
+        return True
+
+    def prune_row_changes(self, keep=ROW_CHANGES_KEPT):
+        """Drop all but the newest ``keep`` entries of the row_changes log"""
+        try:
+            with self.pool.connection() as conn:
+                conn.execute("""
+                    DELETE FROM row_changes
+                    WHERE seq <= (SELECT MAX(seq) FROM row_changes) - ?
+                """, (keep,))
         except sqlite3.Error as e:
-            print(f"Error inserting sample data: {e}")
+            logger.error("Error pruning change log: %s", e)
+
+    def _changed_ids(self, cursor, row_id):
+        """The id list to report for a single-row UPDATE or DELETE"""
+        return [row_id] if cursor.rowcount > 0 else []
+
+    def menu_cache(self):
+        """Get the cached menu, reading menu_items only after it has changed.
+
+        The table is read through the calling thread's reader connection.
+        Raises sqlite3.Error if it cannot be read.
+        """
+        cache = self._menu_cache
+        if cache is not None:
+            return cache
+
+        with self._menu_lock:
+            if self._menu_cache is not None:
+                return self._menu_cache
+            generation = self._menu_generation
+            with self.pool.read_connection() as conn:
+                cache = MenuCache(conn.execute("""
+                    SELECT id, name, category, price, description, available
+                    FROM menu_items
+                """).fetchall())
+            # Keep it unless a write was committed while it was being read
+            if generation == self._menu_generation:
+                self._menu_cache = cache
+            return cache
+
+    def invalidate_menu_cache(self):
+        """Drop the cached menu; the next lookup reads menu_items again"""
+        with self._menu_lock:
+            self._menu_generation += 1
+            self._menu_cache = None
 
     def get_menu_items(self):
         """Get all menu items"""
         try:
-            self.cursor.execute("""
-                SELECT id, name, category, price, description, available
-                FROM menu_items
-                ORDER BY category, name
-            """)
-            return self.cursor.fetchall()
+            return list(self.menu_cache().rows)
+        except sqlite3.Error as e:
+            logger.error("Error fetching menu items: %s", e)
+            return []
+
+    def get_menu_item(self, item_id):
+        """Get one menu item by id, or None"""
+        try:
+            return self.menu_cache().get(item_id)
+        except sqlite3.Error as e:
+            logger.error("Error fetching menu item: %s", e)
+            return None
+
+    def get_menu_items_by_category(self, category):
+        """Get the menu items of one category, ordered by name"""
+        try:
+            return self.menu_cache().in_category(category)
         except sqlite3.Error as e:
-            print(f"Error fetching menu items: {e}")
+            logger.error("Error fetching menu category: %s", e)
             return []
 
+    def find_menu_items_by_name(self, name):
+        """Get the menu items with exactly this name, ignoring case"""
+        try:
+            return self.menu_cache().find_by_name(name)
+        except sqlite3.Error as e:
+            logger.error("Error finding menu items: %s", e)
+            return []
+
+    def get_menu_items_page(self, cursor=None, page_size=DEFAULT_PAGE_SIZE, sort=None):
+        """Get one page of menu items ordered by category and name.
+
+        ``cursor`` is the ``(category, name, id)`` of the last row already
+        seen, or None for the first page. Returns ``(rows, next_cursor)``.
+        ``sort`` is a ``(column, descending)`` pair from MENU_COLUMNS to
+        order by instead (see MenuCache.page).
+        """
+        try:
+            return self.menu_cache().page(cursor, page_size, sort=sort)
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            logger.error("Error fetching menu items page: %s", e)
+            return [], None
+
+    def get_menu_items_by_ids(self, ids):
+        """Get the menu items with the given ids, in no particular order"""
+        try:
+            cache = self.menu_cache()
+        except sqlite3.Error as e:
+            logger.error("Error fetching menu items: %s", e)
+            return []
+        return [cache.by_id[item_id] for item_id in ids if item_id in cache.by_id]
+
+    def search_menu_items_page(self, search_term, cursor=None, page_size=DEFAULT_PAGE_SIZE,
+                               sort=None):
+        """Get one page of menu items whose name or category matches"""
+        try:
+            return self.menu_cache().page(cursor, page_size, search_term, sort)
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            logger.error("Error searching menu items page: %s", e)
+            return [], None
+
     def add_menu_item(self, name, category, price, description="", available=True):
         """Add new menu item"""
         try:
-            self.cursor.execute("""
-                INSERT INTO menu_items (name, category, price, description, available)
-                VALUES (?, ?, ?, ?, ?)
-            """, (name, category, price, description, available))
-            self.connection.commit()
+            with self.pool.connection() as conn:
+                cursor = conn.execute("""
+                    INSERT INTO menu_items (name, category, price, description, available)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (name, category, price, description, available))
+                self._notify("menu_items", "insert", [cursor.lastrowid])
             return True
         except sqlite3.Error as e:
-            print(f"Error adding menu item: {e}")
+            logger.error("Error adding menu item: %s", e)
             return False
 
     def update_menu_item(self, item_id, name, category, price, description="", available=True):
         """Update menu item"""
         try:
-            self.cursor.execute("""
-                UPDATE menu_items
-                SET name=?, category=?, price=?, description=?, available=?
-                WHERE id=?
-            """, (name, category, price, description, available, item_id))
-            self.connection.commit()
+            with self.pool.connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE menu_items
+                    SET name=?, category=?, price=?, description=?, available=?
+                    WHERE id=?
+                """, (name, category, price, description, available, item_id))
+                self._notify("menu_items", "update", self._changed_ids(cursor, item_id))
+            return True
+        except sqlite3.Error as e:
+            logger.error("Error updating menu item: %s", e)
+            return False
+
+    def set_menu_item_available(self, item_id, available):
+        """Put a menu item on or take it off the menu"""
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.execute("UPDATE menu_items SET available=? WHERE id=?",
+                                      (available, item_id))
+                self._notify("menu_items", "update", self._changed_ids(cursor, item_id))
             return True
         except sqlite3.Error as e:
-            print(f"Error updating menu item: {e}")
+            logger.error("Error updating menu item: %s", e)
+            return False
+
+    def is_menu_item_sold(self, item_id):
+        """Whether any order line refers to the menu item (it cannot be deleted then)"""
+        try:
+            with self.pool.read_connection() as conn:
+                return conn.execute(
+                    "SELECT EXISTS (SELECT 1 FROM order_items WHERE menu_item_id = ?)", (item_id,)
+                ).fetchone()[0] == 1
+        except sqlite3.Error as e:
+            logger.error("Error checking menu item sales: %s", e)
             return False
 
     def delete_menu_item(self, item_id):
-        """Delete menu item"""
+        """Delete menu item.
+
+        Fails (returns False) for items that have been sold, since their
+        order lines keep referring to them; take those off the menu with
+        set_menu_item_available instead.
+        """
         try:
-            self.cursor.execute("DELETE FROM menu_items WHERE id=?", (item_id,))
-            self.connection.commit()
+            with self.pool.connection() as conn:
+                cursor = conn.execute("DELETE FROM menu_items WHERE id=?", (item_id,))
+                self._notify("menu_items", "delete", self._changed_ids(cursor, item_id))
             return True
         except sqlite3.Error as e:
-            print(f"Error deleting menu item: {e}")
+            logger.error("Error deleting menu item: %s", e)
             return False
 
     def add_payment(self, customer_name, total_amount, payment_method, notes=""):
         """Add new payment record"""
         try:
-            self.cursor.execute("""
-                INSERT INTO payments (customer_name, total_amount, payment_method, notes)
-                VALUES (?, ?, ?, ?)
-            """, (customer_name, total_amount, payment_method, notes))
-            self.connection.commit()
-            return self.cursor.lastrowid
+            with self.pool.connection() as conn:
+                cursor = conn.execute("""
+                    INSERT INTO payments (customer_name, total_amount, payment_method, notes)
+                    VALUES (?, ?, ?, ?)
+                """, (customer_name, total_amount, payment_method, notes))
+                self._notify("payments", "insert", [cursor.lastrowid])
+            return cursor.lastrowid
         except sqlite3.Error as e:
-            print(f"Error adding payment: {e}")
+            logger.error("Error adding payment: %s", e)
+            return None
+
+    def checkout(self, customer_name, payment_method, items, notes="", customer_id=None):
+        """Record an order: the payment and all its line items in one commit.
+
+        ``items`` is an iterable of ``(menu_item_id, quantity)``. Names and
+        unit prices are snapshotted from the menu cache and the payment
+        total is the sum of the line subtotals. Items that are not
+        available cannot be ordered. Returns the new payment id, or None on
+        error (nothing is written then).
+        """
+        items = [(int(menu_item_id), int(quantity)) for menu_item_id, quantity in items]
+        if not items or any(quantity <= 0 for _, quantity in items):
+            logger.error("Error during checkout: order needs at least one item with a positive quantity")
+            return None
+
+        try:
+            # Names and prices come from the menu cache; an item deleted
+            # meanwhile still fails the order_items foreign key below
+            menu = self.menu_cache()
+            missing = sorted({menu_item_id for menu_item_id, _ in items
+                              if menu.get(menu_item_id) is None})
+            if missing:
+                raise sqlite3.IntegrityError(f"Unknown menu item(s): {missing}")
+            unavailable = sorted({menu_item_id for menu_item_id, _ in items
+                                  if not menu.get(menu_item_id)[5]})
+            if unavailable:
+                raise sqlite3.IntegrityError(f"Menu item(s) not available: {unavailable}")
+
+            lines = []
+            for menu_item_id, quantity in items:
+                _, name, _, price, _, _ = menu.get(menu_item_id)
+                lines.append((menu_item_id, name, quantity, price, price * quantity))
+            total_amount = sum(line[4] for line in lines)
+
+            with self.pool.connection() as conn:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+
+                cursor = conn.execute("""
+                    INSERT INTO payments (customer_id, customer_name, total_amount, payment_method, notes)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (customer_id, customer_name, total_amount, payment_method, notes))
+                payment_id = cursor.lastrowid
+
+                conn.executemany("""
+                    INSERT INTO order_items (payment_id, menu_item_id, menu_item_name,
+                                             quantity, unit_price, subtotal)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [(payment_id, *line) for line in lines])
+                self._notify("payments", "insert", [payment_id])
+            return payment_id
+        except sqlite3.Error as e:
+            logger.error("Error during checkout: %s", e)
+            return None
+
+    def get_order_items(self, payment_id):
+        """Get the line items of a payment"""
+        try:
+            with self.pool.read_connection() as conn:
+                return conn.execute("""
+                    SELECT id, menu_item_id, menu_item_name, quantity, unit_price, subtotal
+                    FROM order_items
+                    WHERE payment_id = ?
+                    ORDER BY id
+                """, (payment_id,)).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Error fetching order items: %s", e)
+            return []
+
+    def add_payments_bulk(self, records, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many payments and return their new ids in input order.
+
+        ``records`` may be any iterable or generator of dicts keyed by the
+        names in PAYMENT_BULK_COLUMNS, or of tuples in that column order
+        (trailing columns may be left out). Rows are written with
+        executemany in transactions of ``chunk_size`` rows, so a whole chunk
+        costs one commit. Returns None on error; chunks committed before
+        the error are kept.
+        """
+        now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+        def normalize(record):
+            row = self._bulk_row(record, PAYMENT_BULK_COLUMNS)
+            if row[4] is None:
+                row[4] = now
+            return row
+
+        return self._insert_bulk("payments", PAYMENT_BULK_COLUMNS,
+                                 map(normalize, records), chunk_size)
+
+    def add_menu_items_bulk(self, records, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many menu items and return their new ids in input order.
+
+        Accepts dicts or tuples as described in MENU_BULK_COLUMNS; see
+        add_payments_bulk for the batching rules.
+        """
+        rows = (self._bulk_row(record, MENU_BULK_COLUMNS) for record in records)
+        return self._insert_bulk("menu_items", MENU_BULK_COLUMNS, rows, chunk_size)
+
+    def add_customers_bulk(self, records, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many customers and return their new ids in input order.
+
+        Accepts dicts or tuples as described in CUSTOMER_BULK_COLUMNS; see
+        add_payments_bulk for the batching rules.
+        """
+        rows = (self._bulk_row(record, CUSTOMER_BULK_COLUMNS) for record in records)
+        return self._insert_bulk("customers", CUSTOMER_BULK_COLUMNS, rows, chunk_size)
+
+    def add_order_items_bulk(self, records, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many order lines and return their new ids in input order.
+
+        Accepts dicts or tuples as described in ORDER_ITEM_BULK_COLUMNS;
+        see add_payments_bulk for the batching rules. Unlike checkout, the
+        lines are stored as given: payment totals are not recomputed.
+        """
+        rows = (self._bulk_row(record, ORDER_ITEM_BULK_COLUMNS) for record in records)
+        return self._insert_bulk("order_items", ORDER_ITEM_BULK_COLUMNS, rows, chunk_size)
+
+    def _bulk_row(self, record, columns):
+        """Turn a dict or (possibly short) tuple into a full column list.
+
+        Missing required values stay None and are rejected by the NOT NULL
+        constraints when the chunk is inserted.
+        """
+        if isinstance(record, dict):
+            return [record.get(name, default) for name, default in columns]
+        return list(record) + [default for _, default in columns[len(record):]]
+
+    def _insert_bulk(self, table, columns, rows, chunk_size):
+        """executemany rows into table in chunked transactions, returning ids.
+
+        Each chunk holds the write lock from BEGIN IMMEDIATE to COMMIT and
+        the tables use AUTOINCREMENT, so a chunk's ids are the consecutive
+        run ending at the table's sqlite_sequence value.
+        """
+        names = ", ".join(name for name, _ in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        query = f"INSERT INTO {table} ({names}) VALUES ({placeholders})"
+
+        ids = []
+        try:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                with self.pool.connection() as conn:
+                    if not conn.in_transaction:
+                        conn.execute("BEGIN IMMEDIATE")
+                    conn.executemany(query, chunk)
+                    last_id = conn.execute(
+                        "SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)
+                    ).fetchone()[0]
+                    chunk_ids = range(last_id - len(chunk) + 1, last_id + 1)
+                    self._notify(table, "insert", chunk_ids)
+                ids.extend(chunk_ids)
+            return ids
+        except sqlite3.Error as e:
+            logger.error("Error bulk inserting into %s: %s", table, e)
             return None
 
     def get_payments(self):
         """Get all payment records"""
         try:
-            self.cursor.execute("""
-                SELECT id, customer_name, total_amount, payment_method, 
-                       payment_status, order_date, notes
-                FROM payments
-                ORDER BY order_date DESC
-            """)
-            return self.cursor.fetchall()
+            with self.pool.read_connection() as conn:
+                return conn.execute("""
+                    SELECT id, customer_name, total_amount, payment_method, 
+                           payment_status, order_date, notes
+                    FROM payments
+                    ORDER BY order_date DESC
+                """).fetchall()
         except sqlite3.Error as e:
-            print(f"Error fetching payments: {e}")
+            logger.error("Error fetching payments: %s", e)
             return []
 
+    def iter_payments(self, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield payment records newest first, optionally within ``[start, end)``.
+
+        Rows are pulled from a single cursor ``chunk_size`` at a time, so
+        memory use does not grow with the table and the whole iteration
+        sees one consistent snapshot. Raises sqlite3.Error on failure.
+        """
+        conditions, params = self._date_range_conditions(start, end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        for rows in self._iter_chunks(f"""
+            SELECT id, customer_name, total_amount, payment_method,
+                   payment_status, order_date, notes
+            FROM payments
+            {where}
+            ORDER BY order_date DESC, id DESC
+        """, params, chunk_size):
+            yield from rows
+
+    def iter_payment_chunks(self, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield every payment column in lists of up to ``chunk_size`` rows.
+
+        Rows are ``(id, customer_id, customer_name, total_amount,
+        payment_method, payment_status, order_date, notes)`` in date order,
+        optionally within ``[start, end)``; meant for columnar exports.
+        """
+        conditions, params = self._date_range_conditions(start, end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        yield from self._iter_chunks(f"""
+            SELECT id, customer_id, customer_name, total_amount,
+                   payment_method, payment_status, order_date, notes
+            FROM payments
+            {where}
+            ORDER BY order_date, id
+        """, params, chunk_size)
+
+    def iter_order_item_chunks(self, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield order items with their payment's order_date in lists of rows.
+
+        Rows are ``(id, payment_id, menu_item_id, menu_item_name, quantity,
+        unit_price, subtotal, order_date)`` for payments within ``[start, end)``.
+        """
+        conditions, params = self._date_range_conditions(start, end)
+        conditions = [f"p.{condition}" for condition in conditions]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        yield from self._iter_chunks(f"""
+            SELECT oi.id, oi.payment_id, oi.menu_item_id, oi.menu_item_name,
+                   oi.quantity, oi.unit_price, oi.subtotal, p.order_date
+            FROM payments p
+            JOIN order_items oi ON oi.payment_id = p.id
+            {where}
+            ORDER BY p.order_date, p.id, oi.id
+        """, params, chunk_size)
+
+    def _iter_chunks(self, query, params, chunk_size):
+        """Run a query on the read connection and yield fetchmany() chunks"""
+        with self.pool.read_connection() as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+    def get_payments_by_ids(self, ids):
+        """Get the payment records with the given ids, in no particular order"""
+        return self._rows_by_ids("""
+            SELECT id, customer_name, total_amount, payment_method,
+                   payment_status, order_date, notes
+            FROM payments
+        """, ids)
+
+    def get_payments_page(self, cursor=None, page_size=DEFAULT_PAGE_SIZE, start=None, end=None,
+                          sort=None):
+        """Get one page of payment records, newest first.
+
+        ``cursor`` is the ``(order_date, id)`` of the last row already seen,
+        or None for the first page. Returns ``(rows, next_cursor)`` where
+        ``next_cursor`` is None when there are no more rows. ``start`` and
+        ``end`` optionally limit the page to ``start <= order_date < end``.
+        ``sort`` is a ``(column, descending)`` pair from PAYMENT_COLUMNS to
+        order by instead; the cursor is then the ``(value, id)`` of that
+        column (see payment_sort_key).
+        """
+        conditions, params = self._date_range_conditions(start, end)
+        try:
+            return self._payments_page(conditions, params, cursor, page_size, sort)
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            logger.error("Error fetching payments page: %s", e)
+            return [], None
+
+    def search_payments_page(self, search_term, cursor=None, page_size=DEFAULT_PAGE_SIZE,
+                             sort=None):
+        """Get one page of payments matching the search, best match first.
+
+        Every word must match, as a prefix, the customer name, notes, ordered
+        item names or the linked customer's phone/email (via payments_fts).
+        A numeric term also matches the transaction ID exactly; that row is
+        listed first. ``cursor`` is the ``(rank, id)`` of the last row seen,
+        or the ``(value, id)`` of the sorted column when ``sort`` is given
+        (as for get_payments_page).
+        """
+        match = fts_query(search_term)
+        exact_id = int(search_term) if search_term.strip().isdigit() else None
+        try:
+            rows = []
+            if cursor is None and exact_id is not None:
+                with self.pool.read_connection() as conn:
+                    rows = conn.execute("""
+                        SELECT id, customer_name, total_amount, payment_method,
+                               payment_status, order_date, notes
+                        FROM payments
+                        WHERE id = ?
+                    """, (exact_id,)).fetchall()
+
+            if not match:
+                return rows, None
+
+            if sort is not None:
+                # Ordered by a payments column, so rank is not needed
+                conditions = ["id IN (SELECT rowid FROM payments_fts WHERE payments_fts MATCH ?)"]
+                params = [match]
+                if exact_id is not None:
+                    conditions.append("id != ?")
+                    params.append(exact_id)
+                page, next_cursor = self._payments_page(conditions, params, cursor, page_size, sort)
+                return rows + page, next_cursor
+
+            conditions = ["payments_fts MATCH ?"]
+            params = [match]
+            if exact_id is not None:
+                conditions.append("p.id != ?")
+                params.append(exact_id)
+            if cursor is not None:
+                conditions.append("(f.rank, p.id) > (?, ?)")
+                params.extend(cursor)
+
+            page, next_cursor = self._fetch_page(f"""
+                SELECT p.id, p.customer_name, p.total_amount, p.payment_method,
+                       p.payment_status, p.order_date, p.notes, f.rank
+                FROM payments_fts f
+                JOIN payments p ON p.id = f.rowid
+                WHERE {' AND '.join(conditions)}
+                ORDER BY f.rank, p.id
+                LIMIT ?
+            """, params, page_size, lambda row: (row[7], row[0]))
+            return rows + [row[:7] for row in page], next_cursor
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            logger.error("Error searching payments page: %s", e)
+            return [], None
+
+    def _date_range_conditions(self, start, end):
+        """Build index-friendly ``[start, end)`` predicates on order_date.
+
+        The column is compared directly (never wrapped in DATE()) so the
+        order_date index can serve the range.
+        """
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("order_date >= ?")
+            params.append(str(start))
+        if end is not None:
+            conditions.append("order_date < ?")
+            params.append(str(end))
+        return conditions, params
+
+    def _payments_page(self, conditions, params, cursor, page_size, sort=None):
+        """Run a keyset-paginated payments query with the given filters.
+
+        Rows are ordered by ``sort`` (DEFAULT_PAYMENT_SORT when None) with
+        the id as tie-breaker, so every column pages through its index.
+        """
+        column, descending = sort = sort or DEFAULT_PAYMENT_SORT
+        if column not in PAYMENT_SORT_EXPRESSIONS:
+            raise ValueError(f"Cannot sort payments by {column!r}")
+        expression = PAYMENT_SORT_EXPRESSIONS[column]
+        direction = "DESC" if descending else "ASC"
+        columns = """id, customer_name, total_amount, payment_method,
+                   payment_status, order_date, notes"""
+
+        def select(extra, order_by, output=columns):
+            where = " AND ".join([*conditions, *extra])
+            return f"""
+                SELECT {output}
+                FROM payments
+                {f"WHERE {where}" if where else ""}
+                ORDER BY {order_by}
+                LIMIT ?
+            """
+
+        if cursor is None:
+            query = select([], f"{expression} {direction}, id {direction}")
+            return self._fetch_page(query, params, page_size, lambda row: payment_sort_key(row, sort))
+
+        # A (value, id) > (?, ?) row value only seeks the index on value, so
+        # a page deep inside a run of equal values (a payment method, say)
+        # would scan the whole run. Seek the rest of the run and the values
+        # after it separately, then merge the two short lists.
+        operator = "<" if descending else ">"
+        limit = page_size + 1
+        keyed = f"{columns}, {expression} AS sort_value"
+        query = f"""
+            SELECT {columns} FROM (
+                SELECT * FROM ({select([f"{expression} = ?", f"id {operator} ?"],
+                                       f"id {direction}", keyed)})
+                UNION ALL
+                SELECT * FROM ({select([f"{expression} {operator} ?"],
+                                       f"{expression} {direction}, id {direction}", keyed)})
+            )
+            ORDER BY sort_value {direction}, id {direction}
+            LIMIT ?
+        """
+        params = [*params, *cursor, limit, *params, cursor[0], limit]
+        return self._fetch_page(query, params, page_size, lambda row: payment_sort_key(row, sort))
+
+    def _rows_by_ids(self, query, ids):
+        """Run ``query`` restricted to the given ids, in batches of 500"""
+        ids = list(ids)
+        rows = []
+        try:
+            with self.pool.read_connection() as conn:
+                for first in range(0, len(ids), 500):
+                    batch = ids[first:first + 500]
+                    placeholders = ", ".join("?" for _ in batch)
+                    rows.extend(conn.execute(
+                        f"{query} WHERE id IN ({placeholders})", batch
+                    ).fetchall())
+        except sqlite3.Error as e:
+            logger.error("Error fetching rows by id: %s", e)
+        return rows
+
+    def _fetch_page(self, query, params, page_size, cursor_of):
+        """Fetch one page plus one look-ahead row to know if more remain.
+
+        ``cursor_of(row)`` builds the continuation cursor from the last row.
+        """
+        with self.pool.read_connection() as conn:
+            rows = conn.execute(query, (*params, page_size + 1)).fetchall()
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return rows, cursor_of(rows[-1])
+        return rows, None
+
+    def get_payment_totals(self):
+        """Get transaction count and revenue over all payments"""
+        count, revenue, _ = self.get_sales_report()
+        return count, revenue
+
     def update_payment(self, payment_id, customer_name, total_amount, payment_method, notes=""):
-        """Update payment record"""
-        try:
-            self.cursor.execute("""
-                UPDATE payments
-                SET customer_name=?, total_amount=?, payment_method=?, notes=?
-                WHERE id=?
-            """, (customer_name, total_amount, payment_method, notes, payment_id))
-            self.connection.commit()
+        """Update payment record.
+
+        A payment with line items keeps the sum of its lines as total;
+        ``total_amount`` only applies to payments recorded without items.
+        """
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE payments
+                    SET customer_name=?, payment_method=?, notes=?,
+                        total_amount=COALESCE((SELECT SUM(subtotal) FROM order_items
+                                               WHERE payment_id = payments.id), ?)
+                    WHERE id=?
+                """, (customer_name, payment_method, notes, total_amount, payment_id))
+                self._notify("payments", "update", self._changed_ids(cursor, payment_id))
             return True
         except sqlite3.Error as e:
-            print(f"Error updating payment: {e}")
+            logger.error("Error updating payment: %s", e)
             return False
 
     def delete_payment(self, payment_id):
         """Delete payment record"""
         try:
-            self.cursor.execute("DELETE FROM payments WHERE id=?", (payment_id,))
-            self.connection.commit()
+            with self.pool.connection() as conn:
+                conn.execute("DELETE FROM order_items WHERE payment_id=?", (payment_id,))
+                cursor = conn.execute("DELETE FROM payments WHERE id=?", (payment_id,))
+                self._notify("payments", "delete", self._changed_ids(cursor, payment_id))
             return True
         except sqlite3.Error as e:
-            print(f"Error deleting payment: {e}")
+            logger.error("Error deleting payment: %s", e)
             return False
 
-    def search_payments(self, search_term):
-        """Search payments by customer name or ID"""
+    def search_payments(self, search_term, limit=None):
+        """Search payments by customer name, notes, items or ID, best match first.
+
+        Returns every match unless ``limit`` is given; the table views use
+        search_payments_page instead so large results are read as scrolled.
+        """
+        rows, cursor = self.search_payments_page(search_term, page_size=limit or DEFAULT_PAGE_SIZE)
+        while cursor is not None and (limit is None or len(rows) < limit):
+            page, cursor = self.search_payments_page(search_term, cursor)
+            rows.extend(page)
+        return rows if limit is None else rows[:limit]
+
+    def search_customers(self, search_term, limit=DEFAULT_PAGE_SIZE):
+        """Search customers by name, phone or email prefix, best match first"""
+        match = fts_query(search_term)
+        if not match:
+            return []
         try:
-            self.cursor.execute("""
-                SELECT id, customer_name, total_amount, payment_method, 
-                       payment_status, order_date, notes
-                FROM payments
-                WHERE customer_name LIKE ? OR id LIKE ?
-                ORDER BY order_date DESC
-            """, (f"%{search_term}%", f"%{search_term}%"))
-            return self.cursor.fetchall()
+            with self.pool.read_connection() as conn:
+                return conn.execute("""
+                    SELECT c.id, c.name, c.phone, c.email, c.address
+                    FROM customers_fts f
+                    JOIN customers c ON c.id = f.rowid
+                    WHERE customers_fts MATCH ?
+                    ORDER BY f.rank
+                    LIMIT ?
+                """, (match, limit)).fetchall()
         except sqlite3.Error as e:
-            print(f"Error searching payments: {e}")
+            logger.error("Error searching customers: %s", e)
             return []
 
     def search_menu_items(self, search_term):
         """Search menu items by name"""
         try:
-            self.cursor.execute("""
-                SELECT id, name, category, price, description, available
-                FROM menu_items
-                WHERE name LIKE ? OR category LIKE ?
-                ORDER BY category, name
-            """, (f"%{search_term}%", f"%{search_term}%"))
-            return self.cursor.fetchall()
+            return self.menu_cache().search(search_term)
         except sqlite3.Error as e:
-            print(f"Error searching menu items: {e}")
+            logger.error("Error searching menu items: %s", e)
             return []
 
     def get_daily_report(self, date=None):
         """Get daily sales report"""
-        if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
+        return self.get_sales_report(*day_range(date))
+
+    def get_sales_report(self, start=None, end=None):
+        """Get sales report for payments with ``start <= order_date < end``.
+
+        Returns ``(total_transactions, total_revenue, avg_transaction)``.
+        Whole-day ranges are answered from the daily_sales rollup; ranges
+        with a time of day fall back to the payments table.
+        """
         try:
-            self.cursor.execute("""
-                SELECT COUNT(*) as total_transactions,
-                       SUM(total_amount) as total_revenue,
-                       AVG(total_amount) as avg_transaction
-                FROM payments
-                WHERE DATE(order_date) = ?
-            """, (date,))
-            return self.cursor.fetchone()
+            with self.pool.read_connection() as conn:
+                if self._is_day_bound(start) and self._is_day_bound(end):
+                    conditions, params = self._sale_date_conditions(start, end)
+                    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                    count, revenue = conn.execute(f"""
+                        SELECT COALESCE(SUM(transactions), 0), COALESCE(SUM(revenue), 0)
+                        FROM daily_sales
+                        {where}
+                    """, params).fetchone()
+                    return count, revenue, revenue / count if count else 0
+
+                conditions, params = self._date_range_conditions(start, end)
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                return conn.execute(f"""
+                    SELECT COUNT(*) as total_transactions,
+                           COALESCE(SUM(total_amount), 0) as total_revenue,
+                           COALESCE(AVG(total_amount), 0) as avg_transaction
+                    FROM payments
+                    {where}
+                """, params).fetchone()
         except sqlite3.Error as e:
-            print(f"Error getting daily report: {e}")
+            logger.error("Error getting sales report: %s", e)
             return (0, 0, 0)
 
+    def get_daily_summary(self, start=None, end=None):
+        """Get per-day, per-payment-method totals, optionally within ``[start, end)``.
+
+        Whole-day ranges are read from the daily_sales rollup, so the cost
+        depends on the number of days, not on the number of payments.
+        Ranges with a time of day are summed from the payments table, like
+        get_sales_report, so both agree on every range.
+        """
+        if self._is_day_bound(start) and self._is_day_bound(end):
+            conditions, params = self._sale_date_conditions(start, end)
+            source = """
+                SELECT sale_date, transactions, revenue, payment_method
+                FROM daily_sales
+            """
+        else:
+            conditions, params = self._date_range_conditions(start, end)
+            source = """
+                SELECT DATE(order_date) as sale_date, 1 as transactions,
+                       total_amount as revenue, payment_method
+                FROM payments
+            """
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            with self.pool.read_connection() as conn:
+                return conn.execute(f"""
+                    SELECT
+                        sale_date as tanggal,
+                        SUM(transactions) as total_transaksi,
+                        SUM(revenue) as total_pendapatan,
+                        SUM(revenue) / SUM(transactions) as rata_rata,
+                        payment_method
+                    FROM ({source} {where})
+                    GROUP BY sale_date, payment_method
+                    ORDER BY tanggal DESC, payment_method
+                """, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Error getting daily summary: %s", e)
+            return []
+
+    def get_monthly_totals(self):
+        """Get ``(month, transactions, revenue)`` per 'YYYY-MM', oldest first.
+
+        Read from the daily_sales rollup.
+        """
+        try:
+            with self.pool.read_connection() as conn:
+                return conn.execute("""
+                    SELECT substr(sale_date, 1, 7) as month,
+                           SUM(transactions), SUM(revenue)
+                    FROM daily_sales
+                    GROUP BY month
+                    ORDER BY month
+                """).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Error getting monthly totals: %s", e)
+            return []
+
+    def get_month_versions(self):
+        """Get ``{'YYYY-MM': version}``; a month's version grows with every
+        write to its payments or their order lines"""
+        try:
+            with self.pool.read_connection() as conn:
+                return dict(conn.execute("SELECT month, version FROM month_changes").fetchall())
+        except sqlite3.Error as e:
+            logger.error("Error getting month versions: %s", e)
+            return {}
+
+    @contextmanager
+    def bulk_load(self):
+        """Load a large amount of data without the per-row triggers.
+
+        The whole block is one transaction: the triggers that keep the
+        search indexes, the daily_sales rollup, month_changes and
+        row_changes current are dropped at the start, recreated at the
+        end, and the indexes and rollup are rebuilt in one pass before the
+        commit. If the block raises or the process dies, nothing of it is
+        kept, triggers included. Listeners here and in other processes are
+        told to reload. The write lock is held throughout, so other
+        writers wait (or time out) until the load commits.
+        """
+        with self.pool.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            triggers = conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+            ).fetchall()
+            for name, _ in triggers:
+                conn.execute(f'DROP TRIGGER "{name}"')
+
+            self._bulk_loading = True
+            try:
+                yield self
+            finally:
+                self._bulk_loading = False
+
+            for _, sql in triggers:
+                conn.execute(sql)
+            for statement in (FTS_REBUILD + ROLLUP_REBUILD + MONTH_CHANGES_TOUCH_ALL).split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            # Other processes see these in row_changes and reload too
+            conn.executemany(
+                "INSERT INTO row_changes (table_name, op, row_id) VALUES (?, 'reload', 0)",
+                [(table,) for table in ROW_CHANGE_TABLES]
+            )
+        for table in ROW_CHANGE_TABLES:
+            self._dispatch(table, "reload", [])
+
+    def rebuild_daily_sales(self):
+        """Recompute the daily_sales rollup from all payments"""
+        try:
+            with self.pool.connection() as conn:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                for statement in ROLLUP_REBUILD.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+            return True
+        except sqlite3.Error as e:
+            logger.error("Error rebuilding daily sales: %s", e)
+            return False
+
+    def _is_day_bound(self, value):
+        """Whether a range bound is open or falls exactly on midnight"""
+        return value is None or len(str(value)) == 10
+
+    def _sale_date_conditions(self, start, end):
+        """Build ``[start, end)`` predicates on daily_sales.sale_date"""
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("sale_date >= ?")
+            params.append(str(start)[:10])
+        if end is not None:
+            conditions.append("sale_date < ?")
+            params.append(str(end)[:10])
+        return conditions, params
+
     def close_connection(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
\ No newline at end of file
+        """Close all pooled database connections and release the slow-query log"""
+        if self.pool:
+            self.pool.close_all()
+        if self._slow_log is not None:
+            close_slow_query_log(self._slow_log)
+            self._slow_log = None
\ No newline at end of file
@@ -0,0 +1,130 @@
+# db_pool.py - Thread-safe SQLite connection pool
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """Hands out SQLite connections per thread.
+
+    Every thread that touches the database gets its own read-write
+    connection and, separately, its own read-only connection (PRAGMA
+    query_only), so report and export work on worker threads never shares
+    a cursor or a transaction with checkout writes on the GUI thread.
+    With WAL enabled the readers also never block the writer.
+
+    ``configure(connection)`` is called once for every new connection,
+    before it is handed out. ``factory`` is the sqlite3.Connection class
+    to open.
+    """
+
+    def __init__(self, db_name, configure=None, factory=sqlite3.Connection):
+        self.db_name = db_name
+        self._configure = configure
+        self._factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _open(self, read_only):
+        """Open and configure a new connection for the current thread"""
+        # Connections never leave their thread; check_same_thread is off
+        # only so close_all() can close them at shutdown.
+        connection = sqlite3.connect(self.db_name, check_same_thread=False,
+                                     factory=self._factory)
+        if self._configure is not None:
+            self._configure(connection)
+        if read_only:
+            connection.execute("PRAGMA query_only = ON")
+
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def _get(self, kind):
+        connection = getattr(self._local, kind, None)
+        if connection is None:
+            connection = self._open(read_only=(kind == "reader"))
+            setattr(self._local, kind, connection)
+        return connection
+
+    def writer(self):
+        """Get the current thread's read-write connection"""
+        return self._get("writer")
+
+    def reader(self):
+        """Get the current thread's read-only connection"""
+        return self._get("reader")
+
+    @contextmanager
+    def connection(self):
+        """Use the current thread's read-write connection as a transaction.
+
+        Commits when the outermost block exits normally and rolls back if it
+        raises. Nested blocks join the enclosing transaction, so several
+        writes can be grouped into a single commit.
+        """
+        connection = self.writer()
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            yield connection
+            if depth == 0:
+                connection.commit()
+        except BaseException:
+            if depth == 0:
+                connection.rollback()
+                self._local.pending = []
+            raise
+        finally:
+            self._local.depth = depth
+
+        if depth == 0:
+            self._run_pending()
+
+    def after_commit(self, callback):
+        """Run ``callback()`` once the current thread's transaction commits.
+
+        Inside a ``connection()`` block the callback waits for the outermost
+        block to commit and is dropped if it rolls back; outside of one it
+        runs straight away.
+        """
+        if getattr(self._local, "depth", 0) == 0:
+            callback()
+            return
+        if not hasattr(self._local, "pending"):
+            self._local.pending = []
+        self._local.pending.append(callback)
+
+    def _run_pending(self):
+        """Run the callbacks queued by after_commit, in order"""
+        pending = getattr(self._local, "pending", None)
+        if not pending:
+            return
+        self._local.pending = []
+        for callback in pending:
+            callback()
+
+    @contextmanager
+    def read_connection(self):
+        """Use the current thread's read-only connection"""
+        yield self.reader()
+
+    def close_thread(self):
+        """Close the current thread's connections"""
+        for kind in ("writer", "reader"):
+            connection = getattr(self._local, kind, None)
+            if connection is not None:
+                setattr(self._local, kind, None)
+                with self._lock:
+                    if connection in self._connections:
+                        self._connections.remove(connection)
+                connection.close()
+
+    def close_all(self):
+        """Close every connection handed out by the pool"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
@@ -0,0 +1,307 @@
+# exporters.py - Streaming file exports that work with or without the GUI
+import csv
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime
+
+from db_manager import EXPORT_CHUNK_SIZE, month_range
+from xlsx_writer import HEADER_STYLE, FormattedValue, StreamingWorkbook
+
+# Write buffer for plain text exports
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+PAYMENT_HEADERS = [
+    "ID", "Nama Pelanggan", "Total", "Metode Pembayaran",
+    "Status", "Tanggal", "Catatan"
+]
+MENU_HEADERS = ["ID", "Nama Menu", "Kategori", "Harga", "Deskripsi", "Tersedia"]
+DAILY_SUMMARY_HEADERS = [
+    "Tanggal", "Total Transaksi", "Total Pendapatan", "Rata-rata",
+    "Metode Pembayaran", "Jumlah per Metode"
+]
+
+# Excel number formats for native (not pre-formatted text) cells
+RUPIAH_FORMAT = '"Rp" #,##0'
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
+DATE_FORMAT = "yyyy-mm-dd"
+
+# Rows per Parquet row group (one database fetch each)
+PARQUET_ROW_GROUP_SIZE = 65536
+# month_changes version of every month at the last Parquet export
+PARQUET_STATE_FILE = "_export_state.json"
+
+class ExportCancelled(Exception):
+    """Raised when the progress callback asks an export to stop"""
+
+
+def open_text_output(path, compress=None):
+    """Open path for writing text, gzip-compressed when it ends in .gz"""
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=6)
+    return open(path, "w", newline="", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE)
+
+
+def write_csv(path, headers, rows, compress=None, progress=None,
+              progress_every=EXPORT_CHUNK_SIZE):
+    """Stream rows into a CSV file and return how many were written.
+
+    ``rows`` may be any iterable, typically a database cursor generator,
+    and is consumed one row at a time. ``progress(rows_written)`` is
+    called every ``progress_every`` rows and once at the end; if it
+    returns False the partial file is deleted and ExportCancelled raised.
+    """
+    written = 0
+    try:
+        with open_text_output(path, compress) as output:
+            writer = csv.writer(output)
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+                if progress is not None and written % progress_every == 0:
+                    if progress(written) is False:
+                        raise ExportCancelled()
+        if progress is not None:
+            progress(written)
+        return written
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def menu_csv_rows(menu_items):
+    """Menu rows with availability spelled out for CSV"""
+    for item in menu_items:
+        yield (*item[:5], "Ya" if item[5] else "Tidak")
+
+
+def write_xlsx(path, sheets, progress=None, progress_every=EXPORT_CHUNK_SIZE):
+    """Stream sheets of rows into an .xlsx workbook and return the rows written.
+
+    ``sheets`` is a list of ``(title, headers, rows)``; ``rows`` may be any
+    iterable and FormattedValue items become cells with that number
+    format. Each row is serialized into the file as soon as it is read
+    (see xlsx_writer), so memory stays flat and large exports run at a
+    speed close to write_csv. Progress and cancelling work as in write_csv.
+    """
+    written = 0
+    try:
+        with StreamingWorkbook(path) as workbook:
+            for title, headers, rows in sheets:
+                sheet = workbook.add_sheet(title, [max(len(header) + 2, 14) for header in headers])
+                sheet.append(headers, style=HEADER_STYLE)
+                for row in rows:
+                    sheet.append(row)
+                    written += 1
+                    if progress is not None and written % progress_every == 0:
+                        if progress(written) is False:
+                            raise ExportCancelled()
+                sheet.close()
+        if progress is not None:
+            progress(written)
+        return written
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def parse_timestamp(value):
+    """Turn a stored 'YYYY-MM-DD HH:MM:SS' value into a datetime for Excel"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)[:19])
+    except ValueError:
+        return value
+
+
+def payment_xlsx_rows(payments):
+    """Payment rows with a numeric total and a real date for Excel"""
+    for payment_id, customer_name, total, method, status, order_date, notes in payments:
+        yield (
+            payment_id, customer_name, FormattedValue(total, RUPIAH_FORMAT),
+            method, status, FormattedValue(parse_timestamp(order_date), DATETIME_FORMAT),
+            notes
+        )
+
+
+def daily_summary_xlsx_rows(daily_summary):
+    """Rows of DatabaseManager.get_daily_summary for Excel"""
+    for day, transactions, revenue, average, method in daily_summary:
+        yield (
+            FormattedValue(datetime.fromisoformat(day), DATE_FORMAT), transactions,
+            FormattedValue(revenue, RUPIAH_FORMAT), FormattedValue(average, RUPIAH_FORMAT),
+            method, transactions
+        )
+
+
+def export_payments_xlsx(db_manager, path, start=None, end=None, progress=None):
+    """Write the payments within ``[start, end)`` to a one-sheet workbook"""
+    rows = payment_xlsx_rows(db_manager.iter_payments(start, end))
+    return write_xlsx(path, [("Transaksi", PAYMENT_HEADERS, rows)], progress)
+
+
+def export_report_xlsx(db_manager, path, start=None, end=None, progress=None):
+    """Write a full report for ``[start, end)`` to a workbook.
+
+    Sheets: summary totals, every transaction and, when the range is
+    bounded, per-day totals by payment method.
+    """
+    count, revenue, average = db_manager.get_sales_report(start, end)
+    summary = [
+        ("Total Transaksi", count),
+        ("Total Pendapatan", FormattedValue(revenue, RUPIAH_FORMAT)),
+        ("Rata-rata per Transaksi", FormattedValue(average, RUPIAH_FORMAT)),
+        ("Tanggal Generate Laporan", FormattedValue(datetime.now().replace(microsecond=0), DATETIME_FORMAT)),
+    ]
+    sheets = [
+        ("Ringkasan", ["Keterangan", "Nilai"], summary),
+        ("Detail Transaksi", PAYMENT_HEADERS,
+         payment_xlsx_rows(db_manager.iter_payments(start, end))),
+    ]
+    if start is not None or end is not None:
+        sheets.append(("Ringkasan Harian", DAILY_SUMMARY_HEADERS,
+                       daily_summary_xlsx_rows(db_manager.get_daily_summary(start, end))))
+    return write_xlsx(path, sheets, progress)
+
+
+def _import_pyarrow():
+    """Import pyarrow, which only the Parquet export needs"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError(
+            "Ekspor Parquet membutuhkan paket pyarrow (pip install pyarrow)"
+        ) from None
+    return pyarrow, pyarrow.compute, pyarrow.parquet
+
+
+def parquet_schemas(pa):
+    """Arrow schemas of the exported tables, in chunk iterator column order"""
+    timestamp = pa.timestamp("s")
+    return {
+        "payments": pa.schema([
+            ("id", pa.int64()),
+            ("customer_id", pa.int64()),
+            ("customer_name", pa.string()),
+            ("total_amount", pa.float64()),
+            ("payment_method", pa.string()),
+            ("payment_status", pa.string()),
+            ("order_date", timestamp),
+            ("notes", pa.string()),
+        ]),
+        "order_items": pa.schema([
+            ("id", pa.int64()),
+            ("payment_id", pa.int64()),
+            ("menu_item_id", pa.int64()),
+            ("menu_item_name", pa.string()),
+            ("quantity", pa.int64()),
+            ("unit_price", pa.float64()),
+            ("subtotal", pa.float64()),
+            ("order_date", timestamp),
+        ]),
+    }
+
+
+def _rows_to_table(pa, pc, schema, rows):
+    """Build a typed Arrow table from database row tuples"""
+    arrays = []
+    for field, values in zip(schema, zip(*rows)):
+        if pa.types.is_timestamp(field.type):
+            # Stored as 'YYYY-MM-DD HH:MM:SS' text
+            text = pc.utf8_slice_codeunits(pa.array(values, pa.string()), 0, 19)
+            arrays.append(pc.strptime(text, format="%Y-%m-%d %H:%M:%S",
+                                      unit="s", error_is_null=True))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_parquet_file(pa, pc, pq, path, schema, chunks, written, progress):
+    """Write row chunks to one Parquet file, replacing it atomically"""
+    temp_path = path + ".tmp"
+    try:
+        with pq.ParquetWriter(temp_path, schema, compression="zstd") as writer:
+            for rows in chunks:
+                writer.write_table(_rows_to_table(pa, pc, schema, rows))
+                written += len(rows)
+                if progress is not None and progress(written) is False:
+                    raise ExportCancelled()
+        os.replace(temp_path, path)
+        return written
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def export_parquet(db_manager, directory, full=False, progress=None):
+    """Write payments and order_items as Parquet files partitioned by month.
+
+    Files are laid out Hive-style as
+    ``<directory>/<table>/month=YYYY-MM/part-0.parquet`` with typed
+    columns, so pyarrow, pandas or DuckDB can prune by month and read only
+    the columns they need. Unless ``full`` is set, only months whose
+    payments or order lines were written since the last export (per the
+    month_changes counters) are rewritten; partitions of months without
+    payments are removed. Returns the rows written.
+    """
+    pa, pc, pq = _import_pyarrow()
+    schemas = parquet_schemas(pa)
+    os.makedirs(directory, exist_ok=True)
+
+    state_path = os.path.join(directory, PARQUET_STATE_FILE)
+    state = {}
+    if not full and os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as state_file:
+            state = json.load(state_file)
+
+    versions = db_manager.get_month_versions()
+    months = {month: versions.get(month) for month, _, _ in db_manager.get_monthly_totals()}
+
+    written = 0
+    for month in sorted(months):
+        if months[month] is not None and state.get(month) == months[month]:
+            continue
+
+        start, end = month_range(f"{month}-01")
+        sources = {
+            "payments": db_manager.iter_payment_chunks(start, end, PARQUET_ROW_GROUP_SIZE),
+            "order_items": db_manager.iter_order_item_chunks(start, end, PARQUET_ROW_GROUP_SIZE),
+        }
+        for table, chunks in sources.items():
+            folder = os.path.join(directory, table, f"month={month}")
+            os.makedirs(folder, exist_ok=True)
+            written = _write_parquet_file(
+                pa, pc, pq, os.path.join(folder, "part-0.parquet"),
+                schemas[table], chunks, written, progress
+            )
+
+        # Saved per month so a cancelled export resumes where it stopped
+        state[month] = months[month]
+        _save_parquet_state(state_path, state)
+
+    for table in schemas:
+        table_dir = os.path.join(directory, table)
+        for name in os.listdir(table_dir) if os.path.isdir(table_dir) else []:
+            if name.startswith("month=") and name[len("month="):] not in months:
+                shutil.rmtree(os.path.join(table_dir, name))
+    _save_parquet_state(state_path, {month: state[month] for month in state if month in months})
+
+    if progress is not None:
+        progress(written)
+    return written
+
+
+def _save_parquet_state(path, state):
+    with open(path + ".tmp", "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
@@ -1,8 +1,10 @@
 from PyQt5.QtWidgets import QApplication
+import logging
 import sys
 from restaurant_app import RestaurantPaymentApp
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = QApplication(sys.argv)
     window = RestaurantPaymentApp()
     window.show()
@@ -0,0 +1,117 @@
+# menu_cache.py - In-memory snapshot of the menu_items table
+import string
+from bisect import bisect_left, bisect_right
+
+# Columns of the menu rows, in tuple order
+MENU_COLUMNS = ("id", "name", "category", "price", "description", "available")
+
+# SQLite's LIKE only folds ASCII letters; match it exactly
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def fold_case(text):
+    """Lower-case ASCII letters only, the way SQLite's LIKE compares"""
+    return text.translate(_ASCII_LOWER)
+
+
+def menu_matches(menu_item, search_term):
+    """Whether a menu row matches a search term by name or category.
+
+    Mirrors ``name LIKE '%term%' OR category LIKE '%term%'``.
+    """
+    needle = fold_case(search_term)
+    return needle in fold_case(menu_item[1]) or needle in fold_case(menu_item[2])
+
+
+class MenuCache:
+    """Immutable, indexed copy of every menu item.
+
+    Built by DatabaseManager.menu_cache() from one SELECT on the calling
+    thread's pooled reader (query_only) connection; the snapshot holds
+    no connection or cursor itself. Rows are the
+    ``(id, name, category, price, description, available)`` tuples of
+    menu_items, kept in ``(category, name, id)`` order, the same order the
+    menu pages use. Orders by other columns are built on first use and
+    kept with the snapshot.
+    """
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=self.sort_key)
+        self._keys = [self.sort_key(row) for row in self.rows]
+        # (column, ...) -> (rows, keys) in ascending order of that column
+        self._orders = {None: (self.rows, self._keys)}
+        self.by_id = {row[0]: row for row in self.rows}
+        self.by_category = {}
+        self.by_name = {}
+        for row in self.rows:
+            self.by_category.setdefault(row[2], []).append(row)
+            self.by_name.setdefault(fold_case(row[1]), []).append(row)
+
+    @staticmethod
+    def sort_key(row):
+        return (row[2], row[1], row[0])
+
+    @staticmethod
+    def column_key(column):
+        """Key function ordering rows by a column, then id, with NULL first"""
+        index = MENU_COLUMNS.index(column)
+
+        def key(row):
+            value = row[index]
+            # The flag keeps None from being compared with numbers or text
+            return value is not None, value, row[0]
+        return key
+
+    def _order(self, column):
+        """Rows and their keys in ascending order of a column (None: the default order)"""
+        order = self._orders.get(column)
+        if order is None:
+            if column not in MENU_COLUMNS:
+                raise ValueError(f"Cannot sort menu items by {column!r}")
+            key = self.column_key(column)
+            rows = sorted(self.rows, key=key)
+            order = self._orders[column] = (rows, [key(row) for row in rows])
+        return order
+
+    def get(self, item_id):
+        """Get a menu item by id, or None"""
+        return self.by_id.get(item_id)
+
+    def in_category(self, category):
+        """Get the menu items of a category, ordered by name"""
+        return list(self.by_category.get(category, []))
+
+    def find_by_name(self, name):
+        """Get the menu items with this name, ignoring case"""
+        return list(self.by_name.get(fold_case(name), []))
+
+    def search(self, search_term):
+        """Get the menu items whose name or category contains the term"""
+        return [row for row in self.rows if menu_matches(row, search_term)]
+
+    def page(self, cursor, page_size, search_term=None, sort=None):
+        """Get ``(rows, next_cursor)`` like the keyset-paginated menu queries.
+
+        ``sort`` is a ``(column, descending)`` pair from MENU_COLUMNS; the
+        cursor is then that column's ``(value, id)`` instead of sort_key.
+        """
+        column, descending = sort or (None, False)
+        ordered, keys = self._order(column)
+        if descending:
+            last = len(ordered) if cursor is None else bisect_left(keys, tuple(cursor))
+            positions = range(last - 1, -1, -1)
+        else:
+            first = 0 if cursor is None else bisect_right(keys, tuple(cursor))
+            positions = range(first, len(ordered))
+
+        rows = []
+        for position in positions:
+            row = ordered[position]
+            if search_term is None or menu_matches(row, search_term):
+                rows.append((row, keys[position]))
+                if len(rows) > page_size:
+                    break
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return [row for row, _ in rows], rows[-1][1]
+        return [row for row, _ in rows], None
@@ -0,0 +1,312 @@
+# query_stats.py - Per-statement SQLite latency statistics and slow-query log
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# Latencies kept per statement for the percentiles (most recent executions)
+LATENCY_WINDOW = 1024
+
+# Distinct statements tracked; anything beyond is counted under OTHER_STATEMENTS
+MAX_STATEMENTS = 500
+OTHER_STATEMENTS = "<other statements>"
+
+# Default slow-query threshold, overridable with RESTAURANT_SLOW_QUERY_MS
+DEFAULT_SLOW_QUERY_MS = float(os.environ.get("RESTAURANT_SLOW_QUERY_MS", 100))
+
+# Rotation of the slow-query log file
+SLOW_LOG_MAX_BYTES = 1024 * 1024
+SLOW_LOG_BACKUPS = 3
+
+# Statements EXPLAIN QUERY PLAN can describe
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+slow_query_logger = logging.getLogger("restaurant.slow_queries")
+# Absolute path -> [handler, number of open_slow_query_log calls not yet closed]
+_slow_log_handlers = {}
+_slow_log_lock = threading.Lock()
+
+
+def normalize_sql(sql):
+    """One line of SQL, with ``?, ?, ?`` lists folded so IN (...) batches share a key"""
+    return _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", sql).strip())
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(max(math.ceil(fraction * len(sorted_values)), 1), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+class StatementStats:
+    """Latency and row counts of one normalized statement"""
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, seconds, rows):
+        self.count += 1
+        self.rows += rows
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self):
+        """Plain dict of the numbers, latencies in milliseconds"""
+        recent = sorted(self.recent)
+        return {
+            "sql": self.sql,
+            "count": self.count,
+            "rows": self.rows,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "p50_ms": percentile(recent, 0.50) * 1000,
+            "p95_ms": percentile(recent, 0.95) * 1000,
+            "p99_ms": percentile(recent, 0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class QueryStats:
+    """Thread-safe latency histograms for every statement run through a
+    TimedConnection, plus the slow-query log.
+
+    A statement's latency is the time spent inside SQLite for it: the
+    execute() call plus every fetch until the result is exhausted or the
+    cursor is closed. Percentiles cover the last LATENCY_WINDOW runs of
+    each statement; count, rows and max cover all of them.
+    """
+
+    def __init__(self, slow_query_ms=DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._statements = {}
+        # SQL text -> normalize_sql(text), so the regexes run once per text
+        self._keys = {}
+
+    def record(self, connection, sql, parameters, seconds, rows):
+        """Add one finished statement and log it if it was slow"""
+        key = self._keys.get(sql)
+        if key is None:
+            if len(self._keys) >= MAX_STATEMENTS * 4:
+                self._keys.clear()
+            key = self._keys[sql] = normalize_sql(sql)
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= MAX_STATEMENTS:
+                    key = OTHER_STATEMENTS
+                    stats = self._statements.get(key)
+                if stats is None:
+                    stats = self._statements[key] = StatementStats(key)
+            stats.add(seconds, rows)
+
+        if self.slow_query_ms is not None and seconds * 1000 >= self.slow_query_ms:
+            self._log_slow(connection, sql, parameters, seconds, rows)
+
+    def _log_slow(self, connection, sql, parameters, seconds, rows):
+        if not slow_query_logger.isEnabledFor(logging.WARNING):
+            return
+        lines = [f"{seconds * 1000:.1f} ms, {rows} rows: {normalize_sql(sql)}"]
+        if parameters is not None:
+            lines.append(f"  parameters: {parameters!r}"[:500])
+        lines.extend(f"  plan: {step}" for step in explain(connection, sql, parameters))
+        slow_query_logger.warning("\n".join(lines))
+
+    def snapshot(self):
+        """Per-statement numbers, slowest total time first"""
+        with self._lock:
+            rows = [stats.snapshot() for stats in self._statements.values()]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._statements = {}
+
+
+def explain(connection, sql, parameters):
+    """EXPLAIN QUERY PLAN of a statement as indented lines (empty if not possible)"""
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE) or parameters is None:
+        return []
+    try:
+        # A plain cursor, so the EXPLAIN itself is not timed
+        plan = sqlite3.Cursor(connection).execute(
+            f"EXPLAIN QUERY PLAN {sql}", parameters
+        ).fetchall()
+    except sqlite3.Error as e:
+        return [f"unavailable ({e})"]
+
+    depth = {0: 0}
+    lines = []
+    for node_id, parent_id, _, detail in plan:
+        depth[node_id] = depth.get(parent_id, 0) + 1
+        lines.append("  " * (depth[node_id] - 1) + detail)
+    return lines
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to the connection's QueryStats"""
+
+    _sql = None
+
+    def _finish(self):
+        """Record the current statement, once"""
+        sql = self._sql
+        if sql is None:
+            return
+        self._sql = None
+        rows = self._rows + max(self.rowcount, 0)
+        self.connection.query_stats.record(self.connection, sql, self._parameters,
+                                           self._elapsed, rows)
+
+    def _timed(self, method, sql, parameters, explain_parameters=()):
+        """Run method(sql, *parameters); the slow log EXPLAINs the statement
+        with ``explain_parameters`` (None: not at all)"""
+        self._finish()
+        if getattr(self.connection, "query_stats", None) is None:
+            return method(sql, *parameters)
+        started = time.perf_counter()
+        try:
+            return method(sql, *parameters)
+        finally:
+            self._sql = sql
+            self._parameters = explain_parameters
+            self._elapsed = time.perf_counter() - started
+            self._rows = 0
+            # Nothing to fetch after writes and DDL, so they are done now
+            if self.description is None:
+                self._finish()
+
+    def execute(self, sql, *parameters):
+        return self._timed(super().execute, sql, parameters, parameters[0] if parameters else ())
+
+    def executemany(self, sql, seq_of_parameters):
+        # A batch has no single parameter set to EXPLAIN it with
+        self._timed(super().executemany, sql, (seq_of_parameters,), None)
+        return self
+
+    def executescript(self, script):
+        self._timed(super().executescript, script, (), None)
+        return self
+
+    def _fetched(self, started, rows, done):
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - started
+            self._rows += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    # No __del__: a cursor dropped before its result was exhausted is not
+    # recorded. Finishing it from a finalizer would run EXPLAIN on whatever
+    # thread the garbage collector picks, maybe on a closed connection.
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection whose statements are timed by ``query_stats``.
+
+    Set ``query_stats`` to a QueryStats after connecting; while it is None
+    statements run untimed.
+    """
+
+    query_stats = None
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection's shortcuts do not go through cursor()
+    def execute(self, sql, *parameters):
+        return self.cursor().execute(sql, *parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+def open_slow_query_log(path, max_bytes=SLOW_LOG_MAX_BYTES, backups=SLOW_LOG_BACKUPS):
+    """Send slow_query_logger to a rotating file.
+
+    Every path gets one handler, shared by all callers; each call must be
+    paired with close_slow_query_log(path).
+    """
+    path = os.path.abspath(path)
+    with _slow_log_lock:
+        entry = _slow_log_handlers.get(path)
+        if entry is not None:
+            entry[1] += 1
+            return entry[0]
+        try:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                          encoding="utf-8", delay=True)
+        except OSError as e:
+            logging.getLogger(__name__).warning("Slow-query log disabled: %s", e)
+            return None
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        _slow_log_handlers[path] = [handler, 1]
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.WARNING)
+        slow_query_logger.propagate = False
+        return handler
+
+
+def close_slow_query_log(path):
+    """Release one open_slow_query_log(path); the last release closes the file"""
+    path = os.path.abspath(path)
+    with _slow_log_lock:
+        entry = _slow_log_handlers.get(path)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _slow_log_handlers[path]
+        slow_query_logger.removeHandler(entry[0])
+        entry[0].close()
@@ -0,0 +1 @@
+"""Headless entry point: ``python -m restaurant --help``"""
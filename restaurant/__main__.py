@@ -0,0 +1,6 @@
+# python -m restaurant - headless reports and exports, see restaurant_cli.py
+import sys
+
+from restaurant_cli import main
+
+sys.exit(main())
@@ -4,13 +4,10 @@ from PyQt5.QtWidgets import (
     QDockWidget, QStatusBar, QWidget, QVBoxLayout, QHBoxLayout,
     QLineEdit, QLabel, QMessageBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon
-from db_manager import DatabaseManager
-from widgets.payment_tab import PaymentTab
-from widgets.menu_tab import MenuTab
-from widgets.report_tab import ReportTab
-from widgets.about_tab import AboutTab
+from widgets.diagnostics_dock import DiagnosticsDock
+from widgets.lazy_tab import LazyTab
 
 
 class RestaurantPaymentApp(QMainWindow):
@@ -19,31 +16,121 @@ class RestaurantPaymentApp(QMainWindow):
         self.setWindowTitle("Sistem Pembayaran Rumah Makan")
         self.resize(1900, 1200)
 
-        # Initialize database
-        self.db_manager = DatabaseManager()
+        # The database is opened once the window is up (see init_database)
+        self.db_manager = None
+        self.db_events = None
+        self.payment_search = None
+        self.menu_search = None
 
         self.init_ui()
         self.init_menu_bar()
         self.init_dock_widget()
         self.init_status_bar()
 
+        # Runs on the first event loop pass, after the window is shown
+        QTimer.singleShot(0, self.init_database)
+
     def init_ui(self):
         """Initialize the main user interface"""
         # Create central widget with tabs
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
 
-        # Initialize tabs
-        self.payment_tab = PaymentTab(self.db_manager)
-        self.menu_tab = MenuTab(self.db_manager)
-        self.report_tab = ReportTab(self.db_manager)
-        self.about_tab = AboutTab()
+        # Tabs are imported, built and load their data when first shown
+        self.pages = {
+            "payment": LazyTab(self.create_payment_tab),
+            "menu": LazyTab(self.create_menu_tab),
+            "report": LazyTab(self.create_report_tab),
+            "about": LazyTab(self.create_about_tab),
+        }
 
         # Add tabs
-        self.tabs.addTab(self.payment_tab, "Pembayaran")
-        self.tabs.addTab(self.menu_tab, "Menu")
-        self.tabs.addTab(self.report_tab, "Laporan")
-        self.tabs.addTab(self.about_tab, "Tentang")
+        self.tabs.addTab(self.pages["payment"], "Pembayaran")
+        self.tabs.addTab(self.pages["menu"], "Menu")
+        self.tabs.addTab(self.pages["report"], "Laporan")
+        self.tabs.addTab(self.pages["about"], "Tentang")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
+    def init_database(self):
+        """Open the database, then build the visible tab"""
+        if self.db_manager is not None:
+            return
+        from db_manager import DatabaseManager, slow_query_log_path
+        self.db_manager = DatabaseManager()
+        self.init_db_events()
+        self.init_search_executors()
+        self.diagnostics_dock.set_stats(self.db_manager.query_stats,
+                                        slow_query_log_path(self.db_manager.db_name))
+
+        storage = self.db_manager.get_storage_info()
+        self.storage_label.setText(
+            f"DB: {storage['profile']} ({storage.get('journal_mode', '?')})")
+
+        self.on_tab_changed(self.tabs.currentIndex())
+
+    def init_db_events(self):
+        """Let every built tab patch its rows when the database changes"""
+        from widgets.db_events import DatabaseEvents
+        self.db_events = DatabaseEvents(self.db_manager, self)
+        self.db_events.changed.connect(self.on_data_changed)
+
+    def init_search_executors(self):
+        """Searches are debounced and run off the GUI thread"""
+        from widgets.search_executor import SearchExecutor, payment_search, menu_search
+        self.payment_search = SearchExecutor(self.db_manager, payment_search, parent=self)
+        self.payment_search.results_ready.connect(
+            lambda *results: self.payment_tab.show_search_results(*results))
+        self.menu_search = SearchExecutor(self.db_manager, menu_search, parent=self)
+        self.menu_search.results_ready.connect(
+            lambda *results: self.menu_tab.show_search_results(*results))
+
+    def create_payment_tab(self):
+        from widgets.payment_tab import PaymentTab
+        return PaymentTab(self.db_manager)
+
+    def create_menu_tab(self):
+        from widgets.menu_tab import MenuTab
+        return MenuTab(self.db_manager)
+
+    def create_report_tab(self):
+        from widgets.report_tab import ReportTab
+        return ReportTab(self.db_manager)
+
+    def create_about_tab(self):
+        from widgets.about_tab import AboutTab
+        return AboutTab()
+
+    @property
+    def payment_tab(self):
+        return self.pages["payment"].ensure_built()
+
+    @property
+    def menu_tab(self):
+        return self.pages["menu"].ensure_built()
+
+    @property
+    def report_tab(self):
+        return self.pages["report"].ensure_built()
+
+    @property
+    def about_tab(self):
+        return self.pages["about"].ensure_built()
+
+    def built_tabs(self):
+        """The tab widgets created so far, by page name"""
+        return {name: page.widget for name, page in self.pages.items() if page.is_built()}
+
+    def on_tab_changed(self, index):
+        """Build a tab the first time it is shown"""
+        page = self.tabs.widget(index)
+        if page is not None and self.db_manager is not None:
+            page.ensure_built()
+
+    def on_data_changed(self, table, op, ids):
+        """Forward a database change to the tabs that exist"""
+        for tab in self.built_tabs().values():
+            if hasattr(tab, "on_data_changed"):
+                tab.on_data_changed(table, op, ids)
 
     def init_menu_bar(self):
         """Initialize menu bar"""
@@ -59,12 +146,16 @@ class RestaurantPaymentApp(QMainWindow):
         export_action = QAction("Ekspor Laporan", self)
         export_action.triggered.connect(self.export_report)
 
+        rebuild_action = QAction("Bangun Ulang Ringkasan Harian", self)
+        rebuild_action.triggered.connect(self.rebuild_daily_sales)
+
         exit_action = QAction("Keluar", self)
         exit_action.setShortcut("Ctrl+Q")
         exit_action.triggered.connect(self.close)
 
         file_menu.addAction(refresh_action)
         file_menu.addAction(export_action)
+        file_menu.addAction(rebuild_action)
         file_menu.addSeparator()
         file_menu.addAction(exit_action)
 
@@ -75,7 +166,12 @@ class RestaurantPaymentApp(QMainWindow):
         search_action.setShortcut("Ctrl+F")
         search_action.triggered.connect(self.toggle_search_dock)
 
+        diagnostics_action = QAction("Toggle Diagnostics Panel", self)
+        diagnostics_action.setShortcut("Ctrl+Shift+D")
+        diagnostics_action.triggered.connect(self.toggle_diagnostics_dock)
+
         view_menu.addAction(search_action)
+        view_menu.addAction(diagnostics_action)
 
         # Help menu
         help_menu = menu_bar.addMenu("Help")
@@ -120,6 +216,11 @@ class RestaurantPaymentApp(QMainWindow):
         # Add dock to right side
         self.addDockWidget(Qt.RightDockWidgetArea, self.search_dock)
 
+        # Query latency numbers, hidden until asked for
+        self.diagnostics_dock = DiagnosticsDock(self)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.diagnostics_dock)
+        self.diagnostics_dock.hide()
+
     def init_status_bar(self):
         """Initialize status bar with student information"""
         self.status_bar = QStatusBar()
@@ -127,19 +228,37 @@ class RestaurantPaymentApp(QMainWindow):
         self.status_bar.showMessage(
             "M. Ilham Abdul Shaleh | F1D022120 | Sistem Pembayaran Rumah Makan")
 
+        # Active SQLite storage profile, filled in by init_database
+        self.storage_label = QLabel("DB: ...")
+        self.status_bar.addPermanentWidget(self.storage_label)
+
     def refresh_all_data(self):
-        """Refresh all data in all tabs"""
+        """Refresh all data in the tabs built so far"""
+        tabs = self.built_tabs()
         try:
-            self.payment_tab.load_payments()
-            self.menu_tab.load_menu_items()
-            self.report_tab.load_reports()
+            if "payment" in tabs:
+                tabs["payment"].load_menu_choices()
+                tabs["payment"].load_payments()
+            if "menu" in tabs:
+                tabs["menu"].load_menu_items()
+            if "report" in tabs:
+                tabs["report"].load_reports()
             self.status_bar.showMessage("Data berhasil di-refresh", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Gagal refresh data: {str(e)}")
 
+    def rebuild_daily_sales(self):
+        """Recompute the daily sales rollup and reload the reports"""
+        if self.db_manager.rebuild_daily_sales():
+            if self.pages["report"].is_built():
+                self.report_tab.load_reports()
+            self.status_bar.showMessage("Ringkasan harian berhasil dibangun ulang", 3000)
+        else:
+            QMessageBox.critical(self, "Error", "Gagal membangun ulang ringkasan harian!")
+
     def export_report(self):
         """Export report functionality"""
-        self.tabs.setCurrentWidget(self.report_tab)
+        self.tabs.setCurrentWidget(self.pages["report"])
         self.report_tab.export_report()
 
     def toggle_search_dock(self):
@@ -149,19 +268,26 @@ class RestaurantPaymentApp(QMainWindow):
         else:
             self.search_dock.show()
 
+    def toggle_diagnostics_dock(self):
+        """Toggle database diagnostics dock visibility"""
+        if self.diagnostics_dock.isVisible():
+            self.diagnostics_dock.hide()
+        else:
+            self.diagnostics_dock.show()
+
     def show_about(self):
         """Show about tab"""
-        self.tabs.setCurrentWidget(self.about_tab)
+        self.tabs.setCurrentWidget(self.pages["about"])
 
     def perform_global_search(self, text):
-        """Perform global search across payments"""
-        if hasattr(self.payment_tab, 'search_payments'):
-            self.payment_tab.search_payments(text)
+        """Perform global search across payments in the background"""
+        if self.payment_search is not None:
+            self.payment_search.submit(text, self.payment_tab.payments_model.sort_order)
 
     def perform_menu_search(self, text):
-        """Perform menu search"""
-        if hasattr(self.menu_tab, 'search_menu_items'):
-            self.menu_tab.search_menu_items(text)
+        """Perform menu search in the background"""
+        if self.menu_search is not None:
+            self.menu_search.submit(text, self.menu_tab.menu_model.sort_order)
 
     def closeEvent(self, event):
         """Handle application close event"""
@@ -173,8 +299,12 @@ class RestaurantPaymentApp(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
-            # Close database connection
-            self.db_manager.close_connection()
+            # Stop background searches and close database connection
+            if self.db_manager is not None:
+                self.payment_search.shutdown()
+                self.menu_search.shutdown()
+                self.db_events.detach()
+                self.db_manager.close_connection()
             event.accept()
         else:
             event.ignore()
\ No newline at end of file
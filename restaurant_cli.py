@@ -0,0 +1,247 @@
+# restaurant_cli.py - Headless reports and exports (no Qt), e.g. for cron
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+from db_manager import (
+    DatabaseManager, DEFAULT_STORAGE_PROFILE, SCHEMA_VERSION, STORAGE_PROFILES,
+    day_range, week_range, month_range
+)
+import exporters
+
+PERIODS = {"day": day_range, "week": week_range, "month": month_range}
+REPORT_FORMATS = ["text", "xlsx", "csv", "csv.gz"]
+
+
+def parse_date(value):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tanggal tidak valid: {value} (format YYYY-MM-DD)")
+
+
+def report_range(args):
+    """Half-open ``[start, end)`` range chosen on the command line (None = open)"""
+    if args.period:
+        return PERIODS[args.period](args.date or date.today())
+
+    # --to is inclusive, like the end date in the report tab
+    start = day_range(args.date_from)[0] if args.date_from else None
+    end = day_range(args.date_to)[1] if args.date_to else None
+    return start, end
+
+
+def cmd_report(db, args):
+    """Print or export a sales report"""
+    start, end = report_range(args)
+    if start is not None and end is not None and start >= end:
+        print("Error: --to tidak boleh sebelum --from", file=sys.stderr)
+        return 2
+
+    if args.format == "text":
+        print_report(db, start, end, args.daily)
+        return 0
+
+    output = args.output or default_report_name(start, end, args.format)
+    if args.format == "xlsx":
+        rows = exporters.export_report_xlsx(db, output, start, end)
+    else:
+        rows = exporters.write_csv(output, exporters.PAYMENT_HEADERS, db.iter_payments(start, end))
+    print(f"{rows} baris diekspor ke {output}")
+    return 0
+
+
+def last_day(end):
+    """The inclusive last day of a half-open range end, or None"""
+    return (date.fromisoformat(end) - timedelta(days=1)).isoformat() if end else None
+
+
+def print_report(db, start, end, daily):
+    count, revenue, average = db.get_sales_report(start, end)
+    print(f"Periode          : {start or '-'} s/d {last_day(end) or '-'}")
+    print(f"Total Transaksi  : {count}")
+    print(f"Total Pendapatan : Rp {revenue:,.0f}")
+    print(f"Rata-rata        : Rp {average:,.0f}")
+
+    if daily:
+        print()
+        print(f"{'Tanggal':<12}{'Metode':<16}{'Transaksi':>10}{'Pendapatan':>18}")
+        for day, transactions, day_revenue, _, method in db.get_daily_summary(start, end):
+            print(f"{day:<12}{method:<16}{transactions:>10}{'Rp ' + format(day_revenue, ',.0f'):>18}")
+
+
+def default_report_name(start, end, file_format):
+    return f"laporan_{start or 'awal'}_{last_day(end) or 'akhir'}.{file_format}"
+
+
+def cmd_parquet(db, args):
+    """Export payments and order items to monthly Parquet partitions"""
+    rows = exporters.export_parquet(db, args.output, full=args.full)
+    print(f"{rows} baris diekspor ke {args.output}")
+    return 0
+
+
+def cmd_export_menu(db, args):
+    """Export the menu to CSV"""
+    rows = exporters.write_csv(args.output, exporters.MENU_HEADERS,
+                               exporters.menu_csv_rows(db.get_menu_items()))
+    print(f"{rows} menu diekspor ke {args.output}")
+    return 0
+
+
+def cmd_migrate(db, args):
+    """Bring the database schema up to date"""
+    version = db.get_schema_version()
+    if version < SCHEMA_VERSION:
+        return 1
+    print(f"Skema database versi {version}")
+    return 0
+
+
+def cmd_rebuild_rollup(db, args):
+    """Recompute the daily_sales rollup from the payments table"""
+    if not db.rebuild_daily_sales():
+        return 1
+    print("Ringkasan harian berhasil dibangun ulang")
+    return 0
+
+
+def parse_weights(count):
+    """argparse type for a comma-separated list of ``count`` weights"""
+    def parse(value):
+        try:
+            weights = [float(part) for part in value.split(",")]
+        except ValueError:
+            weights = []
+        if len(weights) != count or min(weights) < 0 or not any(weights):
+            raise argparse.ArgumentTypeError(f"butuh {count} angka >= 0 dipisah koma")
+        return weights
+    return parse
+
+
+def cmd_generate(db, args):
+    """Fill the database with seeded synthetic data"""
+    import time
+    import data_generator
+
+    def progress(written):
+        print(f"\r{written:,}/{args.payments:,} transaksi", end="", file=sys.stderr, flush=True)
+
+    options = dict(
+        payments=args.payments, customers=args.customers, menu_items=args.menu_items,
+        days=args.days, end=args.end, seed=args.seed,
+        hour_weights=args.hour_weights or data_generator.HOUR_WEIGHTS,
+        weekday_weights=args.weekday_weights or data_generator.WEEKDAY_WEIGHTS,
+        progress=progress if args.payments else None,
+    )
+    # The trigger-less path holds the write lock for the whole load, so it
+    # is only the default for a database without payments
+    bulk = args.bulk if args.bulk is not None else db.get_payment_totals()[0] == 0
+    started = time.perf_counter()
+    if bulk:
+        with db.bulk_load():
+            written = data_generator.generate(db, **options)
+    else:
+        written = data_generator.generate(db, **options)
+    if args.payments:
+        print(file=sys.stderr)
+
+    print(", ".join(f"{count:,} {table}" for table, count in written.items())
+          + f" ditambahkan dalam {time.perf_counter() - started:.1f} detik")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m restaurant",
+        description="Laporan dan ekspor Sistem Pembayaran Rumah Makan tanpa GUI."
+    )
+    parser.add_argument("--db", default="restaurant_payment.db",
+                        help="file database SQLite (default: %(default)s)")
+    parser.add_argument("--profile", choices=sorted(STORAGE_PROFILES),
+                        default=DEFAULT_STORAGE_PROFILE,
+                        help="profil penyimpanan SQLite (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="ringkasan penjualan atau ekspor laporan")
+    report.add_argument("--from", dest="date_from", type=parse_date, help="tanggal awal (YYYY-MM-DD)")
+    report.add_argument("--to", dest="date_to", type=parse_date, help="tanggal akhir, inklusif")
+    report.add_argument("--period", choices=sorted(PERIODS),
+                        help="hari/minggu/bulan yang memuat --date (menggantikan --from/--to)")
+    report.add_argument("--date", type=parse_date, help="tanggal untuk --period (default: hari ini)")
+    report.add_argument("--format", choices=REPORT_FORMATS, default="text")
+    report.add_argument("--output", "-o", help="file keluaran (default: laporan_<awal>_<akhir>.<format>)")
+    report.add_argument("--daily", action="store_true", help="tampilkan ringkasan per hari (format text)")
+    report.set_defaults(handler=cmd_report, read_only=True)
+
+    parquet = commands.add_parser("parquet", help="ekspor pembayaran dan item pesanan ke Parquet per bulan")
+    parquet.add_argument("output", help="folder tujuan")
+    parquet.add_argument("--full", action="store_true", help="tulis ulang semua bulan")
+    parquet.set_defaults(handler=cmd_parquet, read_only=True)
+
+    menu = commands.add_parser("export-menu", help="ekspor menu ke CSV")
+    menu.add_argument("output", help="file CSV tujuan (.csv atau .csv.gz)")
+    menu.set_defaults(handler=cmd_export_menu, read_only=True)
+
+    migrate = commands.add_parser("migrate", help="perbarui skema database ke versi terbaru")
+    migrate.set_defaults(handler=cmd_migrate)
+
+    rebuild = commands.add_parser("rebuild-rollup", help="bangun ulang tabel ringkasan harian")
+    rebuild.set_defaults(handler=cmd_rebuild_rollup)
+
+    generate = commands.add_parser(
+        "generate", help="isi database dengan data sintetis (bisa membuat database baru)"
+    )
+    generate.add_argument("--payments", type=int, default=10000, help="transaksi baru (default: %(default)s)")
+    generate.add_argument("--customers", type=int, default=1000,
+                          help="jumlah pelanggan minimal di tabel (default: %(default)s)")
+    generate.add_argument("--menu-items", type=int, default=60,
+                          help="jumlah menu minimal di tabel (default: %(default)s)")
+    generate.add_argument("--days", type=int, default=365, help="rentang hari transaksi (default: %(default)s)")
+    generate.add_argument("--end", type=parse_date, help="hari terakhir transaksi (default: hari ini)")
+    generate.add_argument("--seed", type=int, default=42, help="seed acak (default: %(default)s)")
+    generate.add_argument("--hour-weights", type=parse_weights(24),
+                          help="24 bobot per jam, dipisah koma (default: puncak makan siang dan malam)")
+    generate.add_argument("--weekday-weights", type=parse_weights(7),
+                          help="7 bobot Senin..Minggu, dipisah koma (default: akhir pekan lebih ramai)")
+    load_mode = generate.add_mutually_exclusive_group()
+    load_mode.add_argument("--bulk", dest="bulk", action="store_true", default=None,
+                           help="matikan trigger per baris dan bangun ulang indeks sesudahnya, dalam satu "
+                                "transaksi yang mengunci penulisan (default jika belum ada transaksi)")
+    load_mode.add_argument("--keep-triggers", dest="bulk", action="store_false",
+                           help="tulis lewat trigger per baris (lebih lambat, default jika sudah ada transaksi)")
+    generate.set_defaults(handler=cmd_generate, creates_db=True)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(format="%(levelname)s: %(message)s")
+    if not os.path.exists(args.db) and not getattr(args, "creates_db", False):
+        print(f"Error: database tidak ditemukan: {args.db}", file=sys.stderr)
+        return 2
+
+    # Reports and exports never write: no migrations, sample data or pruning
+    read_only = getattr(args, "read_only", False)
+    db = DatabaseManager(args.db, profile=args.profile, initialize=not read_only)
+    try:
+        if read_only and db.get_schema_version() < SCHEMA_VERSION:
+            print(f"Error: skema database versi {db.get_schema_version()}, butuh versi "
+                  f"{SCHEMA_VERSION}; jalankan dulu: python -m restaurant --db {args.db} migrate",
+                  file=sys.stderr)
+            return 2
+        return args.handler(db, args)
+    except (OSError, RuntimeError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
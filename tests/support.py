@@ -0,0 +1,52 @@
+# tests/support.py - Shared fixtures for the database tests
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from db_manager import DatabaseManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METHODS = ["Cash", "Debit Card", "Credit Card", "E-Wallet"]
+STATUSES = ["Completed", "Pending", None]
+
+
+def page_through(fetch_page, page_size, sort):
+    """Collect every row of a keyset-paginated source"""
+    rows, cursor = fetch_page(None, page_size, sort=sort)
+    while cursor is not None:
+        page, cursor = fetch_page(cursor, page_size, sort=sort)
+        rows.extend(page)
+    return rows
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Test case with a fresh, fully migrated database in a temporary folder"""
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.db = self.open_db()
+
+    def open_db(self, name="test.db", **options):
+        options.setdefault("slow_query_ms", None)
+        db = DatabaseManager(os.path.join(self.workdir, name), **options)
+        self.addCleanup(db.close_connection)
+        return db
+
+    def query(self, sql, params=()):
+        with self.db.pool.read_connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def add_payments(self, count, seed=1):
+        """Insert ``count`` payments with repeated values and NULL statuses/notes"""
+        rng = random.Random(seed)
+        records = [
+            (f"Pelanggan {rng.randrange(20)}", float(rng.randrange(1, 30) * 1000),
+             rng.choice(METHODS), rng.choice(STATUSES),
+             f"2024-03-{rng.randrange(1, 29):02d} {rng.randrange(24):02d}:00:00",
+             rng.choice(["bungkus", "", None]))
+            for _ in range(count)
+        ]
+        return self.db.add_payments_bulk(records)
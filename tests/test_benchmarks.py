@@ -0,0 +1,53 @@
+# tests/test_benchmarks.py - Fixture checks and baseline comparison of the benchmark suite
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+import data_generator
+from benchmarks import bench_db
+from tests.support import DatabaseTestCase
+
+TINY = dict(payments=2000, customers=50, menu_items=20, days=30)
+
+
+class FixtureCheckTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(bench_db.FIXTURE_SIZES, tiny=TINY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db = self.open_db("fixture.db")
+        with self.db.bulk_load():
+            data_generator.generate(self.db, end=bench_db.FIXTURE_END, seed=bench_db.FIXTURE_SEED, **TINY)
+
+    def test_generated_data_passes(self):
+        bench_db.check_fixture(self.db, "tiny")
+
+    def test_unsold_menu_items_are_reported(self):
+        self.db.add_menu_item("Tidak Laku", "Tambahan", 1000)
+        with self.assertRaisesRegex(RuntimeError, "orders use 20 of 21 available menu items"):
+            bench_db.check_fixture(self.db, "tiny")
+
+
+class CompareTest(unittest.TestCase):
+    def compare(self, old, new, threshold=0.25, min_delta_ms=0.2):
+        with contextlib.redirect_stderr(io.StringIO()):
+            return bench_db.compare({"results": {"10k": new}}, {"results": {"10k": old}},
+                                    threshold, min_delta_ms)
+
+    def test_latency_regressions(self):
+        old = {"slow": {"p50_ms": 10.0}, "noise": {"p50_ms": 0.1}, "same": {"p50_ms": 5.0}}
+        new = {"slow": {"p50_ms": 14.0}, "noise": {"p50_ms": 0.2}, "same": {"p50_ms": 5.5},
+               "new": {"p50_ms": 1.0}}
+        self.assertEqual([name for _, name, _ in self.compare(old, new)], ["slow"])
+
+    def test_throughput_regressions(self):
+        old = {"export": {"p50_ms": 100.0, "rows_per_s": 50000.0}}
+        self.assertEqual(self.compare(old, {"export": {"p50_ms": 90.0, "rows_per_s": 45000.0}}), [])
+        regressions = self.compare(old, {"export": {"p50_ms": 90.0, "rows_per_s": 30000.0}})
+        self.assertEqual([name for _, name, _ in regressions], ["export"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# tests/test_bulk_ingestion.py - Chunked bulk inserts
+import unittest
+
+from tests.support import DatabaseTestCase
+
+
+class BulkIngestionTest(DatabaseTestCase):
+    def test_ids_follow_input_order_across_chunks(self):
+        records = ({"customer_name": f"Pelanggan {number}", "total_amount": number * 1000,
+                    "payment_method": "Cash", "order_date": "2024-03-01 12:00:00"}
+                   for number in range(1, 26))
+        ids = self.db.add_payments_bulk(records, chunk_size=7)
+        self.assertEqual(len(ids), 25)
+        names = dict(self.query("SELECT id, customer_name FROM payments"))
+        self.assertEqual([names[payment_id] for payment_id in ids],
+                         [f"Pelanggan {number}" for number in range(1, 26)])
+
+    def test_left_out_columns_get_their_defaults(self):
+        [payment_id] = self.db.add_payments_bulk([("Budi", 15000, "Cash")])
+        status, order_date, notes = self.query(
+            "SELECT payment_status, order_date, notes FROM payments WHERE id = ?", (payment_id,))[0]
+        self.assertEqual((status, notes), ("Completed", ""))
+        self.assertIsNotNone(order_date)
+
+        [item_id] = self.db.add_menu_items_bulk([("Es Cendol", "Minuman", 8000)])
+        self.assertEqual(self.db.get_menu_item(item_id)[4:], ("", 1))
+
+    def test_bad_record_keeps_only_the_chunks_before_it(self):
+        records = ([("Budi", 1000, "Cash")] * 10 + [("Tanpa Metode", 1000, None)]
+                   + [("Sari", 1000, "Cash")] * 4)
+        with self.assertLogs("db_manager", "ERROR"):
+            self.assertIsNone(self.db.add_payments_bulk(records, chunk_size=5))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM payments")[0][0], 10)
+
+    def test_customers_and_order_lines(self):
+        customer_ids = self.db.add_customers_bulk([("Budi", "0811", "budi@example.com")])
+        [payment_id] = self.db.add_payments_bulk([
+            {"customer_name": "Budi", "total_amount": 30000, "payment_method": "Cash",
+             "customer_id": customer_ids[0]}])
+        menu_id = self.db.get_menu_items()[0][0]
+        self.db.add_order_items_bulk([(payment_id, menu_id, "Nasi Goreng", 2, 15000, 30000)])
+        self.assertEqual([row[3:] for row in self.db.get_order_items(payment_id)],
+                         [(2, 15000, 30000)])
+        self.assertEqual([row[1] for row in self.db.search_payments("0811")], ["Budi"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+# tests/test_change_notifications.py - Change listeners told about committed writes
+import unittest
+
+from tests.support import DatabaseTestCase
+
+
+class ChangeListenerTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.changes = []
+        self.db.add_change_listener(lambda *change: self.changes.append(change))
+
+    def test_single_writes_are_reported(self):
+        payment_id = self.db.add_payment("Budi", 15000, "Cash")
+        self.db.update_payment(payment_id, "Budi", 15000, "E-Wallet")
+        self.db.delete_payment(payment_id)
+        self.db.delete_payment(payment_id)
+        self.assertEqual(self.changes, [
+            ("payments", "insert", [payment_id]),
+            ("payments", "update", [payment_id]),
+            ("payments", "delete", [payment_id]),
+        ])
+
+    def test_grouped_writes_are_reported_after_the_commit(self):
+        with self.db.pool.connection():
+            first = self.db.add_payment("Budi", 15000, "Cash")
+            second = self.db.add_payment("Sari", 20000, "Cash")
+            self.assertEqual(self.changes, [])
+        self.assertEqual(self.changes, [
+            ("payments", "insert", [first]),
+            ("payments", "insert", [second]),
+        ])
+
+    def test_rolled_back_writes_are_not_reported(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.pool.connection():
+                self.db.add_payment("Budi", 15000, "Cash")
+                raise RuntimeError("batal")
+        self.assertEqual(self.changes, [])
+
+    def test_bulk_load_reports_one_reload_per_table(self):
+        with self.db.bulk_load():
+            self.add_payments(50)
+        self.assertEqual(self.changes, [("payments", "reload", []), ("menu_items", "reload", [])])
+
+    def test_failing_listener_does_not_stop_the_others(self):
+        def broken(*change):
+            raise ValueError("rusak")
+        self.db.add_change_listener(broken)
+        later = []
+        self.db.add_change_listener(lambda *change: later.append(change))
+        with self.assertLogs("db_manager", "ERROR"):
+            self.db.add_menu_item("Es Teler", "Minuman", 12000)
+        self.assertEqual(len(self.changes), 1)
+        self.assertEqual(later, self.changes)
+
+        self.db.remove_change_listener(broken)
+        with self.assertNoLogs("db_manager", "ERROR"):
+            self.db.add_menu_item("Es Campur", "Minuman", 12000)
+
+
+if __name__ == "__main__":
+    unittest.main()
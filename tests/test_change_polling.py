@@ -0,0 +1,69 @@
+# tests/test_change_polling.py - Picking up other processes' writes
+import sqlite3
+import unittest
+
+from db_manager import ROW_CHANGES_BATCH
+from tests.support import DatabaseTestCase
+
+
+class ChangePollingTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # A second manager stands in for another process on the same file
+        self.other = self.open_db(initialize=False)
+        self.changes = []
+        self.db.add_change_listener(lambda *change: self.changes.append(change))
+        self.assertFalse(self.db.poll_external_changes())
+
+    def raw_execute(self, sql):
+        conn = sqlite3.connect(self.db.db_name)
+        with conn:
+            conn.execute(sql)
+        conn.close()
+
+    def test_other_writers_are_delivered_once(self):
+        payment_id = self.other.add_payment("Budi", 15000, "Cash")
+        self.other.update_payment(payment_id, "Budi", 15000, "E-Wallet")
+        self.assertTrue(self.db.poll_external_changes())
+        self.assertEqual(self.changes, [
+            ("payments", "insert", [payment_id]),
+            ("payments", "update", [payment_id]),
+        ])
+        self.assertFalse(self.db.poll_external_changes())
+        self.assertEqual(len(self.changes), 2)
+
+    def test_nothing_is_delivered_while_unchanged(self):
+        for _ in range(3):
+            self.assertFalse(self.db.poll_external_changes())
+        self.assertEqual(self.changes, [])
+
+    def test_menu_writes_refresh_the_menu_cache(self):
+        self.assertEqual(self.db.find_menu_items_by_name("Es Teler"), [])
+        self.other.add_menu_item("Es Teler", "Minuman", 12000)
+        self.db.poll_external_changes()
+        self.assertEqual([row[1] for row in self.db.find_menu_items_by_name("Es Teler")], ["Es Teler"])
+
+    def test_failed_fetch_is_retried(self):
+        payment_id = self.other.add_payment("Budi", 15000, "Cash")
+        self.raw_execute("ALTER TABLE row_changes RENAME TO row_changes_hidden")
+        with self.assertLogs("db_manager", "ERROR"):
+            self.assertFalse(self.db.poll_external_changes())
+        self.raw_execute("ALTER TABLE row_changes_hidden RENAME TO row_changes")
+        self.assertTrue(self.db.poll_external_changes())
+        self.assertEqual(self.changes, [("payments", "insert", [payment_id])])
+
+    def test_large_backlog_becomes_a_reload(self):
+        self.other.add_payments_bulk([("Budi", 1000, "Cash")] * (ROW_CHANGES_BATCH + 1))
+        self.assertTrue(self.db.poll_external_changes())
+        self.assertEqual(self.changes, [("payments", "reload", []), ("menu_items", "reload", [])])
+
+    def test_prune_keeps_the_newest_entries(self):
+        self.other.add_payments_bulk([("Budi", 1000, "Cash")] * 30)
+        newest = self.query("SELECT MAX(seq) FROM row_changes")[0][0]
+        self.db.prune_row_changes(keep=10)
+        self.assertEqual(self.query("SELECT MIN(seq), COUNT(*) FROM row_changes"),
+                         [(newest - 9, 10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
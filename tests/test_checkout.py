@@ -0,0 +1,91 @@
+# tests/test_checkout.py - Atomic checkout of a payment and its order lines
+import sqlite3
+import unittest
+
+from tests.support import DatabaseTestCase
+
+
+class CheckoutTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.nasi, self.teh, self.habis = self.db.add_menu_items_bulk([
+            ("Nasi Uduk", "Makanan Utama", 18000),
+            ("Teh Tarik", "Minuman", 7000),
+            ("Sate Kambing", "Makanan Utama", 40000, "", False),
+        ])
+
+    def counts(self):
+        return (self.query("SELECT COUNT(*) FROM payments")[0][0],
+                self.query("SELECT COUNT(*) FROM order_items")[0][0])
+
+    def test_payment_and_lines_are_written_together(self):
+        payment_id = self.db.checkout("Budi", "Cash", [(self.nasi, 2), (self.teh, 3)], "pedas")
+        self.assertIsNotNone(payment_id)
+        self.assertEqual([row[1:] for row in self.db.get_order_items(payment_id)], [
+            (self.nasi, "Nasi Uduk", 2, 18000, 36000),
+            (self.teh, "Teh Tarik", 3, 7000, 21000),
+        ])
+        self.assertEqual(self.query(
+            "SELECT customer_name, total_amount, payment_method, notes FROM payments WHERE id = ?",
+            (payment_id,)), [("Budi", 57000, "Cash", "pedas")])
+
+    def test_lines_keep_the_price_at_checkout(self):
+        payment_id = self.db.checkout("Budi", "Cash", [(self.teh, 1)])
+        self.db.update_menu_item(self.teh, "Teh Tarik Besar", "Minuman", 9000)
+        self.assertEqual(self.db.get_order_items(payment_id)[0][2:], ("Teh Tarik", 1, 7000, 7000))
+
+    def test_refused_orders_write_nothing(self):
+        before = self.counts()
+        orders = {
+            "empty": [],
+            "zero quantity": [(self.nasi, 0)],
+            "negative quantity": [(self.nasi, 2), (self.teh, -1)],
+            "unknown item": [(self.nasi, 1), (999999, 1)],
+            "unavailable item": [(self.nasi, 1), (self.habis, 1)],
+        }
+        for reason, items in orders.items():
+            with self.subTest(reason):
+                with self.assertLogs("db_manager", "ERROR"):
+                    self.assertIsNone(self.db.checkout("Budi", "Cash", items))
+                self.assertEqual(self.counts(), before)
+
+    def test_failing_line_rolls_back_the_payment(self):
+        # Another process removes an item the menu cache still lists, so
+        # the payment row is written before the order line insert fails
+        self.db.get_menu_items()
+        other = sqlite3.connect(self.db.db_name)
+        with other:
+            other.execute("DELETE FROM menu_items WHERE id = ?", (self.teh,))
+        other.close()
+        before = self.counts()
+        with self.assertLogs("db_manager", "ERROR") as logs:
+            self.assertIsNone(self.db.checkout("Budi", "Cash", [(self.nasi, 1), (self.teh, 1)]))
+        self.assertIn("FOREIGN KEY", logs.output[0])
+        self.assertEqual(self.counts(), before)
+
+    def test_sold_items_cannot_be_deleted(self):
+        self.db.checkout("Budi", "Cash", [(self.nasi, 1)])
+        self.assertTrue(self.db.is_menu_item_sold(self.nasi))
+        with self.assertLogs("db_manager", "ERROR"):
+            self.assertFalse(self.db.delete_menu_item(self.nasi))
+        self.assertIsNotNone(self.db.get_menu_item(self.nasi))
+
+        self.assertFalse(self.db.is_menu_item_sold(self.teh))
+        self.assertTrue(self.db.delete_menu_item(self.teh))
+        self.assertIsNone(self.db.get_menu_item(self.teh))
+
+    def test_edited_total_stays_the_sum_of_the_lines(self):
+        payment_id = self.db.checkout("Budi", "Cash", [(self.nasi, 1)])
+        self.assertTrue(self.db.update_payment(payment_id, "Budi S.", 1, "E-Wallet", ""))
+        self.assertEqual(self.query(
+            "SELECT customer_name, total_amount, payment_method FROM payments WHERE id = ?",
+            (payment_id,)), [("Budi S.", 18000, "E-Wallet")])
+
+        manual_id = self.db.add_payment("Sari", 25000, "Cash")
+        self.db.update_payment(manual_id, "Sari", 30000, "Cash", "")
+        self.assertEqual(self.query("SELECT total_amount FROM payments WHERE id = ?", (manual_id,)),
+                         [(30000,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
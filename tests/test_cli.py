@@ -0,0 +1,93 @@
+# tests/test_cli.py - Headless report, export and maintenance commands
+import contextlib
+import csv
+import io
+import os
+import shutil
+import sqlite3
+import unittest
+
+import restaurant_cli
+from db_manager import SCHEMA_VERSION
+from tests.support import ROOT, DatabaseTestCase
+
+
+class CliTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.db.db_name
+        menu = {row[1]: row[0] for row in self.db.get_menu_items()}
+        self.db.checkout("Budi", "Cash", [(menu["Nasi Gudeg"], 2)])
+        self.db.checkout("Sari", "E-Wallet", [(menu["Es Jeruk"], 1)])
+
+    def run_cli(self, *argv):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            status = restaurant_cli.main(["--db", self.path, *argv])
+        return status, out.getvalue(), err.getvalue()
+
+    def test_text_report(self):
+        status, out, _ = self.run_cli("report", "--daily")
+        self.assertEqual(status, 0)
+        self.assertIn("Total Transaksi  : 2", out)
+        self.assertIn("Rp 35,000", out)
+        self.assertIn("E-Wallet", out)
+
+    def test_csv_exports(self):
+        report = os.path.join(self.workdir, "laporan.csv")
+        menu = os.path.join(self.workdir, "menu.csv")
+        self.assertEqual(self.run_cli("report", "--format", "csv", "-o", report)[0], 0)
+        self.assertEqual(self.run_cli("export-menu", menu)[0], 0)
+        with open(report, newline="", encoding="utf-8") as report_file:
+            self.assertEqual(len(list(csv.reader(report_file))), 3)
+        with open(menu, newline="", encoding="utf-8") as menu_file:
+            self.assertEqual(len(list(csv.reader(menu_file))), 10)
+
+    def test_reversed_range_is_rejected(self):
+        status, _, err = self.run_cli("report", "--from", "2024-03-10", "--to", "2024-03-01")
+        self.assertEqual(status, 2)
+        self.assertIn("--to", err)
+
+    def test_missing_database_is_not_created(self):
+        self.path = os.path.join(self.workdir, "tidak_ada.db")
+        self.assertEqual(self.run_cli("report")[0], 2)
+        self.assertFalse(os.path.exists(self.path))
+
+
+class ReadOnlyCommandTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # The database shipped with the app is still at the original schema
+        self.path = os.path.join(self.workdir, "baseline.db")
+        shutil.copyfile(os.path.join(ROOT, "restaurant_payment.db"), self.path)
+
+    def run_cli(self, *argv):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as err:
+            status = restaurant_cli.main(["--db", self.path, *argv])
+        return status, err.getvalue()
+
+    def schema_version(self):
+        with contextlib.closing(sqlite3.connect(self.path)) as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def test_report_on_old_schema_fails_without_writing(self):
+        status, err = self.run_cli("report")
+        self.assertEqual(status, 2)
+        self.assertIn("migrate", err)
+        self.assertEqual(self.schema_version(), 0)
+
+    def test_report_leaves_a_current_database_untouched(self):
+        self.assertEqual(self.run_cli("migrate")[0], 0)
+        self.assertEqual(self.schema_version(), SCHEMA_VERSION)
+        with contextlib.closing(sqlite3.connect(self.path)) as conn:
+            conn.execute("DELETE FROM menu_items")
+            conn.commit()
+
+        self.assertEqual(self.run_cli("report")[0], 0)
+        with contextlib.closing(sqlite3.connect(self.path)) as conn:
+            # The sample menu is not inserted again
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM menu_items").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# tests/test_csv_export.py - Streaming CSV exports
+import csv
+import gzip
+import os
+import unittest
+
+import exporters
+from exporters import ExportCancelled
+from tests.support import DatabaseTestCase
+
+
+class CsvExportTest(DatabaseTestCase):
+    def test_csv_and_gzip_round_trip(self):
+        rows = [(1, "Budi, \"Pak\"", 15000.0), (2, "Sari\nWulan", None)]
+        for name, opener in (("out.csv", open), ("out.csv.gz", gzip.open)):
+            with self.subTest(name=name):
+                path = os.path.join(self.workdir, name)
+                self.assertEqual(exporters.write_csv(path, ["ID", "Nama", "Total"], iter(rows)), 2)
+                with opener(path, "rt", newline="", encoding="utf-8") as csv_file:
+                    self.assertEqual(list(csv.reader(csv_file)), [
+                        ["ID", "Nama", "Total"], ["1", "Budi, \"Pak\"", "15000.0"], ["2", "Sari\nWulan", ""],
+                    ])
+
+    def test_cancelled_export_leaves_no_file(self):
+        path = os.path.join(self.workdir, "batal.csv")
+        seen = []
+
+        def progress(written):
+            seen.append(written)
+            return False
+        with self.assertRaises(ExportCancelled):
+            exporters.write_csv(path, ["ID"], ((i,) for i in range(50)), progress=progress, progress_every=10)
+        self.assertEqual(seen, [10])
+        self.assertFalse(os.path.exists(path))
+
+    def test_payments_stream_from_the_database(self):
+        self.add_payments(250)
+        path = os.path.join(self.workdir, "transaksi.csv")
+        seen = []
+        written = exporters.write_csv(path, exporters.PAYMENT_HEADERS,
+                                      self.db.iter_payments(chunk_size=40),
+                                      progress=seen.append, progress_every=100)
+        self.assertEqual((written, seen), (250, [100, 200, 250]))
+        with open(path, newline="", encoding="utf-8") as csv_file:
+            rows = list(csv.reader(csv_file))
+        self.assertEqual(rows[0], exporters.PAYMENT_HEADERS)
+        self.assertEqual([int(row[0]) for row in rows[1:]],
+                         [row[0] for row in self.db.iter_payments()])
+
+    def test_menu_availability_is_spelled_out(self):
+        rows = list(exporters.menu_csv_rows([(1, "Es Teh", "Minuman", 5000, "", 1),
+                                             (2, "Kopi", "Minuman", 9000, "", 0)]))
+        self.assertEqual([row[5] for row in rows], ["Ya", "Tidak"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_daily_sales.py - The trigger-maintained daily_sales rollup
+import unittest
+
+from db_manager import ROLLUP_REBUILD
+from tests.support import DatabaseTestCase
+
+
+class RollupTriggerTest(DatabaseTestCase):
+    def daily_sales(self):
+        with self.db.pool.read_connection() as conn:
+            return conn.execute("SELECT * FROM daily_sales ORDER BY 1, 2, 3").fetchall()
+
+    def assert_rollup_matches_rebuild(self):
+        maintained = self.daily_sales()
+        with self.db.pool.connection() as conn:
+            conn.executescript(f"SAVEPOINT check_rollup; {ROLLUP_REBUILD}")
+            rebuilt = conn.execute("SELECT * FROM daily_sales ORDER BY 1, 2, 3").fetchall()
+            conn.execute("ROLLBACK TO check_rollup")
+            conn.execute("RELEASE check_rollup")
+        self.assertEqual(maintained, rebuilt)
+
+    def test_rollup_follows_inserts_updates_and_deletes(self):
+        ids = self.add_payments(200)
+        self.assert_rollup_matches_rebuild()
+
+        for payment_id in ids[:20]:
+            self.db.update_payment(payment_id, "Diubah", 99000, "E-Wallet", "")
+        self.assert_rollup_matches_rebuild()
+
+        # Removing the day's smallest and largest amounts rescans min/max
+        with self.db.pool.connection() as conn:
+            conn.execute("""
+                DELETE FROM payments WHERE id IN (
+                    SELECT id FROM payments ORDER BY total_amount LIMIT 10)
+            """)
+            conn.execute("""
+                DELETE FROM payments WHERE id IN (
+                    SELECT id FROM payments ORDER BY total_amount DESC LIMIT 10)
+            """)
+            conn.execute("UPDATE payments SET payment_status = NULL WHERE id % 7 = 0")
+        self.assert_rollup_matches_rebuild()
+
+        for payment_id in ids[50:80]:
+            self.db.delete_payment(payment_id)
+        self.assert_rollup_matches_rebuild()
+
+    def test_checkout_and_bulk_load_keep_the_rollup(self):
+        menu_id = self.db.get_menu_items()[0][0]
+        self.db.checkout("Budi", "Cash", [(menu_id, 2)])
+        self.assert_rollup_matches_rebuild()
+
+        with self.db.bulk_load():
+            self.add_payments(100)
+        self.assert_rollup_matches_rebuild()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# tests/test_data_generator.py - Synthetic data generation and bulk loading
+import unittest
+from datetime import date
+
+import data_generator
+from tests.support import DatabaseTestCase
+
+
+class GenerateTest(DatabaseTestCase):
+    def triggers(self):
+        return self.query("SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name")
+
+    def test_bulk_orders_use_the_generated_items_and_customers(self):
+        with self.db.bulk_load():
+            written = data_generator.generate(self.db, payments=3000, customers=200,
+                                              menu_items=60, days=30, end=date(2024, 3, 31))
+        self.assertEqual(written["payments"], 3000)
+        sold = self.query("SELECT COUNT(DISTINCT menu_item_id) FROM order_items")[0][0]
+        buyers = self.query("SELECT COUNT(DISTINCT customer_id) FROM payments")[0][0]
+        self.assertGreater(sold, 40)
+        self.assertGreater(buyers, 150)
+        # Lines only point at rows that exist after the load
+        self.assertEqual(self.query("""
+            SELECT COUNT(*) FROM order_items
+            WHERE menu_item_id NOT IN (SELECT id FROM menu_items)
+        """)[0][0], 0)
+
+    def test_bulk_load_restores_triggers_and_indexes(self):
+        before = self.triggers()
+        with self.db.bulk_load():
+            data_generator.generate(self.db, payments=500, days=10, end=date(2024, 3, 31))
+        self.assertEqual(self.triggers(), before)
+        self.assertEqual(self.db.get_payment_totals()[0], 500)
+        self.assertEqual(self.db.get_sales_report("2024-03-01", "2024-04-01")[0], 500)
+        name = self.query("SELECT customer_name FROM payments WHERE customer_id IS NOT NULL LIMIT 1")[0][0]
+        self.assertTrue(self.db.search_payments(name.split()[0]))
+
+    def test_failed_bulk_load_keeps_nothing(self):
+        before = self.triggers()
+        with self.assertRaises(RuntimeError):
+            with self.db.bulk_load():
+                data_generator.generate(self.db, payments=500, days=10, end=date(2024, 3, 31))
+                raise RuntimeError("stopped")
+        self.assertEqual(self.triggers(), before)
+        self.assertEqual(self.db.get_payment_totals()[0], 0)
+
+    def test_same_seed_gives_the_same_data(self):
+        data_generator.generate(self.db, payments=200, days=10, end=date(2024, 3, 31), seed=7)
+        columns = "customer_name, total_amount, payment_method, order_date"
+        first = self.query(f"SELECT {columns} FROM payments")
+        other = self.open_db("other.db")
+        data_generator.generate(other, payments=200, days=10, end=date(2024, 3, 31), seed=7)
+        with other.pool.read_connection() as conn:
+            second = conn.execute(f"SELECT {columns} FROM payments").fetchall()
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
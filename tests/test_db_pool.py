@@ -0,0 +1,128 @@
+# tests/test_db_pool.py - ConnectionPool reader/writer and transaction rules
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from db_pool import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        self.pool = ConnectionPool(os.path.join(workdir, "pool.db"), configure=self.configure)
+        self.addCleanup(self.pool.close_all)
+        with self.pool.connection() as conn:
+            conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+
+    @staticmethod
+    def configure(connection):
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA busy_timeout = 5000")
+
+    def count(self):
+        with self.pool.read_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def test_reader_cannot_write(self):
+        with self.pool.read_connection() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO items (name) VALUES ('x')")
+
+    def test_connections_are_per_thread(self):
+        other = {}
+
+        def grab():
+            other["writer"] = self.pool.writer()
+            other["reader"] = self.pool.reader()
+        thread = threading.Thread(target=grab)
+        thread.start()
+        thread.join()
+        self.assertIs(self.pool.writer(), self.pool.writer())
+        self.assertIsNot(self.pool.writer(), self.pool.reader())
+        self.assertIsNot(other["writer"], self.pool.writer())
+        self.assertIsNot(other["reader"], self.pool.reader())
+
+    def test_nested_blocks_commit_once(self):
+        with self.pool.connection() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+            with self.pool.connection() as inner:
+                self.assertIs(inner, conn)
+                inner.execute("INSERT INTO items (name) VALUES ('b')")
+            self.assertTrue(conn.in_transaction)
+            self.assertEqual(self.count(), 0)
+        self.assertEqual(self.count(), 2)
+
+    def test_error_rolls_back_the_outer_block_and_drops_callbacks(self):
+        called = []
+        with self.assertRaises(RuntimeError):
+            with self.pool.connection() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('a')")
+                self.pool.after_commit(lambda: called.append("rolled back"))
+                with self.pool.connection() as inner:
+                    inner.execute("INSERT INTO items (name) VALUES ('b')")
+                    raise RuntimeError("boom")
+        self.assertEqual(self.count(), 0)
+        self.assertEqual(called, [])
+
+    def test_after_commit_waits_for_the_outermost_block(self):
+        called = []
+        with self.pool.connection():
+            with self.pool.connection():
+                self.pool.after_commit(lambda: called.append("committed"))
+            self.assertEqual(called, [])
+        self.assertEqual(called, ["committed"])
+
+        self.pool.after_commit(lambda: called.append("immediate"))
+        self.assertEqual(called, ["committed", "immediate"])
+
+    def test_other_threads_read_only_committed_rows(self):
+        seen = []
+
+        def read():
+            seen.append(self.count())
+        with self.pool.connection() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+            thread = threading.Thread(target=read)
+            thread.start()
+            thread.join()
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [0, 1])
+
+    def test_concurrent_writers_all_commit(self):
+        errors = []
+
+        def write(worker):
+            try:
+                for number in range(50):
+                    with self.pool.connection() as conn:
+                        conn.execute("INSERT INTO items (name) VALUES (?)", (f"{worker}-{number}",))
+            except sqlite3.Error as e:
+                errors.append(e)
+            finally:
+                self.pool.close_thread()
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.count(), 200)
+
+    def test_close_thread_opens_fresh_connections(self):
+        writer, reader = self.pool.writer(), self.pool.reader()
+        self.pool.close_thread()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            writer.execute("SELECT 1")
+        self.assertIsNot(self.pool.writer(), writer)
+        self.assertIsNot(self.pool.reader(), reader)
+        self.assertEqual(self.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# tests/test_exporters.py - Excel exports
+import importlib.util
+import os
+import unittest
+from datetime import datetime
+
+import exporters
+from exporters import ExportCancelled, FormattedValue, RUPIAH_FORMAT
+from tests.support import DatabaseTestCase
+
+HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+
+
+@unittest.skipUnless(HAS_OPENPYXL, "openpyxl is used to read the workbooks back")
+class XlsxExportTest(DatabaseTestCase):
+    def load(self, path):
+        import openpyxl
+        return openpyxl.load_workbook(path)
+
+    def test_values_formats_and_header(self):
+        path = os.path.join(self.workdir, "out.xlsx")
+        rows = [
+            (1, "A & B <c>\x01", FormattedValue(15000.0, RUPIAH_FORMAT), True, None,
+             FormattedValue(datetime(2024, 3, 1, 12, 30), exporters.DATETIME_FORMAT)),
+            (2, "", FormattedValue(None, RUPIAH_FORMAT), False, 2.5, datetime(2024, 3, 2)),
+        ]
+        headers = ["ID", "Nama", "Total", "Tersedia", "Nilai", "Tanggal"]
+        self.assertEqual(exporters.write_xlsx(path, [("Data", headers, rows), ("Kosong", ["X"], [])]), 2)
+
+        workbook = self.load(path)
+        self.assertEqual(workbook.sheetnames, ["Data", "Kosong"])
+        sheet = workbook["Data"]
+        self.assertEqual([cell.value for cell in sheet[1]], headers)
+        self.assertTrue(sheet["A1"].font.b)
+        self.assertEqual(sheet.column_dimensions["B"].width, 14)
+        self.assertEqual([cell.value for cell in sheet[2]],
+                         [1, "A & B <c>", 15000, True, None, datetime(2024, 3, 1, 12, 30)])
+        self.assertEqual(sheet["C2"].number_format, RUPIAH_FORMAT)
+        self.assertEqual(sheet["F2"].number_format, exporters.DATETIME_FORMAT)
+        self.assertEqual([cell.value for cell in sheet[3]],
+                         [2, "", None, False, 2.5, datetime(2024, 3, 2)])
+        self.assertEqual(workbook["Kosong"].max_row, 1)
+
+    def test_report_sheets_agree_on_a_time_bounded_range(self):
+        self.db.add_payments_bulk([
+            ("Budi", 10000, "Cash", "Completed", "2024-03-01 08:00:00"),
+            ("Sari", 20000, "Cash", "Completed", "2024-03-01 19:30:00"),
+            ("Joko", 30000, "E-Wallet", "Completed", "2024-03-02 12:00:00"),
+        ])
+        path = os.path.join(self.workdir, "laporan.xlsx")
+        self.assertEqual(exporters.export_report_xlsx(
+            self.db, path, "2024-03-01 12:00:00", "2024-03-03"), 8)
+
+        workbook = self.load(path)
+        summary = {row[0]: row[1] for row in workbook["Ringkasan"].iter_rows(min_row=2, values_only=True)}
+        daily = list(workbook["Ringkasan Harian"].iter_rows(min_row=2, values_only=True))
+        self.assertEqual(summary["Total Transaksi"], 2)
+        self.assertEqual(sum(row[1] for row in daily), 2)
+        self.assertEqual(summary["Total Pendapatan"], sum(row[2] for row in daily))
+        self.assertEqual(workbook["Detail Transaksi"].max_row, 3)
+
+    def test_cancelled_workbook_is_removed(self):
+        path = os.path.join(self.workdir, "batal.xlsx")
+        with self.assertRaises(ExportCancelled):
+            exporters.write_xlsx(path, [("Data", ["ID"], ((i,) for i in range(50)))],
+                                 progress=lambda written: False, progress_every=10)
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+# tests/test_gui_harness.py - One offscreen run of the GUI performance harness
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import unittest
+
+import data_generator
+from tests.support import ROOT, DatabaseTestCase
+
+# The harness runs as a script and imports bench_db from its own folder
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+import gui_harness  # noqa: E402
+
+HAS_PYQT5 = importlib.util.find_spec("PyQt5") is not None
+
+
+@unittest.skipUnless(HAS_PYQT5, "PyQt5 is not installed")
+class GuiHarnessRunTest(DatabaseTestCase):
+    def test_every_action_is_timed(self):
+        db = self.open_db("fixture.db")
+        with db.bulk_load():
+            data_generator.generate(db, payments=2000, customers=50, menu_items=20, days=30)
+        db.close_connection()
+
+        run = gui_harness.run_once(db.db_name, "offscreen")
+        self.assertEqual(sorted(run["timings"]), [
+            "first_paint", "first_tab_ready", "refresh_all_data", "search_menu",
+            "search_payments", "tab_about", "tab_menu", "tab_report",
+        ])
+        self.assertTrue(all(samples for samples in run["timings"].values()))
+        self.assertGreater(run["peak_rss_mb"], 0)
+
+
+class CompareRssTest(unittest.TestCase):
+    def test_growth_past_the_threshold_is_a_regression(self):
+        baseline = {"results": {"10k": {"peak_rss": {"peak_rss_mb": 100.0}}}}
+        with contextlib.redirect_stderr(io.StringIO()):
+            for peak, regressed in ((110.0, False), (120.0, True)):
+                results = {"results": {"10k": {"peak_rss": {"peak_rss_mb": peak}}}}
+                self.assertEqual(bool(gui_harness.compare_rss(results, baseline, 0.15)), regressed)
+
+
+if __name__ == "__main__":
+    unittest.main()
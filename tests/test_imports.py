@@ -0,0 +1,42 @@
+# tests/test_imports.py - Modules kept out of the startup import path
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from tests.support import ROOT
+
+HAS_PYQT5 = importlib.util.find_spec("PyQt5") is not None
+
+# Prints which of the named top-level modules got imported
+CHILD = """
+import json, sys
+import {module}
+print(json.dumps(sorted({{name.split(".")[0] for name in sys.modules}} & set({names!r}))))
+"""
+
+
+def imported_by(module, names):
+    process = subprocess.run(
+        [sys.executable, "-c", CHILD.format(module=module, names=list(names))],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    return json.loads(process.stdout)
+
+
+class ImportBudgetTest(unittest.TestCase):
+    @unittest.skipUnless(HAS_PYQT5, "PyQt5 is not installed")
+    def test_app_module_defers_the_database_and_exports(self):
+        self.assertEqual(imported_by("restaurant_app", [
+            "db_manager", "exporters", "sqlite3", "csv", "gzip", "pandas", "openpyxl", "pyarrow",
+        ]), [])
+
+    def test_exporters_defer_optional_packages(self):
+        self.assertEqual(imported_by("exporters", ["pandas", "openpyxl", "pyarrow"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
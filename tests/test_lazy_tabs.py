@@ -0,0 +1,49 @@
+# tests/test_lazy_tabs.py - Tabs built on first activation, database opened after show
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from tests.support import DatabaseTestCase  # noqa: E402
+
+app = QApplication.instance() or QApplication([])
+
+
+@unittest.skipUnless(isinstance(app, QApplication), "needs a QApplication, not a QCoreApplication")
+class LazyTabTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        # The window opens restaurant_payment.db in the working directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.workdir)
+        from restaurant_app import RestaurantPaymentApp
+        self.window = RestaurantPaymentApp()
+        self.addCleanup(self.close_window)
+
+    def close_window(self):
+        for executor in (self.window.payment_search, self.window.menu_search):
+            if executor is not None:
+                executor.shutdown()
+        if self.window.db_manager is not None:
+            self.window.db_manager.close_connection()
+        self.window.deleteLater()
+
+    def test_nothing_is_built_before_the_database_opens(self):
+        self.assertIsNone(self.window.db_manager)
+        self.assertEqual(self.window.built_tabs(), {})
+
+    def test_tabs_are_built_when_first_shown(self):
+        self.window.init_database()
+        self.assertEqual(list(self.window.built_tabs()), ["payment"])
+
+        self.window.tabs.setCurrentIndex(2)
+        self.assertEqual(sorted(self.window.built_tabs()), ["payment", "report"])
+        report = self.window.built_tabs()["report"]
+        self.window.tabs.setCurrentIndex(0)
+        self.window.tabs.setCurrentIndex(2)
+        self.assertIs(self.window.built_tabs()["report"], report)
+
+
+if __name__ == "__main__":
+    unittest.main()
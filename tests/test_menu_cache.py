@@ -0,0 +1,63 @@
+# tests/test_menu_cache.py - Menu reads served from the cached snapshot
+import unittest
+
+from menu_cache import MENU_COLUMNS
+from tests.support import DatabaseTestCase
+
+
+SELECT_MENU = f"SELECT {', '.join(MENU_COLUMNS)} FROM menu_items"
+
+
+class MenuCacheTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.add_menu_items_bulk([
+            ("ES TEH tawar", "Minuman", 4000),
+            ("Kopi Susu", "Minuman", 12000, "", False),
+            ("Soto Ayam", "Makanan Utama", 20000),
+            ("Soto Betawi", "Makanan Utama", 25000),
+        ])
+
+    def test_snapshot_is_reused_until_a_write(self):
+        cache = self.db.menu_cache()
+        self.db.get_menu_items()
+        self.assertIs(self.db.menu_cache(), cache)
+
+        writes = [
+            lambda item_id: self.db.add_menu_item("Teh Tarik", "Minuman", 7000),
+            lambda item_id: self.db.update_menu_item(item_id, "Es Teh Tawar", "Minuman", 4500),
+            lambda item_id: self.db.set_menu_item_available(item_id, False),
+            lambda item_id: self.db.delete_menu_item(item_id),
+        ]
+        item_id = self.db.find_menu_items_by_name("es teh tawar")[0][0]
+        for write in writes:
+            before = self.db.menu_cache()
+            self.assertTrue(write(item_id))
+            self.assertIsNot(self.db.menu_cache(), before)
+        self.assertIsNone(self.db.get_menu_item(item_id))
+        self.assertEqual(len(self.db.find_menu_items_by_name("teh tarik")), 1)
+
+    def test_lookups_agree_with_sql(self):
+        for term in ("soto", "SOTO", "minum", "teh", "x"):
+            with self.subTest(term=term):
+                pattern = f"%{term}%"
+                expected = self.query(
+                    SELECT_MENU + " WHERE name LIKE ? OR category LIKE ?", (pattern, pattern))
+                self.assertCountEqual(self.db.search_menu_items(term), expected)
+        self.assertEqual(self.db.get_menu_items_by_category("Minuman"), self.query(
+            SELECT_MENU + " WHERE category = 'Minuman' ORDER BY name, id"))
+        self.assertCountEqual(self.db.find_menu_items_by_name("es teh MANIS"), self.query(
+            SELECT_MENU + " WHERE name = 'Es Teh Manis' COLLATE NOCASE"))
+
+    def test_search_pages_cover_every_match(self):
+        expected = self.db.search_menu_items("a")
+        rows, cursor = self.db.search_menu_items_page("a", page_size=2)
+        while cursor is not None:
+            page, cursor = self.db.search_menu_items_page("a", cursor, page_size=2)
+            rows.extend(page)
+        self.assertCountEqual(rows, expected)
+        self.assertGreater(len(rows), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
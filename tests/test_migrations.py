@@ -0,0 +1,51 @@
+# tests/test_migrations.py - Schema migrations and the indexes they add
+import os
+import shutil
+import sqlite3
+import unittest
+
+from db_manager import SCHEMA_VERSION
+from tests.support import ROOT, DatabaseTestCase
+
+
+class MigrationTest(DatabaseTestCase):
+    def test_baseline_database_is_migrated(self):
+        # The database shipped with the app is still at the original schema
+        path = os.path.join(self.workdir, "baseline.db")
+        shutil.copyfile(os.path.join(ROOT, "restaurant_payment.db"), path)
+        with sqlite3.connect(path) as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 0)
+            conn.execute("""
+                INSERT INTO payments (customer_name, total_amount, payment_method, order_date, notes)
+                VALUES ('Budi', 25000, 'Cash', '2024-01-05 12:00:00', 'pedas')
+            """)
+        conn.close()
+
+        db = self.open_db("baseline.db")
+        self.assertEqual(db.get_schema_version(), SCHEMA_VERSION)
+        self.assertEqual(len(db.get_menu_items()), 9)
+        self.assertEqual([row[1] for row in db.search_payments("budi")], ["Budi"])
+        self.assertEqual(db.get_sales_report("2024-01-05", "2024-01-06")[:2], (1, 25000))
+        self.assertIn("2024-01", db.get_month_versions())
+
+    def test_migrating_twice_changes_nothing(self):
+        self.db.migrate_schema()
+        self.assertEqual(self.db.get_schema_version(), SCHEMA_VERSION)
+
+    def test_hot_queries_use_the_new_indexes(self):
+        queries = {
+            "idx_payments_order_date":
+                "SELECT * FROM payments WHERE order_date >= '2024-03-01' AND order_date < '2024-04-01'",
+            "idx_payments_method_date":
+                "SELECT * FROM payments WHERE payment_method = 'Cash' AND order_date >= '2024-03-01'",
+            "idx_order_items_payment": "SELECT * FROM order_items WHERE payment_id = 1",
+            "idx_order_items_menu_item": "SELECT * FROM order_items WHERE menu_item_id = 1",
+        }
+        for index, sql in queries.items():
+            with self.subTest(index=index):
+                plan = " ".join(row[3] for row in self.query("EXPLAIN QUERY PLAN " + sql))
+                self.assertIn(index, plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# tests/test_paging.py - Keyset-paginated payment queries
+import unittest
+
+from db_manager import DEFAULT_PAGE_SIZE
+from tests.support import DatabaseTestCase, page_through
+
+
+class PaymentPagingTest(DatabaseTestCase):
+    def test_default_order_is_newest_first(self):
+        self.add_payments(300)
+        rows = page_through(self.db.get_payments_page, 40, None)
+        keys = [(row[5], row[0]) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_last_page_has_no_cursor(self):
+        self.add_payments(80)
+        rows, cursor = self.db.get_payments_page(page_size=40)
+        rows, cursor = self.db.get_payments_page(cursor, 40)
+        self.assertEqual((len(rows), cursor), (40, None))
+        self.assertEqual(self.db.get_payments_page(page_size=100)[1], None)
+
+    def test_rows_added_while_paging_do_not_shift_pages(self):
+        ids = self.add_payments(100)
+        rows, cursor = self.db.get_payments_page(page_size=30)
+        # Newer than every row seen so far, so it belongs before the cursor
+        self.db.add_payments_bulk([("Baru", 1000, "Cash", "Completed", "2030-01-01 00:00:00")])
+        while cursor is not None:
+            page, cursor = self.db.get_payments_page(cursor, 30)
+            rows.extend(page)
+        self.assertEqual(sorted(row[0] for row in rows), sorted(ids))
+
+    def test_rows_by_ids_in_batches(self):
+        ids = self.add_payments(1200)
+        wanted = ids[::2] + [999999]
+        self.assertCountEqual([row[0] for row in self.db.get_payments_by_ids(wanted)], ids[::2])
+
+
+class PaymentSearchTest(DatabaseTestCase):
+    def test_search_payments_returns_every_match(self):
+        self.add_payments(DEFAULT_PAGE_SIZE * 3)
+        with self.db.pool.read_connection() as conn:
+            expected = conn.execute("SELECT COUNT(*) FROM payments WHERE notes = 'bungkus'").fetchone()[0]
+        self.assertGreater(expected, DEFAULT_PAGE_SIZE)
+        self.assertEqual(len(self.db.search_payments("bungkus")), expected)
+        self.assertEqual(len(self.db.search_payments("bungkus", limit=10)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# tests/test_parquet_export.py - Month-partitioned Parquet exports
+import importlib.util
+import os
+import unittest
+
+import exporters
+from tests.support import DatabaseTestCase
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class MonthVersionTest(DatabaseTestCase):
+    def test_writes_bump_only_their_month(self):
+        january, february = self.db.add_payments_bulk([
+            ("Budi", 10000, "Cash", "Completed", "2024-01-05 08:00:00"),
+            ("Sari", 20000, "Cash", "Completed", "2024-02-05 08:00:00"),
+        ])
+        before = self.db.get_month_versions()
+        self.db.update_payment(february, "Sari", 20000, "E-Wallet", "")
+        after = self.db.get_month_versions()
+        self.assertEqual(after["2024-01"], before["2024-01"])
+        self.assertGreater(after["2024-02"], before["2024-02"])
+
+        menu_id = self.db.get_menu_items()[0][0]
+        self.db.add_order_items_bulk([(january, menu_id, "Nasi Goreng", 1, 10000, 10000)])
+        self.assertGreater(self.db.get_month_versions()["2024-01"], after["2024-01"])
+
+        self.db.delete_payment(february)
+        self.assertGreater(self.db.get_month_versions()["2024-02"], after["2024-02"])
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class ParquetExportTest(DatabaseTestCase):
+    def test_only_changed_months_are_rewritten(self):
+        import pyarrow.parquet as pq
+        ids = self.db.add_payments_bulk([
+            ("Budi", 10000, "Cash", "Completed", "2024-01-05 08:00:00"),
+            ("Sari", 20000, "Cash", "Completed", "2024-02-05 08:00:00"),
+        ])
+        directory = os.path.join(self.workdir, "parquet")
+        self.assertEqual(exporters.export_parquet(self.db, directory), 2)
+        self.assertEqual(exporters.export_parquet(self.db, directory), 0)
+
+        self.db.update_payment(ids[1], "Sari", 20000, "E-Wallet", "")
+        self.assertEqual(exporters.export_parquet(self.db, directory), 1)
+        table = pq.read_table(os.path.join(directory, "payments", "month=2024-02", "part-0.parquet"))
+        self.assertEqual(table.column("payment_method").to_pylist(), ["E-Wallet"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# tests/test_query_stats.py - Statement timing and the slow-query log
+import gc
+import os
+import unittest
+
+import query_stats
+from db_manager import slow_query_log_path
+from query_stats import normalize_sql, percentile, slow_query_logger
+from tests.support import DatabaseTestCase
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_placeholder_lists_share_a_key(self):
+        self.assertEqual(normalize_sql("SELECT *\n  FROM t WHERE id IN (?, ?,?)"),
+                         "SELECT * FROM t WHERE id IN (?, ...)")
+
+    def test_percentile_is_nearest_rank(self):
+        values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.assertEqual(percentile(values, 0.5), 5)
+        self.assertEqual(percentile(values, 0.95), 10)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+
+class QueryStatsTest(DatabaseTestCase):
+    def handlers(self, path):
+        path = os.path.abspath(path)
+        return [handler for handler in slow_query_logger.handlers
+                if getattr(handler, "baseFilename", None) == path]
+
+    def test_finished_statements_are_counted(self):
+        self.db.query_stats.reset()
+        self.add_payments(30)
+        self.db.get_payments_page(page_size=10)
+        self.db.get_payments_page(page_size=10)
+        page_queries = [row for row in self.db.query_stats.snapshot()
+                        if row["sql"].startswith("SELECT id, customer_name")]
+        self.assertEqual(len(page_queries), 1)
+        self.assertEqual(page_queries[0]["count"], 2)
+        self.assertEqual(page_queries[0]["rows"], 22)
+
+    def test_writes_are_recorded_without_a_fetch(self):
+        self.db.query_stats.reset()
+        with self.db.pool.connection() as conn:
+            conn.executemany("INSERT INTO customers (name) VALUES (?)", [("Budi",), ("Sari",)])
+            conn.execute("INSERT INTO customers (name) VALUES ('Joko')")
+        with self.db.pool.read_connection() as conn:
+            names = [row[0] for row in conn.execute("SELECT name FROM customers")]
+        stats = {row["sql"]: row for row in self.db.query_stats.snapshot()}
+        self.assertEqual(stats["INSERT INTO customers (name) VALUES (?)"]["rows"], 2)
+        self.assertEqual(stats["INSERT INTO customers (name) VALUES ('Joko')"]["count"], 1)
+        self.assertEqual(stats["SELECT name FROM customers"]["rows"], len(names))
+
+    def test_statements_past_the_limit_share_one_entry(self):
+        stats = query_stats.QueryStats(slow_query_ms=None)
+        for number in range(query_stats.MAX_STATEMENTS + 5):
+            stats.record(None, f"SELECT {number}", (), 0.001, 1)
+        snapshot = {row["sql"]: row for row in stats.snapshot()}
+        self.assertEqual(len(snapshot), query_stats.MAX_STATEMENTS + 1)
+        self.assertEqual(snapshot[query_stats.OTHER_STATEMENTS]["count"], 5)
+
+    def test_dropped_cursor_is_not_recorded(self):
+        self.db.query_stats.reset()
+        with self.db.pool.read_connection() as conn:
+            conn.execute("SELECT id FROM menu_items").fetchone()
+        gc.collect()
+        self.assertEqual(self.db.query_stats.snapshot(), [])
+
+    def test_slow_statements_are_logged_with_their_plan(self):
+        db = self.open_db("slow.db", slow_query_ms=0)
+        with db.pool.read_connection() as conn:
+            conn.execute("SELECT name FROM menu_items WHERE id = ?", (1,)).fetchall()
+        log = slow_query_log_path(db.db_name)
+        for handler in self.handlers(log):
+            handler.flush()
+        with open(log, encoding="utf-8") as log_file:
+            text = log_file.read()
+        self.assertIn("SELECT name FROM menu_items WHERE id = ?", text)
+        self.assertIn("plan: SEARCH menu_items", text)
+
+    def test_slow_log_handler_is_shared_and_closed(self):
+        first = self.open_db("shared.db", slow_query_ms=0)
+        second = self.open_db("shared.db", slow_query_ms=0)
+        log = slow_query_log_path(first.db_name)
+        self.assertEqual(len(self.handlers(log)), 1)
+        first.close_connection()
+        self.assertEqual(len(self.handlers(log)), 1)
+        second.close_connection()
+        self.assertEqual(self.handlers(log), [])
+        self.assertNotIn(os.path.abspath(log), query_stats._slow_log_handlers)
+
+    def test_no_log_without_a_threshold(self):
+        db = self.open_db("quiet.db", slow_query_ms=None)
+        db.get_payments_page()
+        log = slow_query_log_path(db.db_name)
+        self.assertEqual(self.handlers(log), [])
+        self.assertFalse(os.path.exists(log))
+
+
+if __name__ == "__main__":
+    unittest.main()
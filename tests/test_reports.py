@@ -0,0 +1,81 @@
+# tests/test_reports.py - Sales reports over half-open date ranges
+import unittest
+from datetime import date
+
+from db_manager import day_range, month_range, week_range
+from tests.support import DatabaseTestCase, page_through
+
+
+class SalesReportTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db.add_payments_bulk([
+            ("Budi", 10000, "Cash", "Completed", "2024-03-01 08:00:00"),
+            ("Sari", 20000, "Cash", "Completed", "2024-03-01 19:30:00"),
+            ("Joko", 30000, "E-Wallet", "Pending", "2024-03-02 12:00:00"),
+            ("Rina", 40000, "Cash", None, "2024-03-02 23:59:59"),
+            ("Tono", 50000, "Cash", "Completed", "2024-03-03 00:00:00"),
+        ])
+
+    def summary_totals(self, start, end):
+        rows = self.db.get_daily_summary(start, end)
+        return sum(row[1] for row in rows), sum(row[2] for row in rows)
+
+    def test_day_ranges_include_start_and_exclude_end(self):
+        self.assertEqual(self.db.get_sales_report(*day_range(date(2024, 3, 2))), (2, 70000, 35000))
+        self.assertEqual(self.db.get_sales_report("2024-03-01", "2024-03-03")[:2], (4, 100000))
+        self.assertEqual(self.db.get_sales_report()[:2], (5, 150000))
+
+    def test_period_ranges(self):
+        self.assertEqual(day_range(date(2024, 3, 2)), ("2024-03-02", "2024-03-03"))
+        self.assertEqual(week_range(date(2024, 3, 6)), ("2024-03-04", "2024-03-11"))
+        self.assertEqual(month_range(date(2024, 12, 15)), ("2024-12-01", "2025-01-01"))
+
+    def test_daily_summary_groups_by_day_and_method(self):
+        self.assertEqual(self.db.get_daily_summary("2024-03-01", "2024-03-03"), [
+            ("2024-03-02", 1, 40000, 40000, "Cash"),
+            ("2024-03-02", 1, 30000, 30000, "E-Wallet"),
+            ("2024-03-01", 2, 30000, 15000, "Cash"),
+        ])
+
+    def test_time_bounded_ranges_agree_with_the_report(self):
+        ranges = [
+            ("2024-03-01 12:00:00", "2024-03-02 23:00:00"),
+            ("2024-03-01 08:00:00", None),
+            (None, "2024-03-02 12:00:00"),
+            ("2024-03-01", "2024-03-03 00:00:01"),
+        ]
+        for start, end in ranges:
+            with self.subTest(start=start, end=end):
+                count, revenue, _ = self.db.get_sales_report(start, end)
+                self.assertEqual(self.summary_totals(start, end), (count, revenue))
+        self.assertEqual(self.summary_totals("2024-03-01 12:00:00", "2024-03-02 23:00:00"),
+                         (2, 50000))
+
+
+class DateRangePagingTest(DatabaseTestCase):
+    def test_date_range_pages_stay_inside_the_range(self):
+        ids = self.add_payments(500)
+        with self.db.pool.read_connection() as conn:
+            expected = [row[0] for row in conn.execute(
+                "SELECT id FROM payments WHERE order_date >= '2024-03-10' AND order_date < '2024-03-20'"
+            )]
+        self.assertTrue(set(expected) < set(ids))
+        for sort in (None, ("payment_method", False), ("payment_status", True)):
+            with self.subTest(sort=sort):
+                rows = page_through(
+                    lambda cursor, size, sort: self.db.get_payments_page(
+                        cursor, size, "2024-03-10", "2024-03-20", sort),
+                    30, sort)
+                self.assertCountEqual([row[0] for row in rows], expected)
+
+    def test_exports_use_the_same_range(self):
+        self.add_payments(300)
+        expected = [row[0] for row in self.query(
+            "SELECT id FROM payments WHERE order_date >= '2024-03-10' AND order_date < '2024-03-20'")]
+        exported = [row[0] for row in self.db.iter_payments("2024-03-10", "2024-03-20", chunk_size=40)]
+        self.assertCountEqual(exported, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
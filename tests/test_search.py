@@ -0,0 +1,94 @@
+# tests/test_search.py - FTS5 search indexes and the triggers that keep them in sync
+import sqlite3
+import unittest
+
+from db_manager import SCHEMA_MIGRATIONS, SCHEMA_VERSION
+from tests.support import DatabaseTestCase
+
+
+class PaymentSearchIndexTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        menu = {row[1]: row[0] for row in self.db.get_menu_items()}
+        self.gudeg, self.soto = menu["Nasi Gudeg"], menu["Soto Ayam"]
+        self.first = self.db.checkout("Budi Santoso", "Cash", [(self.gudeg, 1)])
+        self.second = self.db.checkout("Sari Wulandari", "Cash", [(self.soto, 2)])
+
+    def found(self, term):
+        return [row[0] for row in self.db.search_payments(term)]
+
+    def test_checkout_indexes_name_and_items(self):
+        self.assertEqual(self.found("budi"), [self.first])
+        self.assertEqual(self.found("gudeg"), [self.first])
+        self.assertEqual(self.found("soto"), [self.second])
+        self.assertEqual(self.found("sari soto"), [self.second])
+
+    def test_numeric_term_lists_the_matching_id_first(self):
+        self.assertEqual(self.found(str(self.second))[0], self.second)
+
+    def test_renamed_line_is_found_by_its_new_name(self):
+        with self.db.pool.connection() as conn:
+            conn.execute("UPDATE order_items SET menu_item_name = 'Zebra' WHERE payment_id = ?",
+                         (self.second,))
+        self.assertEqual(self.found("zebra"), [self.second])
+        self.assertEqual(self.found("soto"), [])
+        self.assertEqual(self.found("gudeg"), [self.first])
+
+    def test_moved_line_updates_both_payments(self):
+        with self.db.pool.connection() as conn:
+            conn.execute("UPDATE order_items SET payment_id = ? WHERE payment_id = ?",
+                         (self.first, self.second))
+        self.assertEqual(self.found("soto"), [self.first])
+        self.assertEqual(self.found("gudeg"), [self.first])
+
+    def test_deleted_line_is_no_longer_found(self):
+        with self.db.pool.connection() as conn:
+            conn.execute("DELETE FROM order_items WHERE payment_id = ?", (self.second,))
+        self.assertEqual(self.found("soto"), [])
+
+    def test_payment_edits_and_deletes_reach_the_index(self):
+        self.db.update_payment(self.first, "Joko Widodo", 0, "Cash", "pedas")
+        self.assertEqual(self.found("budi"), [])
+        self.assertEqual(self.found("joko pedas"), [self.first])
+        self.db.delete_payment(self.second)
+        self.assertEqual(self.found("sari"), [])
+
+    def test_customer_contact_follows_the_customer(self):
+        customer_id = self.query("SELECT id FROM customers ORDER BY id LIMIT 1")[0][0]
+        paid = self.db.checkout("Pelanggan", "Cash", [(self.gudeg, 1)], customer_id=customer_id)
+        with self.db.pool.connection() as conn:
+            conn.execute("UPDATE customers SET phone = '0899123' WHERE id = ?", (customer_id,))
+        self.assertEqual(self.found("0899123"), [paid])
+        self.assertEqual([row[0] for row in self.db.search_customers("0899123")], [customer_id])
+
+
+class SearchIndexRepairTest(DatabaseTestCase):
+    def test_migration_repairs_items_written_by_the_old_trigger(self):
+        # Build a database at version 7, whose order_items_fts_update
+        # trigger stored the wrong item names on rename
+        path = f"{self.workdir}/old.db"
+        conn = sqlite3.connect(path)
+        for number, migration in enumerate(SCHEMA_MIGRATIONS[:7], start=1):
+            conn.executescript(f"BEGIN;\n{migration}\nPRAGMA user_version = {number};\nCOMMIT;")
+        conn.executescript("""
+            INSERT INTO menu_items (name, category, price) VALUES ('Nasi Gudeg', 'Makanan Utama', 15000);
+            INSERT INTO menu_items (name, category, price) VALUES ('Soto Ayam', 'Makanan Utama', 12000);
+            INSERT INTO customers (name) VALUES ('Budi');
+            INSERT INTO payments (customer_name, total_amount, payment_method) VALUES ('Budi', 15000, 'Cash');
+            INSERT INTO payments (customer_name, total_amount, payment_method) VALUES ('Sari', 12000, 'Cash');
+            INSERT INTO order_items (payment_id, menu_item_id, menu_item_name, quantity, unit_price, subtotal)
+            VALUES (1, 1, 'Nasi Gudeg', 1, 15000, 15000);
+            INSERT INTO order_items (payment_id, menu_item_id, menu_item_name, quantity, unit_price, subtotal)
+            VALUES (2, 2, 'Soto Ayam', 1, 12000, 12000);
+            UPDATE order_items SET menu_item_name = 'Zebra' WHERE payment_id = 2;
+        """)
+        conn.close()
+
+        db = self.open_db("old.db")
+        self.assertEqual(db.get_schema_version(), SCHEMA_VERSION)
+        self.assertEqual([row[0] for row in db.search_payments("zebra")], [2])
+        self.assertEqual([row[0] for row in db.search_payments("gudeg")], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_search_executor.py - Debounced, cancellable background search
+import os
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtCore import QCoreApplication  # noqa: E402
+
+from tests.support import DatabaseTestCase  # noqa: E402
+from widgets.search_executor import (  # noqa: E402
+    SearchExecutor, _SearchWorker, menu_search, payment_search,
+)
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+class SearchExecutorTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_payments(3000)
+
+    def wait_for(self, condition, timeout=10.0):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            self.assertLess(time.perf_counter(), deadline, "timed out")
+            app.processEvents()
+            time.sleep(0.001)
+
+    def test_only_the_latest_search_is_reported(self):
+        executor = SearchExecutor(self.db, payment_search, delay_ms=20)
+        self.addCleanup(executor.shutdown)
+        results = []
+        executor.results_ready.connect(lambda text, rows, cursor, sort: results.append((text, rows)))
+        for text in ("p", "pe", "pel", "bungkus"):
+            executor.submit(text)
+        self.wait_for(lambda: results)
+        time.sleep(0.1)
+        app.processEvents()
+        self.assertEqual([text for text, _ in results], ["bungkus"])
+        self.assertEqual(results[0][1], self.db.search_payments_page("bungkus")[0])
+
+    def test_keystrokes_within_the_delay_run_one_search(self):
+        calls = []
+
+        def counting_search(db_manager, text, sort):
+            calls.append((text, sort))
+            return payment_search(db_manager, text, sort)
+        executor = SearchExecutor(self.db, counting_search, delay_ms=100)
+        self.addCleanup(executor.shutdown)
+        results = []
+        executor.results_ready.connect(lambda *result: results.append(result))
+        for text in ("b", "bu", "bun"):
+            executor.submit(text)
+            app.processEvents()
+        executor.submit("bungkus", ("total_amount", True))
+        self.wait_for(lambda: results)
+        self.assertEqual(calls, [("bungkus", ("total_amount", True))])
+        self.assertEqual(results[0][3], ("total_amount", True))
+
+    def test_empty_text_lists_everything(self):
+        self.assertEqual(payment_search(self.db, "  "), self.db.get_payments_page())
+        self.assertEqual(menu_search(self.db, ""), self.db.get_menu_items_page())
+        self.assertEqual(menu_search(self.db, "teh"), self.db.search_menu_items_page("teh"))
+
+    def test_superseded_search_is_interrupted_without_logging_an_error(self):
+        executor = SearchExecutor(self.db, payment_search, delay_ms=10_000)
+        self.addCleanup(executor.shutdown)
+
+        def superseded_search(db_manager, text, sort):
+            # A newer search arrives while this one is still reading
+            executor.submit("newer")
+            return db_manager.get_payments_page(page_size=3000, sort=("customer_name", False))
+
+        # Run the worker on this thread, so the interrupt is observable here
+        worker = _SearchWorker(self.db, superseded_search, executor)
+        finished = []
+        worker.finished.connect(lambda *args: finished.append(args))
+        executor.submit("older")
+        with self.assertNoLogs("db_manager", level="ERROR"):
+            worker.run(executor._generation, "older", None)
+        self.assertEqual(finished, [])
+        self.db.pool.reader().set_progress_handler(None, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_sorting.py - Server-side sorting of the payment and menu tables
+import unittest
+
+from db_manager import PAYMENT_COLUMNS, payment_sort_key
+from menu_cache import MENU_COLUMNS
+from tests.support import DatabaseTestCase, page_through
+
+
+class PaymentSortTest(DatabaseTestCase):
+    def test_every_sort_column_returns_every_row_once(self):
+        ids = self.add_payments(700)
+        for column in PAYMENT_COLUMNS:
+            for descending in (False, True):
+                sort = (column, descending)
+                with self.subTest(sort=sort):
+                    rows = page_through(self.db.get_payments_page, 50, sort)
+                    self.assertCountEqual([row[0] for row in rows], ids)
+                    keys = [(value is not None, value, row_id)
+                            for value, row_id in (payment_sort_key(row, sort) for row in rows)]
+                    self.assertEqual(keys, sorted(keys, reverse=descending))
+
+    def test_amounts_and_ids_sort_as_numbers(self):
+        ids = self.db.add_payments_bulk([
+            ("Budi", amount, "Cash", "Completed", "2024-03-01 12:00:00")
+            for amount in (900, 10000, 2000, 15000.5)])
+        rows = page_through(self.db.get_payments_page, 2, ("total_amount", False))
+        self.assertEqual([row[2] for row in rows], [900, 2000, 10000, 15000.5])
+        rows = page_through(self.db.get_payments_page, 3, ("id", True))
+        self.assertEqual([row[0] for row in rows], sorted(ids, reverse=True))
+
+    def test_unknown_sort_column_is_rejected(self):
+        self.add_payments(5)
+        with self.assertRaises(ValueError):
+            self.db.get_payments_page(sort=("id; DROP TABLE payments", False))
+
+
+class PaymentSearchSortTest(DatabaseTestCase):
+    def test_sorted_search_pages_through_every_match(self):
+        self.add_payments(600)
+        with self.db.pool.read_connection() as conn:
+            expected = [row[0] for row in conn.execute(
+                "SELECT id FROM payments WHERE notes = 'bungkus'")]
+        for sort in (None, ("total_amount", True), ("payment_status", False), ("notes", True)):
+            with self.subTest(sort=sort):
+                rows = page_through(
+                    lambda cursor, size, sort: self.db.search_payments_page(
+                        "bungkus", cursor, size, sort),
+                    25, sort)
+                self.assertCountEqual([row[0] for row in rows], expected)
+
+
+class MenuPagingTest(DatabaseTestCase):
+    def test_every_sort_column_returns_every_item_once(self):
+        self.db.add_menu_items_bulk([
+            ("Menu Tanpa Deskripsi", "Tambahan", 1500, None, None),
+            ("Menu Lain", "Minuman", 1500, None, 0),
+        ])
+        ids = [row[0] for row in self.db.get_menu_items()]
+        for column in MENU_COLUMNS:
+            for descending in (False, True):
+                with self.subTest(sort=(column, descending)):
+                    rows = page_through(self.db.get_menu_items_page, 3, (column, descending))
+                    self.assertCountEqual([row[0] for row in rows], ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
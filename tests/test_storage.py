@@ -0,0 +1,42 @@
+# tests/test_storage.py - Storage profiles and the PRAGMAs they set
+import unittest
+
+from db_manager import DEFAULT_STORAGE_PROFILE, STORAGE_PROFILES
+from tests.support import DatabaseTestCase
+
+# PRAGMA synchronous reports a number
+SYNCHRONOUS_LEVELS = {"OFF": 0, "NORMAL": 1, "FULL": 2}
+
+
+class StorageProfileTest(DatabaseTestCase):
+    def assert_profile_in_effect(self, db, profile):
+        info = db.get_storage_info()
+        settings = STORAGE_PROFILES[profile]
+        self.assertEqual(info["profile"], profile)
+        self.assertEqual(info["journal_mode"].upper(), settings["journal_mode"])
+        self.assertEqual(info["synchronous"], SYNCHRONOUS_LEVELS[settings["synchronous"]])
+        self.assertEqual(info["cache_size"], settings["cache_size"])
+        self.assertEqual(info["busy_timeout"], settings["busy_timeout"])
+
+    def test_every_profile_is_applied(self):
+        for profile in STORAGE_PROFILES:
+            with self.subTest(profile=profile):
+                db = self.open_db(f"{profile}.db", profile=profile)
+                self.assert_profile_in_effect(db, profile)
+
+    def test_switching_profile_reconfigures_open_connections(self):
+        self.add_payments(10)
+        self.db.apply_storage_profile("durable")
+        self.assert_profile_in_effect(self.db, "durable")
+        self.assertEqual(len(self.db.get_payments()), 10)
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.open_db("other.db", profile="fast")
+        with self.assertRaises(ValueError):
+            self.db.apply_storage_profile("fast")
+        self.assertEqual(self.db.profile, DEFAULT_STORAGE_PROFILE)
+
+
+if __name__ == "__main__":
+    unittest.main()
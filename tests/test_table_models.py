@@ -0,0 +1,97 @@
+# tests/test_table_models.py - Paged table models behind the payment and menu grids
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtCore import QCoreApplication, Qt  # noqa: E402
+
+from tests.support import DatabaseTestCase  # noqa: E402
+from widgets.table_models import MenuTableModel, PaymentTableModel  # noqa: E402
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+class PagedTableModelTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ids = self.add_payments(250)
+        self.model = PaymentTableModel(self.db.get_payments_page, page_size=100)
+
+    def fetch_all(self):
+        while self.model.canFetchMore():
+            self.model.fetchMore()
+
+    def test_rows_are_fetched_a_page_at_a_time(self):
+        self.assertEqual(self.model.rowCount(), 0)
+        self.model.fetchMore()
+        self.assertEqual(self.model.rowCount(), 100)
+        self.assertTrue(self.model.canFetchMore())
+        self.fetch_all()
+        self.assertEqual(self.model.rowCount(), 250)
+        self.assertCountEqual([self.model.row_at(row)[0] for row in range(250)], self.ids)
+
+    def test_cells_are_formatted_on_demand(self):
+        self.model.fetchMore()
+        row = self.model.row_at(0)
+        self.assertEqual(self.model.data(self.model.index(0, 2)), f"Rp {row[2]:,.0f}")
+        self.assertEqual(self.model.data(self.model.index(0, 5)), row[5][:19])
+        self.assertIsNone(self.model.data(self.model.index(0, 2), Qt.EditRole))
+
+        menu = MenuTableModel(self.db.get_menu_items_page)
+        menu.fetchMore()
+        self.assertIn(menu.data(menu.index(0, 5)), ("Ya", "Tidak"))
+
+    def test_sorting_reloads_from_the_database(self):
+        self.model.fetchMore()
+        self.model.sort(2, Qt.DescendingOrder)
+        self.assertEqual(self.model.sort_order, ("total_amount", True))
+        self.fetch_all()
+        amounts = [self.model.row_at(row)[2] for row in range(self.model.rowCount())]
+        self.assertEqual(amounts, sorted(amounts, reverse=True))
+        self.assertEqual(len(amounts), 250)
+
+        self.model.sort(-1)
+        self.assertIsNone(self.model.sort_order)
+        self.assertEqual(self.model.rowCount(), 100)
+
+
+class RowPatchingTest(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_payments(150)
+        self.model = PaymentTableModel(page_size=50)
+        self.model.set_source(self.db.get_payments_page, accepts=lambda row: True)
+        self.model.fetchMore()
+        self.db.add_change_listener(
+            lambda table, op, ids: self.model.apply_change(op, ids, self.db.get_payments_by_ids))
+
+    def shown_ids(self):
+        return [self.model.row_at(row)[0] for row in range(self.model.rowCount())]
+
+    def expected_ids(self, count):
+        return [row[0] for row in self.db.get_payments_page(page_size=count)[0]]
+
+    def test_writes_patch_the_loaded_rows_in_place(self):
+        [newest] = self.db.add_payments_bulk([("Baru", 5000, "Cash", "Completed", "2030-01-01 00:00:00")])
+        self.assertEqual(self.shown_ids()[0], newest)
+
+        shown = self.shown_ids()
+        self.db.update_payment(shown[3], "Diubah", 1000, "E-Wallet", "")
+        self.assertEqual(self.model.row_at(3)[1], "Diubah")
+        self.db.delete_payment(shown[5])
+        self.assertNotIn(shown[5], self.shown_ids())
+        self.assertEqual(self.shown_ids(), self.expected_ids(self.model.rowCount()))
+
+    def test_rows_past_the_loaded_page_are_left_for_fetch_more(self):
+        self.db.add_payments_bulk([("Lama", 5000, "Cash", "Completed", "2000-01-01 00:00:00")])
+        self.assertEqual(self.model.rowCount(), 50)
+
+    def test_large_changes_reload(self):
+        self.add_payments(60, seed=2)
+        self.assertEqual(self.model.rowCount(), 0)
+        self.model.fetchMore()
+        self.assertEqual(self.shown_ids(), self.expected_ids(50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# tests/test_xlsx_writer.py - The streaming .xlsx writer
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from datetime import date, datetime
+
+from xlsx_writer import (
+    HEADER_STYLE, ROWS_PER_WRITE, FormattedValue, StreamingWorkbook, column_letter, excel_serial,
+)
+
+HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+
+
+class XlsxHelpersTest(unittest.TestCase):
+    def test_column_letters(self):
+        self.assertEqual([column_letter(index) for index in (1, 26, 27, 52, 703)],
+                         ["A", "Z", "AA", "AZ", "AAA"])
+
+    def test_excel_serial(self):
+        self.assertEqual(excel_serial(date(1900, 3, 1)), 61)
+        self.assertEqual(excel_serial(datetime(2024, 3, 1, 12)), 45352.5)
+
+
+@unittest.skipUnless(HAS_OPENPYXL, "openpyxl is used to read the workbooks back")
+class StreamingWorkbookTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        self.path = os.path.join(self.workdir, "out.xlsx")
+
+    def test_many_rows_and_wide_rows(self):
+        count = ROWS_PER_WRITE * 2 + 5
+        with StreamingWorkbook(self.path) as workbook:
+            sheet = workbook.add_sheet('Data "A" & <B>', [10, 20])
+            sheet.append(["ID", "Nilai"], HEADER_STYLE)
+            for number in range(count):
+                sheet.append([number, FormattedValue(number / 2, "0.00")])
+            sheet.close()
+            wide = workbook.add_sheet("Lebar")
+            wide.append(list(range(30)))
+            wide.close()
+
+        import openpyxl
+        loaded = openpyxl.load_workbook(self.path)
+        self.assertEqual(loaded.sheetnames, ['Data "A" & <B>', "Lebar"])
+        data = loaded.worksheets[0]
+        self.assertEqual(data.max_row, count + 1)
+        self.assertEqual([cell.value for cell in data[count + 1]], [count - 1, (count - 1) / 2])
+        self.assertEqual(data.cell(count + 1, 2).number_format, "0.00")
+        self.assertEqual([cell.value for cell in loaded["Lebar"][1]], list(range(30)))
+        self.assertEqual(loaded["Lebar"]["AD1"].value, 29)
+
+    def test_failed_export_closes_the_file(self):
+        with self.assertRaises(RuntimeError):
+            with StreamingWorkbook(self.path) as workbook:
+                sheet = workbook.add_sheet("Data")
+                sheet.append([1])
+                raise RuntimeError("gagal")
+        # Closed, so the caller can delete it
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertNotIn("xl/workbook.xml", archive.namelist())
+        os.remove(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# How often other processes' writes are looked for
+CHANGE_POLL_MS = 1000
+
+
+class DatabaseEvents(QObject):
+    """Qt signal for the change notifications of a DatabaseManager.
+
+    ``changed(table, op, ids)`` is emitted after every committed write.
+    Writes made on worker threads are delivered to GUI slots through a
+    queued connection, so the slots always run on the GUI thread. Writes
+    by other processes sharing the database file are picked up by polling
+    every ``poll_ms`` milliseconds.
+    """
+
+    changed = pyqtSignal(str, str, list)
+
+    def __init__(self, db_manager, parent=None, poll_ms=CHANGE_POLL_MS):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.db_manager.add_change_listener(self._forward)
+
+        # The first poll only records where the change log stands
+        self.db_manager.poll_external_changes()
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.db_manager.poll_external_changes)
+        self.poll_timer.start(poll_ms)
+
+    def _forward(self, table, op, ids):
+        self.changed.emit(table, op, list(ids))
+
+    def detach(self):
+        """Stop forwarding notifications, e.g. before the database closes"""
+        self.poll_timer.stop()
+        self.db_manager.remove_change_listener(self._forward)
@@ -0,0 +1,100 @@
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PyQt5.QtCore import Qt, QTimer
+
+# How often the numbers are refreshed while the dock is visible
+DIAGNOSTICS_REFRESH_MS = 1000
+
+DIAGNOSTICS_COLUMNS = [
+    ("Query", "sql"), ("Jumlah", "count"), ("Baris", "rows"),
+    ("p50 (ms)", "p50_ms"), ("p95 (ms)", "p95_ms"), ("p99 (ms)", "p99_ms"),
+    ("Maks (ms)", "max_ms"), ("Total (ms)", "total_ms"),
+]
+
+
+class DiagnosticsDock(QDockWidget):
+    """Live per-query latency numbers of a DatabaseManager's QueryStats"""
+
+    def __init__(self, parent=None, refresh_ms=DIAGNOSTICS_REFRESH_MS):
+        super().__init__("Diagnostik Database", parent)
+        self.setAllowedAreas(Qt.BottomDockWidgetArea | Qt.TopDockWidgetArea)
+        self.query_stats = None
+        self.slow_log_path = None
+
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        header_layout = QHBoxLayout()
+        self.summary_label = QLabel("Database belum dibuka")
+        header_layout.addWidget(self.summary_label)
+        header_layout.addStretch()
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.reset_stats)
+        header_layout.addWidget(self.reset_button)
+        layout.addLayout(header_layout)
+
+        self.table = QTableWidget(0, len(DIAGNOSTICS_COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for title, _ in DIAGNOSTICS_COLUMNS])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        widget.setLayout(layout)
+        self.setWidget(widget)
+
+        # Only refresh while someone is looking
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(refresh_ms)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    def set_stats(self, query_stats, slow_log_path=None):
+        """Show the numbers of a QueryStats, e.g. once the database is open"""
+        self.query_stats = query_stats
+        self.slow_log_path = slow_log_path
+        self.refresh()
+
+    def on_visibility_changed(self, visible):
+        if visible:
+            self.refresh()
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+
+    def reset_stats(self):
+        if self.query_stats is not None:
+            self.query_stats.reset()
+            self.refresh()
+
+    def refresh(self):
+        """Reload the table from the current statistics"""
+        if self.query_stats is None:
+            return
+        statements = self.query_stats.snapshot()
+
+        slow_ms = self.query_stats.slow_query_ms
+        summary = f"{len(statements)} query, {sum(s['count'] for s in statements):,} eksekusi"
+        if slow_ms is not None and self.slow_log_path:
+            summary += f" | query >= {slow_ms:g} ms dicatat di {self.slow_log_path}"
+        self.summary_label.setText(summary)
+
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(statements))
+        for row, statement in enumerate(statements):
+            for col, (_, key) in enumerate(DIAGNOSTICS_COLUMNS):
+                value = statement[key]
+                if isinstance(value, float):
+                    item = QTableWidgetItem(f"{value:,.2f}")
+                elif isinstance(value, int):
+                    item = QTableWidgetItem(f"{value:,}")
+                else:
+                    item = QTableWidgetItem(value)
+                    item.setToolTip(value)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+        self.table.setUpdatesEnabled(True)
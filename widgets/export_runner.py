@@ -0,0 +1,136 @@
+from PyQt5.QtCore import Qt, QObject, QThread, QCoreApplication, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QProgressDialog, QMessageBox, QFileDialog
+
+CSV_FILTER = "CSV Files (*.csv)"
+CSV_GZIP_FILTER = "CSV Gzip (*.csv.gz)"
+
+
+class _ExportWorker(QObject):
+    """Runs one export job on the runner's thread with its own pooled connection"""
+
+    progress = pyqtSignal(int)
+    succeeded = pyqtSignal(int)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, db_manager, job):
+        super().__init__()
+        self.db_manager = db_manager
+        self.job = job
+        self.cancel_requested = False
+
+    @pyqtSlot()
+    def run(self):
+        from exporters import ExportCancelled
+        try:
+            written = self.job(self.report_progress)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(written)
+        finally:
+            self.db_manager.pool.close_thread()
+
+    def report_progress(self, rows_written):
+        """Progress callback for the exporters; False stops the export"""
+        self.progress.emit(rows_written)
+        return not self.cancel_requested
+
+
+class ExportRunner(QObject):
+    """Background export with a cancellable progress dialog.
+
+    ``job(progress)`` does the whole export on a worker thread, calling
+    ``progress(rows_written)`` now and then, and returns the number of
+    rows written. ``total`` sizes the progress bar (0 for unknown).
+    """
+
+    def __init__(self, parent, db_manager, job, total, label, done_message):
+        super().__init__(parent)
+        self.parent_widget = parent
+        self.done_message = done_message
+
+        self.dialog = QProgressDialog(label, "Batal", 0, max(total, 0), parent)
+        self.dialog.setWindowTitle("Ekspor Data")
+        self.dialog.setWindowModality(Qt.WindowModal)
+        self.dialog.setMinimumDuration(300)
+        self.dialog.setAutoReset(False)
+        self.dialog.setValue(0)
+
+        self._thread = QThread(self)
+        self._worker = _ExportWorker(db_manager, job)
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.run)
+        self._worker.progress.connect(self._on_progress)
+        self._worker.succeeded.connect(self._on_succeeded)
+        self._worker.failed.connect(self._on_failed)
+        self._worker.cancelled.connect(self._on_cancelled)
+        self.dialog.canceled.connect(self.cancel)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        """Ask the export to stop at its next progress report"""
+        self._worker.cancel_requested = True
+
+    def is_running(self):
+        return self._thread.isRunning()
+
+    def shutdown(self):
+        """Cancel the export and wait for the worker thread to stop"""
+        if not self._thread.isRunning():
+            return
+        self.cancel()
+        self._thread.quit()
+        self._thread.wait()
+
+    def _on_progress(self, rows_written):
+        if self.dialog.maximum() and rows_written <= self.dialog.maximum():
+            self.dialog.setValue(rows_written)
+        self.dialog.setLabelText(f"{rows_written:,} baris diekspor...")
+
+    def _finish(self):
+        self._thread.quit()
+        self._thread.wait()
+        self.dialog.close()
+
+    def _on_succeeded(self, written):
+        self._finish()
+        QMessageBox.information(self.parent_widget, "Sukses", self.done_message)
+
+    def _on_failed(self, message):
+        self._finish()
+        QMessageBox.critical(self.parent_widget, "Error", f"Gagal mengekspor data: {message}")
+
+    def _on_cancelled(self):
+        self._finish()
+        QMessageBox.information(self.parent_widget, "Dibatalkan", "Ekspor dibatalkan.")
+
+
+def get_csv_save_path(parent, default_name):
+    """Ask where to save a CSV export; gzip is chosen by filter or .gz suffix"""
+    file_path, selected_filter = QFileDialog.getSaveFileName(
+        parent, "Simpan File CSV", default_name, f"{CSV_FILTER};;{CSV_GZIP_FILTER}"
+    )
+    if file_path and selected_filter == CSV_GZIP_FILTER and not file_path.endswith(".gz"):
+        file_path += ".gz"
+    return file_path
+
+
+def start_export(parent, db_manager, job, total, label, done_message):
+    """Start an ExportRunner unless the parent already has one running"""
+    runner = getattr(parent, "export_runner", None)
+    if runner is not None and runner.is_running():
+        QMessageBox.warning(parent, "Peringatan", "Ekspor lain masih berjalan!")
+        return None
+
+    parent.export_runner = ExportRunner(parent, db_manager, job, total, label, done_message)
+    parent.export_runner.start()
+    return parent.export_runner
@@ -0,0 +1,26 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+
+class LazyTab(QWidget):
+    """Tab page that creates its real content the first time it is needed.
+
+    ``factory()`` must return the content widget. Until then the page is an
+    empty placeholder, so adding the tab costs no database reads.
+    """
+
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self._factory = factory
+        self.widget = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def is_built(self):
+        return self.widget is not None
+
+    def ensure_built(self):
+        """Create the content widget if needed and return it"""
+        if self.widget is None:
+            self.widget = self._factory()
+            self.layout().addWidget(self.widget)
+        return self.widget
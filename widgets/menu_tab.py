@@ -1,12 +1,13 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
+    QPushButton, QTableView, QComboBox,
     QMessageBox, QScrollArea, QFrame, QTextEdit, QCheckBox
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
-import csv
-from PyQt5.QtWidgets import QFileDialog
+from menu_cache import menu_matches
+from widgets.export_runner import get_csv_save_path, start_export
+from widgets.table_models import MenuTableModel
 
 
 class MenuTab(QWidget):
@@ -117,22 +118,25 @@ class MenuTab(QWidget):
         scroll_area.setWidget(form_container)
         main_layout.addWidget(scroll_area)
 
-        # Table for menu items
-        self.menu_table = QTableWidget()
-        self.menu_table.setColumnCount(6)
-        self.menu_table.setHorizontalHeaderLabels([
-            "ID", "Nama Menu", "Kategori", "Harga", "Deskripsi", "Tersedia"
-        ])
+        # Table for menu items, backed by a model that fetches rows on demand
+        self.menu_model = MenuTableModel()
+        self.menu_table = QTableView()
+        self.menu_table.setModel(self.menu_model)
 
         # Table settings (Requirement 4: Scroll support)
         self.menu_table.setAlternatingRowColors(True)
-        self.menu_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.menu_table.setSelectionBehavior(QTableView.SelectRows)
+        self.menu_table.setSelectionMode(QTableView.SingleSelection)
+        self.menu_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.menu_table.setHorizontalScrollMode(QTableView.ScrollPerPixel)
+        self.menu_table.setVerticalScrollMode(QTableView.ScrollPerPixel)
+
+        # Header clicks sort the cached menu; by category until one is clicked
+        self.menu_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.menu_table.setSortingEnabled(True)
-        self.menu_table.setHorizontalScrollMode(QTableWidget.ScrollPerPixel)
-        self.menu_table.setVerticalScrollMode(QTableWidget.ScrollPerPixel)
 
         # Connect table selection
-        self.menu_table.itemSelectionChanged.connect(self.on_menu_selected)
+        self.menu_table.selectionModel().selectionChanged.connect(self.on_menu_selected)
 
         main_layout.addWidget(self.menu_table)
 
@@ -180,18 +184,24 @@ class MenuTab(QWidget):
         if success:
             QMessageBox.information(self, "Sukses", "Menu berhasil ditambahkan!")
             self.clear_form()
-            self.load_menu_items()
         else:
             QMessageBox.critical(self, "Error", "Gagal menambahkan menu!")
 
+    def selected_menu_item(self):
+        """Get the raw record of the selected menu item, or None"""
+        indexes = self.menu_table.selectionModel().selectedRows()
+        if not indexes:
+            return None
+        return self.menu_model.row_at(indexes[0].row())
+
     def update_menu_item(self):
         """Update selected menu item"""
-        selected_row = self.menu_table.currentRow()
-        if selected_row < 0:
+        menu_item = self.selected_menu_item()
+        if menu_item is None:
             QMessageBox.warning(self, "Error", "Pilih menu yang akan diupdate!")
             return
 
-        item_id = int(self.menu_table.item(selected_row, 0).text())
+        item_id = menu_item[0]
         name = self.menu_name_input.text().strip()
         category = self.category_combo.currentText().strip()
         price = self.price_input.text().strip()
@@ -219,19 +229,35 @@ class MenuTab(QWidget):
         if success:
             QMessageBox.information(self, "Sukses", "Menu berhasil diupdate!")
             self.clear_form()
-            self.load_menu_items()
         else:
             QMessageBox.critical(self, "Error", "Gagal mengupdate menu!")
 
     def delete_menu_item(self):
         """Delete selected menu item"""
-        selected_row = self.menu_table.currentRow()
-        if selected_row < 0:
+        menu_item = self.selected_menu_item()
+        if menu_item is None:
             QMessageBox.warning(self, "Error", "Pilih menu yang akan dihapus!")
             return
 
-        item_id = int(self.menu_table.item(selected_row, 0).text())
-        menu_name = self.menu_table.item(selected_row, 1).text()
+        item_id = menu_item[0]
+        menu_name = menu_item[1]
+
+        if self.db_manager.is_menu_item_sold(item_id):
+            # Sold items stay in the order history; they can only leave the menu
+            reply = QMessageBox.question(
+                self, "Menu Sudah Terjual",
+                f"Menu '{menu_name}' sudah pernah terjual sehingga tidak bisa dihapus.\n"
+                "Tandai sebagai tidak tersedia?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes
+            )
+            if reply == QMessageBox.Yes:
+                if self.db_manager.set_menu_item_available(item_id, False):
+                    QMessageBox.information(self, "Sukses", "Menu ditandai tidak tersedia!")
+                    self.clear_form()
+                else:
+                    QMessageBox.critical(self, "Error", "Gagal mengubah menu!")
+            return
 
         reply = QMessageBox.question(
             self, "Konfirmasi Hapus",
@@ -245,7 +271,6 @@ class MenuTab(QWidget):
             if success:
                 QMessageBox.information(self, "Sukses", "Menu berhasil dihapus!")
                 self.clear_form()
-                self.load_menu_items()
             else:
                 QMessageBox.critical(self, "Error", "Gagal menghapus menu!")
 
@@ -261,44 +286,24 @@ class MenuTab(QWidget):
         self.delete_menu_button.setEnabled(False)
 
     def load_menu_items(self):
-        """Load all menu items into table"""
-        menu_items = self.db_manager.get_menu_items()
-        self.menu_table.setRowCount(len(menu_items))
-
-        for row, item in enumerate(menu_items):
-            for col, data in enumerate(item):
-                if col == 3:  # Format price
-                    table_item = QTableWidgetItem(f"Rp {data:,.0f}")
-                elif col == 5:  # Format availability
-                    table_item = QTableWidgetItem("Ya" if data else "Tidak")
-                else:
-                    table_item = QTableWidgetItem(str(data))
-
-                if col == 0:  # Make ID read-only
-                    table_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        """Load menu items into table, one page at a time"""
+        self.menu_model.set_source(*self.search_source(""))
+        self.menu_model.fetchMore()
 
-                self.menu_table.setItem(row, col, table_item)
-
-        # Resize columns to content
+        # Resize columns to the first page only
         self.menu_table.resizeColumnsToContents()
 
     def on_menu_selected(self):
         """Handle menu selection"""
-        selected_row = self.menu_table.currentRow()
-        if selected_row >= 0:
+        menu_item = self.selected_menu_item()
+        if menu_item is not None:
             # Fill form with selected menu data
-            menu_name = self.menu_table.item(selected_row, 1).text()
-            category = self.menu_table.item(selected_row, 2).text()
-            price = self.menu_table.item(selected_row, 3).text()
-            # Remove currency formatting
-            price = price.replace("Rp ", "").replace(",", "")
-            description = self.menu_table.item(selected_row, 4).text()
-            available = self.menu_table.item(selected_row, 5).text() == "Ya"
+            _, menu_name, category, price, description, available = menu_item
 
             self.menu_name_input.setText(menu_name)
-            self.price_input.setText(price)
-            self.description_input.setPlainText(description)
-            self.available_checkbox.setChecked(available)
+            self.price_input.setText(f"{price:.0f}")
+            self.description_input.setPlainText(description or "")
+            self.available_checkbox.setChecked(bool(available))
 
             # Set category combo box
             index = self.category_combo.findText(category)
@@ -312,54 +317,50 @@ class MenuTab(QWidget):
             self.add_menu_button.setEnabled(False)
             self.delete_menu_button.setEnabled(True)
 
-    def search_menu_items(self, search_term):
-        """Search menu items by name or category"""
-        if search_term.strip():
-            menu_items = self.db_manager.search_menu_items(search_term)
-        else:
-            menu_items = self.db_manager.get_menu_items()
-
-        self.menu_table.setRowCount(len(menu_items))
+    def search_source(self, search_term):
+        """Get ``(fetch_page, accepts)`` for a search term (all menu items when empty)"""
+        if not search_term.strip():
+            return self.db_manager.get_menu_items_page, lambda menu_item: True
 
-        for row, item in enumerate(menu_items):
-            for col, data in enumerate(item):
-                if col == 3:  # Format price
-                    table_item = QTableWidgetItem(f"Rp {data:,.0f}")
-                elif col == 5:  # Format availability
-                    table_item = QTableWidgetItem("Ya" if data else "Tidak")
-                else:
-                    table_item = QTableWidgetItem(str(data))
-
-                if col == 0:  # Make ID read-only
-                    table_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+        return (
+            lambda cursor, page_size, sort=None:
+                self.db_manager.search_menu_items_page(search_term, cursor, page_size, sort),
+            lambda menu_item: menu_matches(menu_item, search_term)
+        )
 
-                self.menu_table.setItem(row, col, table_item)
+    def search_menu_items(self, search_term):
+        """Search menu items by name or category"""
+        self.menu_model.set_source(*self.search_source(search_term))
+        self.menu_model.fetchMore()
+        self.menu_table.resizeColumnsToContents()
 
+    def show_search_results(self, search_term, rows, next_cursor, sort=None):
+        """Show a first page of search results fetched in the background"""
+        fetch_page, accepts = self.search_source(search_term)
+        if sort != self.menu_model.sort_order:
+            # Sorted by another column while the search ran: fetch again
+            self.menu_model.set_source(fetch_page, accepts)
+            self.menu_model.fetchMore()
+        else:
+            self.menu_model.set_first_page(fetch_page, rows, next_cursor, accepts)
         self.menu_table.resizeColumnsToContents()
 
-    def export_menu_to_csv(self):
-        """Export menu items to CSV file"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Simpan File CSV", "menu_export.csv", "CSV Files (*.csv)"
-        )
+    def on_data_changed(self, table, op, ids):
+        """Patch the menu table after a database write"""
+        if table == "menu_items":
+            self.menu_model.apply_change(op, ids, self.db_manager.get_menu_items_by_ids)
 
+    def export_menu_to_csv(self):
+        """Export menu items to a CSV file in the background"""
+        from exporters import MENU_HEADERS, menu_csv_rows, write_csv
+        file_path = get_csv_save_path(self, "menu_export.csv")
         if file_path:
-            try:
-                with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-
-                    # Write headers
-                    headers = ["ID", "Nama Menu", "Kategori", "Harga", "Deskripsi", "Tersedia"]
-                    writer.writerow(headers)
-
-                    # Write data
-                    menu_items = self.db_manager.get_menu_items()
-                    for item in menu_items:
-                        # Convert boolean to text for CSV
-                        item_list = list(item)
-                        item_list[5] = "Ya" if item_list[5] else "Tidak"
-                        writer.writerow(item_list)
-
-                QMessageBox.information(self, "Sukses", f"Data menu berhasil diekspor ke {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Gagal mengekspor data: {str(e)}")
\ No newline at end of file
+            menu_items = self.db_manager.get_menu_items()
+            start_export(
+                self, self.db_manager,
+                lambda progress: write_csv(file_path, MENU_HEADERS,
+                                           menu_csv_rows(menu_items), progress=progress),
+                total=len(menu_items),
+                label="Mengekspor menu...",
+                done_message=f"Data menu berhasil diekspor ke {file_path}"
+            )
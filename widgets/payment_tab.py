@@ -1,19 +1,26 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
-    QPushButton, QTableWidget, QTableWidgetItem, QComboBox,
+    QPushButton, QTableView, QComboBox, QSpinBox,
+    QTableWidget, QTableWidgetItem,
     QMessageBox, QScrollArea, QFrame, QTextEdit
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
-import csv
-from PyQt5.QtWidgets import QFileDialog, QApplication
+from PyQt5.QtWidgets import QApplication
+from widgets.export_runner import get_csv_save_path, start_export
+from widgets.table_models import PaymentTableModel
 
 
 class PaymentTab(QWidget):
     def __init__(self, db_manager):
         super().__init__()
         self.db_manager = db_manager
+        # Cart of the order being built: menu item id -> quantity
+        self.cart = {}
+        # Menu items offered in the cart: menu item id -> (name, price)
+        self.menu_choices = {}
         self.init_ui()
+        self.load_menu_choices()
         self.load_payments()
 
     def init_ui(self):
@@ -65,11 +72,12 @@ class PaymentTab(QWidget):
         name_layout.addLayout(name_input_layout)
         input_layout.addLayout(name_layout)
 
-        # Total amount
+        # Total amount (computed from the cart; editable only when updating)
         amount_layout = QVBoxLayout()
         amount_layout.addWidget(QLabel("Total Pembayaran:"))
         self.total_amount_input = QLineEdit()
         self.total_amount_input.setPlaceholderText("0")
+        self.total_amount_input.setReadOnly(True)
         amount_layout.addWidget(self.total_amount_input)
         input_layout.addLayout(amount_layout)
 
@@ -86,6 +94,31 @@ class PaymentTab(QWidget):
 
         form_frame_layout.addLayout(input_layout)
 
+        # Cart: pick menu items and quantities for the order
+        cart_input_layout = QHBoxLayout()
+        cart_input_layout.addWidget(QLabel("Menu:"))
+        self.menu_item_combo = QComboBox()
+        cart_input_layout.addWidget(self.menu_item_combo, 1)
+        cart_input_layout.addWidget(QLabel("Jumlah:"))
+        self.quantity_spin = QSpinBox()
+        self.quantity_spin.setRange(1, 999)
+        cart_input_layout.addWidget(self.quantity_spin)
+        self.add_to_cart_button = QPushButton("Tambah ke Keranjang")
+        self.add_to_cart_button.clicked.connect(self.add_to_cart)
+        cart_input_layout.addWidget(self.add_to_cart_button)
+        self.remove_from_cart_button = QPushButton("Hapus Item")
+        self.remove_from_cart_button.clicked.connect(self.remove_from_cart)
+        cart_input_layout.addWidget(self.remove_from_cart_button)
+        form_frame_layout.addLayout(cart_input_layout)
+
+        self.cart_table = QTableWidget()
+        self.cart_table.setColumnCount(4)
+        self.cart_table.setHorizontalHeaderLabels(["Menu", "Harga", "Jumlah", "Subtotal"])
+        self.cart_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.cart_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.cart_table.setMaximumHeight(140)
+        form_frame_layout.addWidget(self.cart_table)
+
         # Notes field
         notes_layout = QVBoxLayout()
         notes_layout.addWidget(QLabel("Catatan:"))
@@ -116,23 +149,25 @@ class PaymentTab(QWidget):
         scroll_area.setWidget(form_container)
         main_layout.addWidget(scroll_area)
 
-        # Table for payments
-        self.payments_table = QTableWidget()
-        self.payments_table.setColumnCount(7)
-        self.payments_table.setHorizontalHeaderLabels([
-            "ID", "Nama Pelanggan", "Total", "Metode Pembayaran",
-            "Status", "Tanggal", "Catatan"
-        ])
+        # Table for payments, backed by a model that fetches rows on demand
+        self.payments_model = PaymentTableModel()
+        self.payments_table = QTableView()
+        self.payments_table.setModel(self.payments_model)
 
         # Table settings (Requirement 3: Scroll support)
         self.payments_table.setAlternatingRowColors(True)
-        self.payments_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.payments_table.setSelectionBehavior(QTableView.SelectRows)
+        self.payments_table.setSelectionMode(QTableView.SingleSelection)
+        self.payments_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.payments_table.setHorizontalScrollMode(QTableView.ScrollPerPixel)
+        self.payments_table.setVerticalScrollMode(QTableView.ScrollPerPixel)
+
+        # Header clicks sort in the database; newest first until one is clicked
+        self.payments_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.payments_table.setSortingEnabled(True)
-        self.payments_table.setHorizontalScrollMode(QTableWidget.ScrollPerPixel)
-        self.payments_table.setVerticalScrollMode(QTableWidget.ScrollPerPixel)
 
         # Connect table selection
-        self.payments_table.itemSelectionChanged.connect(self.on_payment_selected)
+        self.payments_table.selectionModel().selectionChanged.connect(self.on_payment_selected)
 
         main_layout.addWidget(self.payments_table)
 
@@ -161,10 +196,63 @@ class PaymentTab(QWidget):
         else:
             QMessageBox.warning(self, "Peringatan", "Clipboard kosong!")
 
+    def load_menu_choices(self):
+        """Fill the cart's menu picker with available menu items"""
+        self.menu_choices = {}
+        self.menu_item_combo.clear()
+        for item_id, name, category, price, description, available in self.db_manager.get_menu_items():
+            if available:
+                self.menu_choices[item_id] = (name, price)
+                self.menu_item_combo.addItem(f"{name} - Rp {price:,.0f}", item_id)
+
+        # Drop cart lines whose menu item is no longer offered
+        removed = [item_id for item_id in self.cart if item_id not in self.menu_choices]
+        for item_id in removed:
+            del self.cart[item_id]
+        if removed:
+            self.refresh_cart()
+
+    def add_to_cart(self):
+        """Add the selected menu item to the cart"""
+        item_id = self.menu_item_combo.currentData()
+        if item_id is None:
+            QMessageBox.warning(self, "Error", "Pilih menu terlebih dahulu!")
+            return
+
+        self.cart[item_id] = self.cart.get(item_id, 0) + self.quantity_spin.value()
+        self.quantity_spin.setValue(1)
+        self.refresh_cart()
+
+    def remove_from_cart(self):
+        """Remove the selected line from the cart"""
+        row = self.cart_table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Error", "Pilih item keranjang yang akan dihapus!")
+            return
+
+        item_id = list(self.cart)[row]
+        del self.cart[item_id]
+        self.refresh_cart()
+
+    def refresh_cart(self):
+        """Redraw the cart table and its total"""
+        self.cart_table.setRowCount(len(self.cart))
+        total = 0
+        for row, (item_id, quantity) in enumerate(self.cart.items()):
+            name, price = self.menu_choices[item_id]
+            subtotal = price * quantity
+            total += subtotal
+            self.cart_table.setItem(row, 0, QTableWidgetItem(name))
+            self.cart_table.setItem(row, 1, QTableWidgetItem(f"Rp {price:,.0f}"))
+            self.cart_table.setItem(row, 2, QTableWidgetItem(str(quantity)))
+            self.cart_table.setItem(row, 3, QTableWidgetItem(f"Rp {subtotal:,.0f}"))
+
+        self.cart_table.resizeColumnsToContents()
+        self.total_amount_input.setText(f"{total:.0f}" if self.cart else "")
+
     def add_payment(self):
-        """Add new payment record"""
+        """Check out the cart as a new payment"""
         customer_name = self.customer_name_input.text().strip()
-        total_amount = self.total_amount_input.text().strip()
         payment_method = self.payment_method_combo.currentText()
         notes = self.notes_input.toPlainText().strip()
 
@@ -172,31 +260,32 @@ class PaymentTab(QWidget):
             QMessageBox.warning(self, "Error", "Nama pelanggan harus diisi!")
             return
 
-        try:
-            total_amount = float(total_amount)
-            if total_amount <= 0:
-                QMessageBox.warning(self, "Error", "Total pembayaran harus lebih dari 0!")
-                return
-        except ValueError:
-            QMessageBox.warning(self, "Error", "Total pembayaran harus berupa angka!")
+        if not self.cart:
+            QMessageBox.warning(self, "Error", "Keranjang masih kosong!")
             return
 
-        success = self.db_manager.add_payment(customer_name, total_amount, payment_method, notes)
+        success = self.db_manager.checkout(customer_name, payment_method, self.cart.items(), notes)
         if success:
             QMessageBox.information(self, "Sukses", "Pembayaran berhasil ditambahkan!")
             self.clear_form()
-            self.load_payments()
         else:
             QMessageBox.critical(self, "Error", "Gagal menambahkan pembayaran!")
 
+    def selected_payment(self):
+        """Get the raw record of the selected payment, or None"""
+        indexes = self.payments_table.selectionModel().selectedRows()
+        if not indexes:
+            return None
+        return self.payments_model.row_at(indexes[0].row())
+
     def update_payment(self):
         """Update selected payment record"""
-        selected_row = self.payments_table.currentRow()
-        if selected_row < 0:
+        payment = self.selected_payment()
+        if payment is None:
             QMessageBox.warning(self, "Error", "Pilih pembayaran yang akan diupdate!")
             return
 
-        payment_id = int(self.payments_table.item(selected_row, 0).text())
+        payment_id = payment[0]
         customer_name = self.customer_name_input.text().strip()
         total_amount = self.total_amount_input.text().strip()
         payment_method = self.payment_method_combo.currentText()
@@ -219,19 +308,18 @@ class PaymentTab(QWidget):
         if success:
             QMessageBox.information(self, "Sukses", "Pembayaran berhasil diupdate!")
             self.clear_form()
-            self.load_payments()
         else:
             QMessageBox.critical(self, "Error", "Gagal mengupdate pembayaran!")
 
     def delete_payment(self):
         """Delete selected payment record"""
-        selected_row = self.payments_table.currentRow()
-        if selected_row < 0:
+        payment = self.selected_payment()
+        if payment is None:
             QMessageBox.warning(self, "Error", "Pilih pembayaran yang akan dihapus!")
             return
 
-        payment_id = int(self.payments_table.item(selected_row, 0).text())
-        customer_name = self.payments_table.item(selected_row, 1).text()
+        payment_id = payment[0]
+        customer_name = payment[1]
 
         reply = QMessageBox.question(
             self, "Konfirmasi Hapus",
@@ -245,7 +333,6 @@ class PaymentTab(QWidget):
             if success:
                 QMessageBox.information(self, "Sukses", "Pembayaran berhasil dihapus!")
                 self.clear_form()
-                self.load_payments()
             else:
                 QMessageBox.critical(self, "Error", "Gagal menghapus pembayaran!")
 
@@ -253,108 +340,112 @@ class PaymentTab(QWidget):
         """Clear all form inputs"""
         self.customer_name_input.clear()
         self.total_amount_input.clear()
+        self.total_amount_input.setReadOnly(True)
         self.payment_method_combo.setCurrentIndex(0)
         self.notes_input.clear()
+        self.cart = {}
+        self.refresh_cart()
+        self.set_cart_enabled(True)
         self.update_button.setEnabled(False)
         self.add_button.setEnabled(True)
         self.delete_button.setEnabled(False)
 
-    def load_payments(self):
-        """Load all payments into table"""
-        payments = self.db_manager.get_payments()
-        self.payments_table.setRowCount(len(payments))
+    def set_cart_enabled(self, enabled):
+        """Enable or disable the cart controls"""
+        self.menu_item_combo.setEnabled(enabled)
+        self.quantity_spin.setEnabled(enabled)
+        self.add_to_cart_button.setEnabled(enabled)
+        self.remove_from_cart_button.setEnabled(enabled)
+        self.cart_table.setEnabled(enabled)
 
-        for row, payment in enumerate(payments):
-            for col, data in enumerate(payment):
-                if col == 2:  # Format currency
-                    item = QTableWidgetItem(f"Rp {data:,.0f}")
-                elif col == 5:  # Format date
-                    item = QTableWidgetItem(str(data)[:19])  # Remove microseconds
-                else:
-                    item = QTableWidgetItem(str(data))
-
-                if col == 0:  # Make ID read-only
-                    item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-
-                self.payments_table.setItem(row, col, item)
+    def load_payments(self):
+        """Load payments into table, one page at a time"""
+        self.payments_model.set_source(self.db_manager.get_payments_page, accepts=self.accepts_all)
+        self.payments_model.fetchMore()
 
-        # Resize columns to content
+        # Resize columns to the first page only
         self.payments_table.resizeColumnsToContents()
 
     def on_payment_selected(self):
         """Handle payment selection"""
-        selected_row = self.payments_table.currentRow()
-        if selected_row >= 0:
+        payment = self.selected_payment()
+        if payment is not None:
             # Fill form with selected payment data
-            customer_name = self.payments_table.item(selected_row, 1).text()
-            total_amount = self.payments_table.item(selected_row, 2).text()
-            # Remove currency formatting
-            total_amount = total_amount.replace("Rp ", "").replace(",", "")
-            payment_method = self.payments_table.item(selected_row, 3).text()
-            notes = self.payments_table.item(selected_row, 6).text() if self.payments_table.item(selected_row,
-                                                                                                 6) else ""
+            _, customer_name, total_amount, payment_method, _, _, notes = payment
+
+            # Existing payments are edited by total, not through the cart;
+            # orders with line items keep the sum of their lines
+            self.cart = {}
+            self.refresh_cart()
+            self.set_cart_enabled(False)
 
             self.customer_name_input.setText(customer_name)
-            self.total_amount_input.setText(total_amount)
+            self.total_amount_input.setReadOnly(bool(self.db_manager.get_order_items(payment[0])))
+            self.total_amount_input.setText(f"{total_amount:.0f}")
 
             # Set combo box selection
             index = self.payment_method_combo.findText(payment_method)
             if index >= 0:
                 self.payment_method_combo.setCurrentIndex(index)
 
-            self.notes_input.setPlainText(notes)
+            self.notes_input.setPlainText(notes or "")
 
             # Enable update and delete buttons
             self.update_button.setEnabled(True)
             self.add_button.setEnabled(False)
             self.delete_button.setEnabled(True)
 
-    def search_payments(self, search_term):
-        """Search payments by customer name or ID"""
-        if search_term.strip():
-            payments = self.db_manager.search_payments(search_term)
-        else:
-            payments = self.db_manager.get_payments()
-
-        self.payments_table.setRowCount(len(payments))
-
-        for row, payment in enumerate(payments):
-            for col, data in enumerate(payment):
-                if col == 2:  # Format currency
-                    item = QTableWidgetItem(f"Rp {data:,.0f}")
-                elif col == 5:  # Format date
-                    item = QTableWidgetItem(str(data)[:19])
-                else:
-                    item = QTableWidgetItem(str(data))
+    def search_source(self, search_term):
+        """Get the page source for a search term (all payments when empty).
+
+        Returns ``(fetch_page, accepts)``; ranked search results have no
+        ``accepts``, so new payments are not patched into them.
+        """
+        if not search_term.strip():
+            return self.db_manager.get_payments_page, self.accepts_all
+        return (
+            lambda cursor, page_size, sort=None:
+                self.db_manager.search_payments_page(search_term, cursor, page_size, sort),
+            None
+        )
 
-                if col == 0:  # Make ID read-only
-                    item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+    def accepts_all(self, payment):
+        return True
 
-                self.payments_table.setItem(row, col, item)
+    def search_payments(self, search_term):
+        """Search payments by customer name or ID"""
+        self.payments_model.set_source(*self.search_source(search_term))
+        self.payments_model.fetchMore()
+        self.payments_table.resizeColumnsToContents()
 
+    def show_search_results(self, search_term, rows, next_cursor, sort=None):
+        """Show a first page of search results fetched in the background"""
+        fetch_page, accepts = self.search_source(search_term)
+        if sort != self.payments_model.sort_order:
+            # Sorted by another column while the search ran: fetch again
+            self.payments_model.set_source(fetch_page, accepts)
+            self.payments_model.fetchMore()
+        else:
+            self.payments_model.set_first_page(fetch_page, rows, next_cursor, accepts)
         self.payments_table.resizeColumnsToContents()
 
-    def export_to_csv(self):
-        """Export payments to CSV file"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "Simpan File CSV", "pembayaran_export.csv", "CSV Files (*.csv)"
-        )
+    def on_data_changed(self, table, op, ids):
+        """Patch the payments table and menu picker after a database write"""
+        if table == "payments":
+            self.payments_model.apply_change(op, ids, self.db_manager.get_payments_by_ids)
+        elif table == "menu_items":
+            self.load_menu_choices()
 
+    def export_to_csv(self):
+        """Export payments to a CSV file in the background"""
+        from exporters import PAYMENT_HEADERS, write_csv
+        file_path = get_csv_save_path(self, "pembayaran_export.csv")
         if file_path:
-            try:
-                with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-
-                    # Write headers
-                    headers = ["ID", "Nama Pelanggan", "Total", "Metode Pembayaran",
-                               "Status", "Tanggal", "Catatan"]
-                    writer.writerow(headers)
-
-                    # Write data
-                    payments = self.db_manager.get_payments()
-                    for payment in payments:
-                        writer.writerow(payment)
-
-                QMessageBox.information(self, "Sukses", f"Data berhasil diekspor ke {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Gagal mengekspor data: {str(e)}")
\ No newline at end of file
+            start_export(
+                self, self.db_manager,
+                lambda progress: write_csv(file_path, PAYMENT_HEADERS,
+                                           self.db_manager.iter_payments(), progress=progress),
+                total=self.db_manager.get_payment_totals()[0],
+                label="Mengekspor pembayaran...",
+                done_message=f"Data berhasil diekspor ke {file_path}"
+            )
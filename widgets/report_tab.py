@@ -1,20 +1,30 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QDateEdit, QGroupBox,
+    QTableView, QDateEdit, QGroupBox, QComboBox,
     QMessageBox, QFileDialog, QFrame
 )
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
-import csv
-import pandas as pd
 from datetime import datetime
 import os
+from db_manager import day_range, week_range, month_range
+from widgets.export_runner import get_csv_save_path, start_export
+from widgets.table_models import PaymentTableModel
 
 
 class ReportTab(QWidget):
+    # Filter periods and the function that turns the selected date into a range
+    PERIODS = {
+        "Harian": day_range,
+        "Mingguan": week_range,
+        "Bulanan": month_range,
+        "Kustom": None,
+    }
+
     def __init__(self, db_manager):
         super().__init__()
         self.db_manager = db_manager
+        self.current_filter_range = None
         self.init_ui()
         self.load_reports()
 
@@ -53,12 +63,26 @@ class ReportTab(QWidget):
         filter_layout = QHBoxLayout()
         filter_group.setLayout(filter_layout)
 
+        filter_layout.addWidget(QLabel("Periode:"))
+        self.period_combo = QComboBox()
+        self.period_combo.addItems(list(self.PERIODS))
+        self.period_combo.currentTextChanged.connect(self.on_period_changed)
+        filter_layout.addWidget(self.period_combo)
+
         filter_layout.addWidget(QLabel("Tanggal:"))
         self.date_edit = QDateEdit()
         self.date_edit.setDate(QDate.currentDate())
         self.date_edit.setCalendarPopup(True)
         filter_layout.addWidget(self.date_edit)
 
+        # End date, only used for custom ranges (inclusive in the UI)
+        filter_layout.addWidget(QLabel("Sampai:"))
+        self.end_date_edit = QDateEdit()
+        self.end_date_edit.setDate(QDate.currentDate())
+        self.end_date_edit.setCalendarPopup(True)
+        self.end_date_edit.setEnabled(False)
+        filter_layout.addWidget(self.end_date_edit)
+
         self.filter_button = QPushButton("Filter")
         self.filter_button.clicked.connect(self.filter_by_date)
         filter_layout.addWidget(self.filter_button)
@@ -79,19 +103,20 @@ class ReportTab(QWidget):
         table_label.setFont(table_font)
         main_layout.addWidget(table_label)
 
-        self.report_table = QTableWidget()
-        self.report_table.setColumnCount(7)
-        self.report_table.setHorizontalHeaderLabels([
-            "ID", "Nama Pelanggan", "Total", "Metode Pembayaran",
-            "Status", "Tanggal", "Catatan"
-        ])
+        self.report_model = PaymentTableModel()
+        self.report_table = QTableView()
+        self.report_table.setModel(self.report_model)
 
         # Table settings
         self.report_table.setAlternatingRowColors(True)
-        self.report_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.report_table.setSelectionBehavior(QTableView.SelectRows)
+        self.report_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.report_table.setHorizontalScrollMode(QTableView.ScrollPerPixel)
+        self.report_table.setVerticalScrollMode(QTableView.ScrollPerPixel)
+
+        # Header clicks sort in the database; newest first until one is clicked
+        self.report_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         self.report_table.setSortingEnabled(True)
-        self.report_table.setHorizontalScrollMode(QTableWidget.ScrollPerPixel)
-        self.report_table.setVerticalScrollMode(QTableWidget.ScrollPerPixel)
 
         main_layout.addWidget(self.report_table)
 
@@ -106,78 +131,99 @@ class ReportTab(QWidget):
         self.export_report_button = QPushButton("Ekspor Laporan Lengkap")
         self.export_report_button.clicked.connect(self.export_report)
 
+        self.export_parquet_button = QPushButton("Ekspor Parquet")
+        self.export_parquet_button.setToolTip(
+            "Ekspor pembayaran dan item pesanan ke Parquet per bulan (hanya bulan yang berubah)"
+        )
+        self.export_parquet_button.clicked.connect(self.export_to_parquet)
+
         export_layout.addStretch()
         export_layout.addWidget(self.export_csv_button)
         export_layout.addWidget(self.export_excel_button)
         export_layout.addWidget(self.export_report_button)
+        export_layout.addWidget(self.export_parquet_button)
 
         main_layout.addLayout(export_layout)
 
     def load_reports(self):
         """Load all payment reports"""
-        payments = self.db_manager.get_payments()
-        self.report_table.setRowCount(len(payments))
+        self.current_filter_range = None
+        self.report_model.set_source(self.db_manager.get_payments_page, accepts=self.in_current_range)
+        self.report_model.fetchMore()
 
-        total_amount = 0
+        # Update summary
+        self.refresh_summary()
 
-        for row, payment in enumerate(payments):
-            for col, data in enumerate(payment):
-                if col == 2:  # Format currency
-                    item = QTableWidgetItem(f"Rp {data:,.0f}")
-                    total_amount += data
-                elif col == 5:  # Format date
-                    item = QTableWidgetItem(str(data)[:19])
-                else:
-                    item = QTableWidgetItem(str(data))
+        # Resize columns to the first page only
+        self.report_table.resizeColumnsToContents()
 
-                self.report_table.setItem(row, col, item)
+    def on_period_changed(self, period):
+        """Enable the end date only for custom ranges"""
+        self.end_date_edit.setEnabled(self.PERIODS[period] is None)
 
-        # Update summary
-        self.update_summary(len(payments), total_amount)
+    def get_selected_range(self):
+        """Get the half-open ``[start, end)`` range chosen in the filter"""
+        selected_date = self.date_edit.date().toPyDate()
+        range_of = self.PERIODS[self.period_combo.currentText()]
+        if range_of is not None:
+            return range_of(selected_date)
 
-        # Resize columns to content
-        self.report_table.resizeColumnsToContents()
+        # Custom range: the end date is inclusive, so stop at the next day
+        start = day_range(selected_date)[0]
+        end = day_range(self.end_date_edit.date().toPyDate())[1]
+        return start, end
 
     def filter_by_date(self):
-        """Filter transactions by selected date"""
-        selected_date = self.date_edit.date().toString("yyyy-MM-dd")
-        daily_report = self.db_manager.get_daily_report(selected_date)
-
-        # Get all payments for the selected date
-        self.db_manager.cursor.execute("""
-            SELECT id, customer_name, total_amount, payment_method, 
-                   payment_status, order_date, notes
-            FROM payments
-            WHERE DATE(order_date) = ?
-            ORDER BY order_date DESC
-        """, (selected_date,))
-
-        payments = self.db_manager.cursor.fetchall()
-        self.report_table.setRowCount(len(payments))
-
-        total_amount = 0
-
-        for row, payment in enumerate(payments):
-            for col, data in enumerate(payment):
-                if col == 2:  # Format currency
-                    item = QTableWidgetItem(f"Rp {data:,.0f}")
-                    total_amount += data
-                elif col == 5:  # Format date
-                    item = QTableWidgetItem(str(data)[:19])
-                else:
-                    item = QTableWidgetItem(str(data))
-
-                self.report_table.setItem(row, col, item)
+        """Filter transactions by the selected period"""
+        start, end = self.get_selected_range()
+        if start >= end:
+            QMessageBox.warning(self, "Error", "Tanggal akhir tidak boleh sebelum tanggal awal!")
+            return
+
+        self.current_filter_range = (start, end)
+
+        # Page through the payments within the selected range
+        self.report_model.set_source(
+            lambda cursor, page_size, sort=None:
+                self.db_manager.get_payments_page(cursor, page_size, start, end, sort),
+            accepts=self.in_current_range
+        )
+        self.report_model.fetchMore()
 
         # Update summary with filtered data
-        self.update_summary(len(payments), total_amount)
+        self.refresh_summary()
         self.report_table.resizeColumnsToContents()
 
     def reset_filter(self):
         """Reset filter and show all transactions"""
+        self.period_combo.setCurrentIndex(0)
         self.date_edit.setDate(QDate.currentDate())
+        self.end_date_edit.setDate(QDate.currentDate())
         self.load_reports()
 
+    def in_current_range(self, payment):
+        """Whether a payment falls inside the active date filter"""
+        if self.current_filter_range is None:
+            return True
+        start, end = self.current_filter_range
+        return start <= payment[5] < end
+
+    def refresh_summary(self):
+        """Re-read the summary totals for the active date filter.
+
+        Served by the daily_sales rollup, which the database keeps current
+        on every write, so this does not rescan payments.
+        """
+        start, end = self.current_filter_range or (None, None)
+        count, total, _ = self.db_manager.get_sales_report(start, end)
+        self.update_summary(count, total)
+
+    def on_data_changed(self, table, op, ids):
+        """Patch the report table and totals after a database write"""
+        if table == "payments":
+            self.report_model.apply_change(op, ids, self.db_manager.get_payments_by_ids)
+            self.refresh_summary()
+
     def update_summary(self, count, total):
         """Update summary labels"""
         avg = total / count if count > 0 else 0
@@ -187,244 +233,92 @@ class ReportTab(QWidget):
         self.avg_transaction_label.setText(f"Rata-rata per Transaksi: Rp {avg:,.0f}")
 
     def export_to_csv(self):
-        """Export current table data to CSV"""
-        try:
-            # Get file path from user
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Simpan Laporan CSV",
-                f"laporan_transaksi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                "CSV Files (*.csv)"
-            )
-
-            if not file_path:
-                return
-
-            # Get current table data
-            rows = self.report_table.rowCount()
-            cols = self.report_table.columnCount()
-
-            # Prepare data
-            data = []
-            headers = []
-
-            # Get headers
-            for col in range(cols):
-                headers.append(self.report_table.horizontalHeaderItem(col).text())
-
-            data.append(headers)
-
-            # Get data rows
-            for row in range(rows):
-                row_data = []
-                for col in range(cols):
-                    item = self.report_table.item(row, col)
-                    if item:
-                        row_data.append(item.text())
-                    else:
-                        row_data.append("")
-                data.append(row_data)
-
-            # Write to CSV
-            with open(file_path, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerows(data)
-
-            QMessageBox.information(self, "Sukses", f"Data berhasil diekspor ke {file_path}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal mengekspor data: {str(e)}")
+        """Export the payments of the active filter to CSV in the background"""
+        from exporters import write_csv
+        file_path = get_csv_save_path(
+            self, f"laporan_transaksi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        )
+        if not file_path:
+            return
+
+        start, end = self.current_filter_range or (None, None)
+        format_cell = self.report_model.format_cell
+        rows = (
+            [format_cell(col, data) for col, data in enumerate(payment)]
+            for payment in self.db_manager.iter_payments(start, end)
+        )
+        start_export(
+            self, self.db_manager,
+            lambda progress: write_csv(file_path, self.report_model.headers, rows, progress=progress),
+            total=self.db_manager.get_sales_report(start, end)[0],
+            label="Mengekspor laporan...",
+            done_message=f"Data berhasil diekspor ke {file_path}"
+        )
 
     def export_to_excel(self):
-        """Export current table data to Excel"""
-        try:
-            # Get file path from user
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Simpan Laporan Excel",
-                f"laporan_transaksi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                "Excel Files (*.xlsx)"
-            )
-
-            if not file_path:
-                return
-
-            # Get current table data
-            rows = self.report_table.rowCount()
-            cols = self.report_table.columnCount()
-
-            # Prepare data for DataFrame
-            data = []
-            headers = []
-
-            # Get headers
-            for col in range(cols):
-                headers.append(self.report_table.horizontalHeaderItem(col).text())
-
-            # Get data rows
-            for row in range(rows):
-                row_data = []
-                for col in range(cols):
-                    item = self.report_table.item(row, col)
-                    if item:
-                        # Clean currency formatting for Excel
-                        text = item.text()
-                        if col == 2 and text.startswith("Rp "):  # Total column
-                            # Remove "Rp " and commas, convert to number
-                            clean_number = text.replace("Rp ", "").replace(",", "")
-                            try:
-                                row_data.append(float(clean_number))
-                            except ValueError:
-                                row_data.append(text)
-                        else:
-                            row_data.append(text)
-                    else:
-                        row_data.append("")
-                data.append(row_data)
-
-            # Create DataFrame and export
-            df = pd.DataFrame(data, columns=headers)
-            df.to_excel(file_path, index=False, engine='openpyxl')
-
-            QMessageBox.information(self, "Sukses", f"Data berhasil diekspor ke {file_path}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal mengekspor data: {str(e)}")
+        """Export the payments of the active filter to Excel in the background"""
+        from exporters import export_payments_xlsx
+        file_path = self.get_excel_save_path(
+            "Simpan Laporan Excel", f"laporan_transaksi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        )
+        if not file_path:
+            return
+
+        start, end = self.current_filter_range or (None, None)
+        start_export(
+            self, self.db_manager,
+            lambda progress: export_payments_xlsx(self.db_manager, file_path, start, end, progress),
+            total=self.db_manager.get_sales_report(start, end)[0],
+            label="Mengekspor laporan...",
+            done_message=f"Data berhasil diekspor ke {file_path}"
+        )
 
     def export_report(self):
         """Export comprehensive report with summary and details"""
-        try:
-            # Get file path from user
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Simpan Laporan Lengkap",
-                f"laporan_lengkap_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                "Excel Files (*.xlsx)"
-            )
-
-            if not file_path:
-                return
-
-            # Create Excel writer
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-
-                # Sheet 1: Summary Report
-                summary_data = {
-                    'Keterangan': [
-                        'Total Transaksi',
-                        'Total Pendapatan',
-                        'Rata-rata per Transaksi',
-                        'Tanggal Generate Laporan'
-                    ],
-                    'Nilai': [
-                        self.total_transactions_label.text().split(': ')[1],
-                        self.total_revenue_label.text().split(': ')[1],
-                        self.avg_transaction_label.text().split(': ')[1],
-                        datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    ]
-                }
-
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Ringkasan', index=False)
-
-                # Sheet 2: Detailed Transactions
-                rows = self.report_table.rowCount()
-                cols = self.report_table.columnCount()
-
-                headers = []
-                for col in range(cols):
-                    headers.append(self.report_table.horizontalHeaderItem(col).text())
-
-                data = []
-                for row in range(rows):
-                    row_data = []
-                    for col in range(cols):
-                        item = self.report_table.item(row, col)
-                        if item:
-                            text = item.text()
-                            if col == 2 and text.startswith("Rp "):  # Total column
-                                clean_number = text.replace("Rp ", "").replace(",", "")
-                                try:
-                                    row_data.append(float(clean_number))
-                                except ValueError:
-                                    row_data.append(text)
-                            else:
-                                row_data.append(text)
-                        else:
-                            row_data.append("")
-                    data.append(row_data)
-
-                detail_df = pd.DataFrame(data, columns=headers)
-                detail_df.to_excel(writer, sheet_name='Detail Transaksi', index=False)
-
-                # Sheet 3: Daily Summary (if filtered by date)
-                if hasattr(self, 'current_filter_date'):
-                    daily_summary = self.get_daily_summary()
-                    daily_df = pd.DataFrame(daily_summary)
-                    daily_df.to_excel(writer, sheet_name='Ringkasan Harian', index=False)
-
-            QMessageBox.information(self, "Sukses", f"Laporan lengkap berhasil diekspor ke {file_path}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Gagal mengekspor laporan: {str(e)}")
-
-    def get_daily_summary(self):
-        """Get daily summary data for export"""
-        try:
-            # Get daily statistics from database
-            self.db_manager.cursor.execute("""
-                SELECT 
-                    DATE(order_date) as tanggal,
-                    COUNT(*) as total_transaksi,
-                    SUM(total_amount) as total_pendapatan,
-                    AVG(total_amount) as rata_rata,
-                    payment_method,
-                    COUNT(*) as jumlah_per_metode
-                FROM payments
-                GROUP BY DATE(order_date), payment_method
-                ORDER BY tanggal DESC, payment_method
-            """)
-
-            results = self.db_manager.cursor.fetchall()
-
-            summary_data = []
-            for result in results:
-                summary_data.append({
-                    'Tanggal': result[0],
-                    'Total Transaksi': result[1],
-                    'Total Pendapatan': f"Rp {result[2]:,.0f}",
-                    'Rata-rata': f"Rp {result[3]:,.0f}",
-                    'Metode Pembayaran': result[4],
-                    'Jumlah per Metode': result[5]
-                })
-
-            return summary_data
-
-        except Exception as e:
-            print(f"Error getting daily summary: {e}")
-            return []
+        from exporters import export_report_xlsx
+        file_path = self.get_excel_save_path(
+            "Simpan Laporan Lengkap", f"laporan_lengkap_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        )
+        if not file_path:
+            return
+
+        start, end = self.current_filter_range or (None, None)
+        start_export(
+            self, self.db_manager,
+            lambda progress: export_report_xlsx(self.db_manager, file_path, start, end, progress),
+            total=self.db_manager.get_sales_report(start, end)[0],
+            label="Mengekspor laporan lengkap...",
+            done_message=f"Laporan lengkap berhasil diekspor ke {file_path}"
+        )
+
+    def export_to_parquet(self):
+        """Export payments and order items to monthly Parquet partitions"""
+        from exporters import export_parquet
+        directory = QFileDialog.getExistingDirectory(self, "Pilih Folder Ekspor Parquet")
+        if not directory:
+            return
+
+        start_export(
+            self, self.db_manager,
+            lambda progress: export_parquet(self.db_manager, directory, progress=progress),
+            total=0,
+            label="Mengekspor Parquet...",
+            done_message=f"Data Parquet berhasil diekspor ke {directory}"
+        )
+
+    def get_excel_save_path(self, title, default_name):
+        """Ask where to save an Excel export"""
+        file_path, _ = QFileDialog.getSaveFileName(self, title, default_name, "Excel Files (*.xlsx)")
+        return file_path
 
     def get_current_table_data(self):
-        """Get current table data for other components"""
-        rows = self.report_table.rowCount()
-        cols = self.report_table.columnCount()
-
-        data = []
-        headers = []
-
-        # Get headers
-        for col in range(cols):
-            headers.append(self.report_table.horizontalHeaderItem(col).text())
-
-        # Get data
-        for row in range(rows):
-            row_data = []
-            for col in range(cols):
-                item = self.report_table.item(row, col)
-                if item:
-                    row_data.append(item.text())
-                else:
-                    row_data.append("")
-            data.append(row_data)
-
-        return {'headers': headers, 'data': data}
\ No newline at end of file
+        """Get the active filter's payments for other components.
+
+        ``data`` is a lazy iterator of typed database rows (numeric total,
+        text timestamp), read straight from SQL rather than from the grid.
+        """
+        start, end = self.current_filter_range or (None, None)
+        return {
+            'headers': list(self.report_model.headers),
+            'data': self.db_manager.iter_payments(start, end),
+        }
@@ -0,0 +1,135 @@
+import sqlite3
+
+from PyQt5.QtCore import Qt, QObject, QThread, QTimer, QCoreApplication, pyqtSignal, pyqtSlot
+
+from db_manager import is_interrupted
+
+# Delay after the last keystroke before a search is started
+SEARCH_DEBOUNCE_MS = 250
+
+
+class _SearchWorker(QObject):
+    """Runs searches on the executor's thread with its own pooled connection"""
+
+    finished = pyqtSignal(int, str, object, object, object)
+
+    def __init__(self, db_manager, search, executor):
+        super().__init__()
+        self.db_manager = db_manager
+        self.search = search
+        self.executor = executor
+        self.connected = False
+        self.generation = 0
+
+    @pyqtSlot(int, str, object)
+    def run(self, generation, text, sort):
+        """Run the search unless a newer one was submitted meanwhile"""
+        if not self.executor.is_current(generation):
+            return
+
+        if not self.connected:
+            # Abort a running statement as soon as it has been superseded
+            self.db_manager.pool.reader().set_progress_handler(self.is_stale, 1000)
+            self.connected = True
+
+        self.generation = generation
+        try:
+            rows, next_cursor = self.search(self.db_manager, text, sort)
+        except sqlite3.OperationalError as e:
+            if not is_interrupted(e):
+                raise
+            # Superseded on purpose: the newer search reports instead
+            return
+        if self.executor.is_current(generation):
+            self.finished.emit(generation, text, rows, next_cursor, sort)
+
+    def is_stale(self):
+        """SQLite progress handler: non-zero interrupts the statement"""
+        return 0 if self.executor.is_current(self.generation) else 1
+
+    @pyqtSlot()
+    def close(self):
+        """Close the worker's connections on its own thread"""
+        if self.connected:
+            self.db_manager.pool.close_thread()
+            self.connected = False
+
+
+class SearchExecutor(QObject):
+    """Debounced, cancellable background search.
+
+    ``search(db_manager, text, sort)`` must return ``(rows, next_cursor)``
+    and is run on a worker thread. Each submitted text supersedes the
+    previous one: the debounce timer restarts, a running query is
+    interrupted and results of superseded searches are dropped, so
+    ``results_ready`` only ever carries the latest result, along with the
+    sort it was submitted with.
+    """
+
+    results_ready = pyqtSignal(str, object, object, object)
+    _run_requested = pyqtSignal(int, str, object)
+
+    def __init__(self, db_manager, search, delay_ms=SEARCH_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self._generation = 0
+        self._pending_text = ""
+        self._pending_sort = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._dispatch)
+
+        self._thread = QThread(self)
+        self._worker = _SearchWorker(db_manager, search, self)
+        self._worker.moveToThread(self._thread)
+        self._run_requested.connect(self._worker.run)
+        self._worker.finished.connect(self._on_finished)
+        self._thread.finished.connect(self._worker.close, Qt.DirectConnection)
+        self._thread.start()
+
+        # Make sure the thread is stopped even if the window never closes
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def submit(self, text, sort=None):
+        """Schedule a search for text, superseding any earlier one"""
+        self._generation += 1
+        self._pending_text = text
+        self._pending_sort = sort
+        self._timer.start()
+
+    def is_current(self, generation):
+        """Whether generation is still the latest submitted search"""
+        return generation == self._generation
+
+    def shutdown(self):
+        """Cancel pending work and stop the worker thread"""
+        if not self._thread.isRunning():
+            return
+        self._timer.stop()
+        self._generation += 1
+        self._thread.quit()
+        self._thread.wait()
+
+    def _dispatch(self):
+        self._run_requested.emit(self._generation, self._pending_text, self._pending_sort)
+
+    def _on_finished(self, generation, text, rows, next_cursor, sort):
+        if self.is_current(generation):
+            self.results_ready.emit(text, rows, next_cursor, sort)
+
+
+def payment_search(db_manager, text, sort=None):
+    """First page of payments for the search dock (all when text is empty)"""
+    if text.strip():
+        return db_manager.search_payments_page(text, sort=sort)
+    return db_manager.get_payments_page(sort=sort)
+
+
+def menu_search(db_manager, text, sort=None):
+    """First page of menu items for the search dock (all when text is empty)"""
+    if text.strip():
+        return db_manager.search_menu_items_page(text, sort=sort)
+    return db_manager.get_menu_items_page(sort=sort)
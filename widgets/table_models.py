@@ -0,0 +1,299 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from db_manager import DEFAULT_PAGE_SIZE, PAYMENT_COLUMNS, payment_sort_key
+from menu_cache import MENU_COLUMNS, MenuCache
+
+
+class PagedTableModel(QAbstractTableModel):
+    """Read-only table model that pulls rows from the database page by page.
+
+    Rows are kept as the raw tuples returned by the database and are only
+    formatted when the view asks for a cell, so no per-cell objects are
+    created for rows that are never painted.
+
+    Sorting is done by the source: sort() stores a ``(column, descending)``
+    pair of source column names and reloads, and every page is fetched
+    with ``fetch_page(cursor, page_size, sort=...)``.
+    """
+
+    headers = []
+    # Source column behind each header, used by sort()
+    columns = ()
+    # Order of the unfiltered, unsorted source: source_key(row), ascending
+    # unless descending
+    descending = False
+
+    def __init__(self, fetch_page=None, page_size=DEFAULT_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self._fetch_page = None
+        self._rows = []
+        self._cursor = None
+        self._has_more = False
+        self._accepts = None
+        # (column, descending) chosen with sort(), or None for the source order
+        self.sort_order = None
+        if fetch_page is not None:
+            self.set_source(fetch_page)
+
+    def set_source(self, fetch_page, accepts=None):
+        """Replace the row source and drop all loaded rows.
+
+        ``fetch_page(cursor, page_size, sort=None)`` must return
+        ``(rows, next_cursor)`` in the order given by ``sort``.
+        ``accepts(row)`` tells whether a row belongs to the source; pass it
+        for sources ordered by sort_key so that new rows can be patched in
+        by upsert_rows. Without it only rows already shown are updated.
+        """
+        self.beginResetModel()
+        self._fetch_page = fetch_page
+        self._accepts = accepts
+        self._rows = []
+        self._cursor = None
+        self._has_more = fetch_page is not None
+        self.endResetModel()
+
+    def set_first_page(self, fetch_page, rows, next_cursor, accepts=None):
+        """Replace the source with a first page that was fetched elsewhere.
+
+        Further pages are pulled from ``fetch_page`` starting at ``next_cursor``.
+        """
+        self.beginResetModel()
+        self._fetch_page = fetch_page
+        self._accepts = accepts
+        self._rows = list(rows)
+        self._cursor = next_cursor
+        self._has_more = next_cursor is not None
+        self.endResetModel()
+
+    def reload(self):
+        """Drop loaded rows and start again from the first page"""
+        self.set_source(self._fetch_page, self._accepts)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Have the source order the rows by a column and show its first page.
+
+        Column -1 goes back to the source's own order.
+        """
+        if 0 <= column < len(self.columns):
+            sort_order = (self.columns[column], order == Qt.DescendingOrder)
+        else:
+            sort_order = None
+        if sort_order != self.sort_order:
+            self.sort_order = sort_order
+            self.reload()
+            self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._has_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more:
+            return
+
+        rows, next_cursor = self._fetch_page(self._cursor, self.page_size, sort=self.sort_order)
+        self._cursor = next_cursor
+        self._has_more = next_cursor is not None
+
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.DisplayRole:
+            value = self._rows[index.row()][index.column()]
+            return self.format_cell(index.column(), value)
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def format_cell(self, column, value):
+        """Convert a raw value to display text"""
+        return "" if value is None else str(value)
+
+    def sort_key(self, row):
+        """Key of a row in the current order"""
+        if self.sort_order is None:
+            return self.source_key(row)
+        return self.column_key(row, self.sort_order)
+
+    def source_key(self, row):
+        """Key of a row in the unfiltered, unsorted source order"""
+        return row[0]
+
+    def column_key(self, row, sort_order):
+        """Key of a row when sorted by a column, as the source orders it"""
+        value = row[self.columns.index(sort_order[0])]
+        return value is not None, value, row[0]
+
+    def is_descending(self):
+        if self.sort_order is None:
+            return self.descending
+        return self.sort_order[1]
+
+    def apply_change(self, op, ids, fetch_rows):
+        """Patch the loaded rows after rows were inserted, updated or deleted.
+
+        ``fetch_rows(ids)`` returns the current records for the given ids.
+        Changes touching more rows than a page are cheaper to show by
+        reloading from the first page.
+        """
+        if op == "reload":
+            self.reload()
+        elif op == "delete":
+            self.remove_ids(ids)
+        elif len(ids) > self.page_size:
+            self.reload()
+        else:
+            rows = fetch_rows(ids)
+            self.upsert_rows(rows)
+            # Rows that are gone again by now
+            self.remove_ids(set(ids) - {row[0] for row in rows})
+
+    def upsert_rows(self, rows):
+        """Insert new rows and replace changed ones in place.
+
+        New rows are placed by sort_key among the loaded rows; a row that
+        sorts after the last loaded row is left for fetchMore to pick up.
+        Applying the same rows twice leaves the model unchanged.
+        """
+        for row in rows:
+            fits = self._accepts is None or self._accepts(row)
+            index = self._find(row[0])
+
+            if index is not None:
+                if not fits:
+                    self._remove_at(index)
+                    continue
+                if self._accepts is None:
+                    # Unordered source (e.g. ranked search): keep the position
+                    self._replace_at(index, row)
+                    continue
+                old = self._rows.pop(index)
+                position = self._position(row)
+                self._rows.insert(index, old)
+                if position == index:
+                    self._replace_at(index, row)
+                    continue
+                self._remove_at(index)
+            elif self._accepts is None or not fits:
+                continue
+
+            position = self._position(row)
+            if position == len(self._rows) and self._has_more:
+                continue
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, row)
+            self.endInsertRows()
+
+    def remove_ids(self, ids):
+        """Remove the loaded rows with the given ids"""
+        ids = set(ids)
+        for index in reversed(range(len(self._rows))):
+            if self._rows[index][0] in ids:
+                self._remove_at(index)
+
+    def _find(self, row_id):
+        for index, row in enumerate(self._rows):
+            if row[0] == row_id:
+                return index
+        return None
+
+    def _position(self, row):
+        """Binary search the loaded rows for where ``row`` belongs"""
+        key = self.sort_key(row)
+        descending = self.is_descending()
+        low, high = 0, len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = self.sort_key(self._rows[middle])
+            if (middle_key > key) if descending else (middle_key < key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _replace_at(self, index, row):
+        self._rows[index] = row
+        self.dataChanged.emit(
+            self.index(index, 0), self.index(index, self.columnCount() - 1)
+        )
+
+    def _remove_at(self, index):
+        self.beginRemoveRows(QModelIndex(), index, index)
+        del self._rows[index]
+        self.endRemoveRows()
+
+    def row_at(self, row):
+        """Get the raw database tuple shown at the given row"""
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+
+class PaymentTableModel(PagedTableModel):
+    """Payments grid: ID, customer, total, method, status, date, notes"""
+
+    headers = [
+        "ID", "Nama Pelanggan", "Total", "Metode Pembayaran",
+        "Status", "Tanggal", "Catatan"
+    ]
+    columns = PAYMENT_COLUMNS
+    descending = True
+
+    def source_key(self, row):
+        return (row[5], row[0])
+
+    def column_key(self, row, sort_order):
+        return payment_sort_key(row, sort_order)
+
+    def format_cell(self, column, value):
+        if column == 2:  # Format currency
+            return f"Rp {value:,.0f}"
+        if column == 5:  # Format date
+            return str(value)[:19]  # Remove microseconds
+        return super().format_cell(column, value)
+
+
+class MenuTableModel(PagedTableModel):
+    """Menu grid: ID, name, category, price, description, availability"""
+
+    headers = [
+        "ID", "Nama Menu", "Kategori", "Harga", "Deskripsi", "Tersedia"
+    ]
+    columns = MENU_COLUMNS
+
+    def source_key(self, row):
+        return MenuCache.sort_key(row)
+
+    def column_key(self, row, sort_order):
+        return MenuCache.column_key(sort_order[0])(row)
+
+    def format_cell(self, column, value):
+        if column == 3:  # Format price
+            return f"Rp {value:,.0f}"
+        if column == 5:  # Format availability
+            return "Ya" if value else "Tidak"
+        return super().format_cell(column, value)